@@ -6,13 +6,32 @@ Production-ready version with security and configuration improvements
 
 import os
 import re
+import json
+import hashlib
+import secrets
 import logging
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from telnetlib import EL
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
-from python_decoder import Grid, Bot, interpreter, count_bot_commands, WinInterruption, execute_with_timeout
+from python_decoder import (Grid, Bot, interpreter, grade, WinInterruption, DeathInterruption, BudgetExceeded,
+                            ExecutionBudget, program_globals, execute_with_timeout, TILE_EMOJIS, BOT_EMOJIS)
+from renderer import GridRenderer, GRID_FORMATS, tile_store, tile_payload
 import grids
+import jobs
+import progress_store
+import sandbox
+import scheduler
+import solver
+import metrics
+from cache import LRUCache
+from code_analysis import analyze
 import signal
 import time
 
@@ -54,29 +73,244 @@ if FLASK_ENV == 'production' and allowed_origins == 'http://localhost:5000':
     logger.warning("⚠️  CORS is still using localhost. Set ALLOWED_ORIGINS in production!")
 CORS(app, origins=allowed_origins.split(','))
 
+# Reverse proxies in front of the app (e.g. 1 on Railway); their X-Forwarded-For
+# gives the client IP used for per-IP execution limits
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
+
 # Default level
 current_level = 1
 
+# Browser/proxy cache lifetime (seconds) for level data; responses also carry strong ETags
+LEVEL_CACHE_MAX_AGE = int(os.environ.get('LEVEL_CACHE_MAX_AGE', 300))
+
+# Serialized bodies of read-only level responses, keyed by (route, level)
+_static_responses = {}
+
+# Seconds browsers/proxies may keep a /tiles/<id> response (its content never changes)
+TILE_MAX_AGE = 365 * 24 * 3600
+
+def cached_json_response(cache_key, build_payload):
+    """
+    Serve a JSON body that only depends on level data
+
+    The body is serialized once per process. Responses carry a strong ETag
+    and Cache-Control so browsers and reverse proxies can answer repeat
+    loads (or get a 304) without touching Python.
+    """
+    cached = _static_responses.get(cache_key)
+    if cached is None:
+        body = app.json.dumps(build_payload()).encode('utf-8') + b'\n'
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        cached = _static_responses[cache_key] = (body, etag)
+    body, etag = cached
+    
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = LEVEL_CACHE_MAX_AGE
+    return response.make_conditional(request)
+
+# Supported encodings for the animation frames returned by /execute ('none' grades headless)
+FRAME_FORMATS = ('delta', 'full', 'none')
+
+class StreamClosed(Exception):
+    """Raised into a streaming run when its client has gone away"""
+    pass
+
 class AnimatedBot(Bot):
-    """Bot class that captures each frame for animation"""
+    """Bot class that captures each frame for animation
+
+    In the default 'delta' format frames are stored column-wise: one initial
+    tile snapshot, then one entry per action in each of the parallel lists
+    (action, row, col, direction, alive, win_state). Cells whose tile changed
+    during an action (collected keys, opened gates) are recorded in the
+    'changes' columns. The 'full' format keeps the legacy list of frame dicts
+    with a rendered grid per action. The 'stream' format keeps only the
+    initial frame and publishes every later frame to the sandbox caller as
+    soon as it is captured.
+
+    Rendered grids (the 'full' frames and the final grid_state) use
+    grid_format (see renderer.GRID_FORMATS) and are re-rendered
+    incrementally by a GridRenderer.
+
+    With grid_format 'viewport' no frame carries the board: the initial
+    frame holds the tile map (tile ids, see renderer), every frame adds the
+    camera window, and a change names a tile index and its new id instead
+    of a cell and its new tile.
+    """
     
-    def __init__(self, grid):
+    def __init__(self, grid, frame_format='delta', grid_format='emoji', level=None):
         super().__init__(grid)
-        self.frames = []  # Store grid state after each action
-        self.action_log = []
+        self.frame_format = frame_format
+        self.grid_format = grid_format
+        self.level = level  # Level number, named in viewport tile ids
+        self._renderer = None  # Created on first render
+        self.frames = []  # Legacy frames (full format only)
+        if grid_format == 'viewport':
+            # Names the starting tiles and puts them in this process's tile store
+            self.initial_view = self.render_grid()
+            self.initial_tiles = None
+        else:
+            self.initial_view = None
+            self.initial_tiles = list(grid.tiles())
+        self.action_names = []  # Distinct action descriptions, referenced by index
+        self._action_ids = {}
+        self.frame_actions = []
+        self.frame_rows = []
+        self.frame_cols = []
+        self.frame_directions = []
+        self.frame_alive = []
+        self.frame_win = []
+        self.frame_camera_tops = []  # Viewport format only
+        self.frame_camera_lefts = []
+        self.change_steps = []
+        self.change_cells = []
+        self.change_tiles = []
+        self._pending_changes = []
+        self._stream_step = 0
         self.capture_frame("Initial state")
     
+    def render_grid(self, grid_format=None):
+        """The grid with the bot in grid_format (default: this bot's grid_format)"""
+        if self._renderer is None:
+            self._renderer = GridRenderer(self.grid, self.level)
+        return self._renderer.render(grid_format or self.grid_format, self.i, self.j, self.direction)
+    
+    def __str__(self):
+        return self.render_grid('emoji')
+    
+    @property
+    def action_log(self):
+        """Descriptions of every captured frame, in order"""
+        return [self.action_names[action] for action in self.frame_actions]
+    
     def capture_frame(self, action_description):
-        """Capture current grid state as a frame"""
-        self.frames.append({
-            'grid_state': str(self),
+        """Capture current bot state (and any changed cells) as a frame"""
+        if self.frame_format == 'stream' and self.frame_actions:
+            self._publish_frame(action_description)
+            return
+        
+        action_id = self._action_ids.get(action_description)
+        if action_id is None:
+            action_id = self._action_ids[action_description] = len(self.action_names)
+            self.action_names.append(action_description)
+        
+        step = len(self.frame_actions)
+        self.frame_actions.append(action_id)
+        self.frame_rows.append(self.i)
+        self.frame_cols.append(self.j)
+        self.frame_directions.append(self.direction)
+        self.frame_alive.append(1 if self.alive else 0)
+        self.frame_win.append(1 if self.win_state else 0)
+        if self.initial_view is not None:
+            top, left = self._renderer.camera(self.i, self.j)
+            self.frame_camera_tops.append(top)
+            self.frame_camera_lefts.append(left)
+        changes = self._pending_changes
+        if changes:
+            for cell, tile in changes:
+                self.change_steps.append(step)
+                self.change_cells.append(cell)
+                self.change_tiles.append(tile)
+            self._pending_changes = []
+        
+        if self.frame_format == 'full':
+            if self.initial_view is None or not self.frames:
+                grid_state = self.render_grid()
+            else:
+                # Later viewport frames name only the bot, its camera window and the changed tiles
+                grid_state = {'bot': [self.i, self.j, self.direction], 'camera': self._renderer.camera(self.i, self.j),
+                              'changed': list(changes)}
+            self.frames.append({
+                'grid_state': grid_state,
+                'action': action_description,
+                'position': (self.i, self.j),
+                'direction': self.direction,
+                'alive': self.alive,
+                'win_state': self.win_state
+            })
+    
+    def _publish_frame(self, action_description):
+        """Send one frame to the listener instead of storing it"""
+        self._stream_step += 1
+        frame = {
+            'step': self._stream_step,
             'action': action_description,
-            'position': (self.i, self.j),
+            'row': self.i,
+            'col': self.j,
             'direction': self.direction,
-            'alive': self.alive,
-            'win_state': self.win_state
-        })
-        self.action_log.append(action_description)
+            'alive': 1 if self.alive else 0,
+            'win_state': 1 if self.win_state else 0,
+            'changes': self._pending_changes
+        }
+        if self.initial_view is not None:
+            frame['camera'] = self._renderer.camera(self.i, self.j)
+            # Sent along so the client doesn't need a /tiles round trip mid-stream
+            frame['new_tiles'] = {name: tile_payload(name, tile_store.get(name)) for _, name in self._pending_changes}
+        sandbox.publish('frame', frame)
+        self._pending_changes = []
+    
+    def pick_up(self, key, key_location):
+        """Pick up a key and remember which cells (or viewport tiles) changed for the next frame"""
+        opened = super().pick_up(key, key_location)
+        if self.initial_view is not None:
+            self._pending_changes.extend(self._renderer.changed_tiles())
+        else:
+            self._pending_changes.extend((cell, 0) for cell in opened)
+        return opened
+    
+    def reset(self):
+        """Reset the bot (a death) and remember the keys and gates that reappear for the next frame"""
+        grid = self.grid
+        if self.initial_view is None and grid.collected:
+            self._pending_changes.extend((cell, grid.template[cell]) for cell, bits in grid.keys.unlock.items()
+                                         if grid.collected & bits)
+        try:
+            super().reset()
+        finally:
+            if self.initial_view is not None:
+                self._pending_changes.extend(self._renderer.changed_tiles())
+    
+    def animation(self):
+        """Return the compact, column-wise frame encoding"""
+        animation = {
+            'format': 'delta',
+            'rows': self.grid.rows,
+            'cols': self.grid.cols,
+            'tiles': self.initial_tiles,
+            'palette': {'tiles': TILE_EMOJIS, 'bot': BOT_EMOJIS},
+            'action_names': self.action_names,
+            'action': self.frame_actions,
+            'row': self.frame_rows,
+            'col': self.frame_cols,
+            'direction': self.frame_directions,
+            'alive': self.frame_alive,
+            'win_state': self.frame_win,
+            'changes': {
+                'step': self.change_steps,
+                'cell': self.change_cells,
+                'tile': self.change_tiles
+            }
+        }
+        if self.initial_view is not None:
+            del animation['tiles']
+            animation['viewport'] = self.initial_view
+            animation['camera_top'] = self.frame_camera_tops
+            animation['camera_left'] = self.frame_camera_lefts
+        return animation
+    
+    def frame_payload(self):
+        """Response fields carrying the captured frames in the requested format"""
+        if self.frame_format == 'stream':
+            return {'frame_count': self._stream_step + 1}
+        if self.frame_format == 'full':
+            return {
+                'action_log': self.action_log,
+                'frames': self.frames  # Return all frames for animation
+            }
+        return {'animation': self.animation()}
     
     def move_forward(self):
         try:
@@ -110,77 +344,41 @@ class AnimatedBot(Bot):
         super().turn_left()
         self.capture_frame("Turn left")
 
+# Sandbox workers unpickle AnimatedBots, so they import this module up front
+sandbox.preload(__name__)
+
 def is_code_safe(code):
     """
-    Enhanced security check for code safety using multiple layers:
-    1. AST parsing to detect suspicious patterns
+    Security check for code safety (see code_analysis.analyze):
+    1. AST walk for blocked imports, dangerous names and attributes, and __builtins__ access
     2. Regex blacklist for additional protection
     """
-    import ast
-    
-    # First, try to parse the code to catch syntax errors early
-    try:
-        tree = ast.parse(code)
-    except SyntaxError as e:
-        logger.warning(f"Syntax error in user code: {e}")
-        return False
-    
-    # Dangerous built-in functions and attributes that could cause harm
-    dangerous_names = {
-        'exec', 'eval', '__import__', 'open', 'file', 'input', 'exit', 'quit',
-        'compile', 'globals', 'locals', 'vars', 'getattr', 'setattr', 'delattr',
-        'reload', 'breakpoint', '__builtins__', 'memoryview', 'bytearray'
-    }
-    
-    dangerous_modules = {
-        'os', 'sys', 'subprocess', 'socket', 'urllib', 'requests', 'http',
-        'ftplib', 'smtplib', 'ssl', 'pdb', '__main__', 'importlib',
-        'pickle', 'shelve', 'tempfile', 'shutil', 'glob'
-    }
-    
-    # Walk through AST nodes
-    for node in ast.walk(tree):
-        # Check for import statements
-        if isinstance(node, (ast.Import, ast.ImportFrom)):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    module_name = alias.name.split('.')[0]
-                    if module_name in dangerous_modules:
-                        logger.warning(f"Blocked import: {module_name}")
-                        return False
-            elif isinstance(node, ast.ImportFrom):
-                if node.module and node.module.split('.')[0] in dangerous_modules:
-                    logger.warning(f"Blocked import: {node.module}")
-                    return False
-        
-        # Check for dangerous function calls
-        if isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Name) and node.func.id in dangerous_names:
-                logger.warning(f"Blocked function call: {node.func.id}")
-                return False
-            # Check for getattr-based imports: getattr(__builtins__, '__import__')
-            if isinstance(node.func, ast.Name) and node.func.id == 'getattr':
-                logger.warning("Blocked: getattr() not allowed")
-                return False
-        
-        # Check for attribute access on builtins
-        if isinstance(node, ast.Attribute):
-            if isinstance(node.value, ast.Name) and node.value.id == '__builtins__':
-                logger.warning("Blocked: Access to __builtins__")
-                return False
-    
-    # Additional regex checks for obfuscated patterns
-    dangerous_patterns = [
-        r'__.*__',  # Dunder methods
-        r'\\x[0-9a-fA-F]{2}',  # Hex escapes for obfuscation
-    ]
-    
-    for pattern in dangerous_patterns:
-        if re.search(pattern, code):
-            logger.warning(f"Blocked: Suspicious pattern detected: {pattern}")
-            return False
-    
-    return True
+    return prepare_code(code).safe
+
+# Content-addressed cache of analyzed submissions (keyed by SHA-256 of the source)
+CODE_CACHE_SIZE = int(os.environ.get('CODE_CACHE_SIZE', 1024))
+code_cache = LRUCache(CODE_CACHE_SIZE)
+
+def prepare_code(code):
+    """
+    Safety-check, clean, compile and count the commands of a submission
+
+    Returns a code_analysis.CodeAnalysis. Identical submissions (the same few
+    tutorial solutions arrive thousands of times) are served from code_cache
+    instead of re-analyzing them.
+    """
+    key = hashlib.sha256(code.encode('utf-8')).hexdigest()
+    prepared = code_cache.get(key)
+    if prepared is None:
+        prepared = analyze(code)
+        code_cache.put(key, prepared)
+    return prepared
+
+# Finished runs keyed by (level, program fingerprint, frame format). Levels are
+# fixed and deterministic programs always play out the same way, so a repeat
+# submission (even reformatted or re-commented) skips the executor entirely.
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))
+result_cache = LRUCache(RESULT_CACHE_SIZE)
 
 @app.route('/')
 def index():
@@ -192,160 +390,597 @@ def test_page():
     """Serve the testing page for development and experimentation"""
     return render_template('test.html')
 
-@app.route('/execute', methods=['POST'])
-def execute_code():
-    """Execute bot code and return results"""
-    timeout_seconds = 30
+# Admission control and cost-ordered sandbox slots for every run
+execution_scheduler = scheduler.Scheduler()
+
+def current_client():
+    """Scheduler identity of this request: session ID (created if missing) and client IP"""
+    sid = session.get('sid')
+    if not sid:
+        sid = session['sid'] = secrets.token_urlsafe(16)
+    return scheduler.Client(sid, request.remote_addr)
+
+def rejected_response(rejection):
+    """429 response for a run refused by the scheduler or the job queue"""
+    response = jsonify({
+        'success': False,
+        'error': 'Too many runs right now. Please wait a moment and try again.',
+        'retry_after': rejection.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+# Outcome of check_submission: a final result (or None if the code must run), the analysis and the memo key
+CheckedSubmission = namedtuple('CheckedSubmission', ['result', 'prepared', 'memo_key'])
+
+def check_submission(code, level_number, frame_format='delta', grid_format='emoji', streaming=False, timer=None):
+    """
+    Everything run_submission does before the sandbox: validate the level,
+    analyze the code and look up a memoized result
+
+    The result is final (invalid level, unsafe code, memoized run) or None if
+    the code has to run. Routes check first and only admit what will run, so
+    a memoized re-run never spends the client's rate limit.
+    """
+    if timer is None:
+        timer = metrics.RequestTimer()
     try:
-        data = request.get_json()
-        if not data or 'code' not in data:
-            return jsonify({'success': False, 'error': 'No code provided'})
-        
-        code = data['code']
-        level_number = data.get('level', current_level)
-        
         # Validate level number
         if not isinstance(level_number, int) or level_number < 1 or level_number > len(grids.ALL_LEVELS):
             logger.warning(f"Invalid level number attempted: {level_number}")
-            return jsonify({
+            timer.outcome = 'invalid'
+            return CheckedSubmission({
                 'success': False, 
                 'error': f'Invalid level number. Must be between 1 and {len(grids.ALL_LEVELS)}'
-            })
+            }, None, None)
         
         # Security check
-        if not is_code_safe(code):
-            return jsonify({
+        with timer.stage('analyze'):
+            prepared = prepare_code(code)
+        if not prepared.safe:
+            timer.outcome = 'unsafe'
+            return CheckedSubmission({
                 'success': False, 
                 'error': 'Code contains potentially unsafe operations. Please check your code and try again.'
-            })
+            }, prepared, None)
         
+        # Streamed runs must replay their frames live, and 'full' payloads are too big to keep
+        memo_key = None
+        if not streaming and frame_format != 'full' and prepared.deterministic:
+            memo_key = (level_number, prepared.fingerprint, frame_format, grid_format)
+            with timer.stage('cache'):
+                cached = result_cache.get(memo_key)
+            if cached is not None:
+                timer.outcome = 'win' if cached['win_state'] else 'incomplete'
+                return CheckedSubmission(dict(cached), prepared, memo_key)
+        return CheckedSubmission(None, prepared, memo_key)
+    except Exception as e:
+        timer.outcome = 'error'
+        logger.error(f"Server error checking submission: {type(e).__name__}: {str(e)}", exc_info=True)
+        return CheckedSubmission({
+            'success': False,
+            'error': 'A server error occurred. Please try again later.'
+        }, None, None)
+
+def run_submission(code, level_number, frame_format='delta', timeout_seconds=30, on_event=None, timer=None, grid_format='emoji', ticket=None, checked=None):
+    """
+    Validate and run one submission on a level
+
+    Returns the JSON-ready result dict used by /execute. With frame_format
+    'none' the code runs headless on a bare Bot (python_decoder.grade) and
+    no frames or grid are returned (batch grading). With 'stream',
+    on_event(event, payload) first receives an 'init' event (the delta
+    encoding of the initial frame) and then a 'frame' event per action.
+    grid_format picks how grid_state (and 'full' frames) are rendered.
+
+    Programs run metered against their level's instruction budget; the
+    steps used are reported as 'budget' ({'limit', 'used'}), and a program
+    that runs out stops with outcome 'budget' instead of waiting for the
+    timeout.
+
+    With a scheduler ticket the sandbox run waits for a slot in
+    execution_scheduler first (stage 'queue'); if none frees up in time the
+    result carries 'retry_after' and the outcome is 'rejected'.
+
+    Pass a metrics.RequestTimer as timer to get the time spent in each stage
+    and the outcome (win, incomplete, death, budget, timeout, unsafe, error, ...).
+    Pass the check_submission result as checked if the route already checked.
+    """
+    if timer is None:
+        timer = metrics.RequestTimer()
+    if checked is None:
+        checked = check_submission(code, level_number, frame_format, grid_format, on_event is not None, timer)
+    if checked.result is not None:
+        return checked.result
+    prepared, memo_key = checked.prepared, checked.memo_key
+    try:
         # Get the grid for the specified level
-        try:
-            game_grid = grids.create_grid(level_number)
-        except ValueError as e:
-            logger.warning(f"Invalid level {level_number}: {e}")
-            return jsonify({
-                'success': False, 
-                'error': f'Invalid level number'
-            })
-        
-        # Explicitly reset the grid to ensure all keys and gates are restored
-        game_grid.reset()
-        
-        # Create a new bot for this execution
-        bot = AnimatedBot(game_grid)
+        with timer.stage('grid'):
+            try:
+                game_grid = grids.create_grid(level_number)
+            except ValueError as e:
+                logger.warning(f"Invalid level {level_number}: {e}")
+                timer.outcome = 'invalid'
+                return {
+                    'success': False, 
+                    'error': f'Invalid level number'
+                }
+            
+            # Explicitly reset the grid to ensure all keys and gates are restored
+            game_grid.reset()
+            budget = ExecutionBudget(grids.get_compiled_level(level_number).budget)
+            
+            # Create a new bot for this execution (headless runs use a bare Bot inside grade())
+            bot = None if frame_format == 'none' else AnimatedBot(game_grid, frame_format, grid_format, level_number)
         
-        # Clean the code (remove imports except math)
-        lines = code.split('\n')
-        clean_lines = []
-        for line in lines:
-            if 'import' in line and 'math' not in line:
-                continue
-            clean_lines.append(line)
-        clean_code = '\n'.join(clean_lines)
+        if on_event is not None:
+            on_event('init', bot.animation())
         
         # Execute the code
         try:
-            # Use exec with the bot in the global namespace
-            execute_with_timeout(clean_code, {'bot': bot}, timeout_seconds=timeout_seconds)
-            
-            # Get results
-            command_count = count_bot_commands(clean_code)
-            grid_state = str(bot)
-            
-            # Determine success
-            if bot.win_state:
-                if command_count <= game_grid.par:
-                    message = '🌟 STAR! You completed the level efficiently!'
+            with timer.stage('queue'):
+                slot = execution_scheduler.acquire(ticket) if ticket is not None else nullcontext()
+            with slot, timer.stage('run'):
+                if bot is None:
+                    graded = grade(code, game_grid, timeout_seconds, analysis=prepared, budget=budget)
+                    if graded.error is not None:
+                        raise graded.error
                 else:
-                    message = '✅ Success! But try to use fewer commands for a star.'
-                success = True
-            elif not bot.alive:
-                message = '💀 Bot died! Try a different approach.'
-                success = False
-            else:
-                message = 'Code executed but bot did not reach the goal.'
-                success = False
-            
-            return jsonify({
-                'success': success,
-                'message': message,
-                'grid_state': grid_state,
-                'command_count': command_count,
-                'win_state': bot.win_state,
-                'alive': bot.alive,
-                'action_log': bot.action_log,
-                'frames': bot.frames  # Return all frames for animation
-            })
-            
+                    # Use exec with the bot in the global namespace
+                    execute_with_timeout(prepared.code_object or prepared.clean_code, program_globals(bot, budget), timeout_seconds=timeout_seconds, on_event=on_event)
+                    if budget.exhausted and not bot.win_state:
+                        # The program caught BudgetExceeded itself and stopped
+                        raise BudgetExceeded(f"Instruction budget of {budget.limit} steps used up")
         except WinInterruption:
             # Bot reached the finish line
-            command_count = count_bot_commands(clean_code)
-            grid_state = str(bot)
-            
-            if command_count <= game_grid.par:
-                message = '🌟 STAR! You completed the level efficiently!'
-            else:
-                message = '✅ Success! But try to use fewer commands for a star.'
-            
-            return jsonify({
-                'success': True,
-                'message': message,
-                'grid_state': grid_state,
-                'command_count': command_count,
-                'win_state': True,
-                'alive': bot.alive,
-                'action_log': bot.action_log,
-                'frames': bot.frames  # Return all frames for animation
-            })
+            bot.win_state = True
+        except (scheduler.Rejected, sandbox.SandboxBusy) as e:
+            logger.warning(f"No sandbox slot for run: {e}")
+            timer.outcome = 'rejected'
+            return {
+                'success': False,
+                'error': 'The server is busy. Please try again shortly.',
+                'retry_after': e.retry_after
+            }
+        except StreamClosed as e:
+            logger.info(f"Streaming run abandoned: {e}")
+            timer.outcome = 'cancelled'
+            return {'success': False, 'error': 'Execution cancelled'}
+        except BudgetExceeded as e:
+            logger.info(f"Code execution stopped: {e}")
+            timer.outcome = 'budget'
+            return {
+                'success': False,
+                'error': f'Your code used up its budget of {budget.limit} steps (loop iterations and function calls) without reaching the goal. Please check for infinite loops.',
+                'budget': budget.report()
+            }
         except TimeoutError as e:
             logger.warning(f"Code execution timeout: {str(e)}")
-            return jsonify({
-                    'success': False,
-                    'error': f'Code execution exceeded the time limit ({timeout_seconds} seconds). Please check for infinite loops.'
-                })
+            timer.outcome = 'timeout'
+            return {
+                'success': False,
+                'error': f'Code execution exceeded the time limit ({timeout_seconds} seconds). Please check for infinite loops.'
+            }
         except Exception as e:
             # Log the full error for debugging
             logger.error(f"Code execution error: {type(e).__name__}: {str(e)}", exc_info=True)
+            timer.outcome = 'death' if isinstance(e, DeathInterruption) else 'error'
             # Return generic message to user
-            return jsonify({
+            return {
                 'success': False,
                 'error': f'An error occurred while executing your code. Please check your syntax and try again. Error: {e}'
-            })
+            }
+        
+        # Get results
+        if bot is None:
+            win_state, alive = graded.win_state, graded.alive
+        else:
+            win_state, alive = bot.win_state, bot.alive
+        command_count = prepared.command_count
+        star = win_state and command_count <= game_grid.par
+        timer.outcome = 'win' if win_state else 'death' if not alive else 'incomplete'
+        
+        # Determine success
+        if win_state:
+            if star:
+                message = '🌟 STAR! You completed the level efficiently!'
+            else:
+                message = '✅ Success! But try to use fewer commands for a star.'
+            success = True
+        elif not alive:
+            message = '💀 Bot died! Try a different approach.'
+            success = False
+        else:
+            message = 'Code executed but bot did not reach the goal.'
+            success = False
+        
+        result = {
+            'success': success,
+            'message': message,
+            'command_count': command_count,
+            'win_state': win_state,
+            'alive': alive,
+            'star': star,
+            'budget': budget.report()
+        }
+        if bot is not None:
+            with timer.stage('frames'):
+                result['grid_state'] = bot.render_grid()
+                result.update(bot.frame_payload())
+        if memo_key is not None:
+            # Only completed runs get here - timeouts and errors are never cached
+            result_cache.put(memo_key, dict(result))
+        return result
             
     except Exception as e:
+        timer.outcome = 'error'
         # Log the full error for debugging
         logger.error(f"Server error processing request: {type(e).__name__}: {str(e)}", exc_info=True)
         # Return generic message to user
-        return jsonify({
+        return {
             'success': False,
             'error': 'A server error occurred. Please try again later.'
+        }
+
+def count_frames(result):
+    """Number of animation frames in a run_submission result"""
+    if 'animation' in result:
+        return len(result['animation']['action'])
+    if 'frame_count' in result:
+        return result['frame_count']
+    return len(result.get('frames', ()))
+
+def record_run(level_number, timer, result, response_bytes):
+    """Record a finished run in the execution metrics (invalid levels share one label)"""
+    level_label = level_number if timer.outcome != 'invalid' else 'invalid'
+    metrics.record_execution(level_label, timer, count_frames(result), response_bytes)
+
+@app.route('/execute', methods=['POST'])
+def execute_code():
+    """Execute bot code and return results"""
+    data = request.get_json(silent=True)
+    if not data or 'code' not in data:
+        return jsonify({'success': False, 'error': 'No code provided'})
+    
+    frame_format = data.get('frames', 'delta')
+    if frame_format not in FRAME_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid frames format. Must be one of: {', '.join(FRAME_FORMATS)}"
+        })
+    
+    grid_format = data.get('grid_format', 'emoji')
+    if grid_format not in GRID_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid grid format. Must be one of: {', '.join(GRID_FORMATS)}"
         })
+    
+    level_number = data.get('level', current_level)
+    timer = metrics.RequestTimer()
+    checked = check_submission(data['code'], level_number, frame_format, grid_format, timer=timer)
+    if checked.result is not None:
+        # Invalid, unsafe or memoized: nothing runs, so nothing counts against the client's limits
+        result = checked.result
+    else:
+        try:
+            ticket = execution_scheduler.admit(current_client())
+        except scheduler.Rejected as e:
+            return rejected_response(e)
+        with ticket:
+            result = run_submission(data['code'], level_number, frame_format, timer=timer, grid_format=grid_format,
+                                    ticket=ticket, checked=checked)
+    with timer.stage('serialize'):
+        response = jsonify(result)
+    if timer.outcome == 'rejected':
+        response.status_code = 429
+        response.headers['Retry-After'] = str(result['retry_after'])
+    
+    record_run(level_number, timer, result, response.content_length)
+    response.headers['Server-Timing'] = timer.header()
+    return response
+
+# Seconds between keep-alive comments on an idle event stream, and how long a
+# run may wait for a slow client to drain frames before it is abandoned
+STREAM_KEEPALIVE_SECONDS = 10
+STREAM_CLIENT_TIMEOUT = 30
+
+@app.route('/execute/stream', methods=['POST'])
+def execute_stream():
+    """
+    Execute bot code and stream frames as Server-Sent Events while it runs
+
+    Events: 'init' (delta encoding of the initial frame), one 'frame' per
+    action, then 'summary' (message, command_count, win_state, ...) or 'error'.
+    """
+    data = request.get_json(silent=True)
+    if not data or 'code' not in data:
+        return jsonify({'success': False, 'error': 'No code provided'})
+    
+    grid_format = data.get('grid_format', 'emoji')
+    if grid_format not in GRID_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid grid format. Must be one of: {', '.join(GRID_FORMATS)}"
+        })
+    
+    code = data['code']
+    level_number = data.get('level', current_level)
+    timer = metrics.RequestTimer()
+    checked = check_submission(code, level_number, 'stream', grid_format, streaming=True, timer=timer)
+    ticket = None
+    if checked.result is None:
+        try:
+            ticket = execution_scheduler.admit(current_client())
+        except scheduler.Rejected as e:
+            return rejected_response(e)
+    events = queue.Queue(maxsize=256)
+    client_gone = threading.Event()
+    # The request is recorded once both the run ('result') and the response ('bytes') have finished
+    finished = {}
+    finished_lock = threading.Lock()
+    
+    def finish(**values):
+        with finished_lock:
+            finished.update(values)
+            if len(finished) < 2:
+                return
+        record_run(level_number, timer, finished['result'], finished['bytes'])
+    
+    def on_event(event, payload):
+        if client_gone.is_set():
+            raise StreamClosed("Event stream closed by client")
+        try:
+            events.put((event, payload), timeout=STREAM_CLIENT_TIMEOUT)
+        except queue.Full:
+            client_gone.set()
+            raise StreamClosed("Event stream client stopped reading")
+    
+    def run():
+        if ticket is None:
+            result = checked.result
+        else:
+            with ticket:
+                result = run_submission(code, level_number, 'stream', on_event=on_event, timer=timer,
+                                        grid_format=grid_format, ticket=ticket, checked=checked)
+        finish(result=result)
+        if client_gone.is_set():
+            return
+        try:
+            events.put(('error' if 'error' in result else 'summary', result), timeout=STREAM_CLIENT_TIMEOUT)
+        except queue.Full:
+            # Nobody is draining the stream; don't keep this thread (or the result) around waiting
+            client_gone.set()
+            logger.info("Event stream client stopped reading before the summary")
+    
+    threading.Thread(target=run, daemon=True, name='execute-stream').start()
+    
+    def generate():
+        sent = 0
+        try:
+            while True:
+                try:
+                    event, payload = events.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                chunk = f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+                sent += len(chunk.encode('utf-8'))
+                yield chunk
+                if event in ('summary', 'error'):
+                    break
+        finally:
+            client_gone.set()
+            finish(bytes=sent)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let nginx-style proxies buffer the stream
+    return response
+
+# Bounded pool shared by all batch requests; runs queue here instead of on web workers
+BATCH_MAX_JOBS = int(os.environ.get('BATCH_MAX_JOBS', 500))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', os.environ.get('SANDBOX_WORKERS', 2)))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+
+def run_batch_job(job, index, checked, timer, ticket):
+    """Batch pool entry point: run one job, record it and return its output line"""
+    level_number = job.get('level', current_level)
+    result = run_submission(job['code'], level_number, 'none', timer=timer, ticket=ticket, checked=checked)
+    result['index'] = index
+    result['id'] = job.get('id')
+    line = json.dumps(result) + '\n'
+    record_run(level_number, timer, result, len(line))
+    return line
+
+@app.route('/execute/batch', methods=['POST'])
+def execute_batch():
+    """
+    Execute many submissions at once, streaming results as newline-delimited JSON
+
+    Body: {"jobs": [{"id": <any>, "level": <int>, "code": <str>}, ...]}
+    Each output line is one job's result (without animation frames) plus its
+    'index' in the request and 'id', in completion order. Every job that has
+    to run counts against the client's rate limit; over it the whole batch
+    gets a 429.
+    """
+    data = request.get_json(silent=True)
+    batch = data.get('jobs') if isinstance(data, dict) else None
+    if not isinstance(batch, list) or not batch:
+        return jsonify({'success': False, 'error': 'No jobs provided'}), 400
+    if len(batch) > BATCH_MAX_JOBS:
+        return jsonify({'success': False, 'error': f'Too many jobs. At most {BATCH_MAX_JOBS} per batch'}), 400
+    if not all(isinstance(job, dict) and isinstance(job.get('code'), str) for job in batch):
+        return jsonify({'success': False, 'error': 'Every job needs a code string'}), 400
+    
+    timers = [metrics.RequestTimer() for _ in batch]
+    checks = [check_submission(job['code'], job.get('level', current_level), 'none', timer=timer)
+              for job, timer in zip(batch, timers)]
+    runs = sum(checked.result is None for checked in checks)
+    ticket = None
+    if runs:
+        try:
+            # One admission charged once per run that needs the sandbox; the runs still queue for slots
+            ticket = execution_scheduler.admit(current_client(), max_wait=None, cost=runs)
+        except scheduler.Rejected as e:
+            return rejected_response(e)
+    
+    futures = {
+        batch_executor.submit(run_batch_job, job, index, checked, timer, ticket): index
+        for index, (job, checked, timer) in enumerate(zip(batch, checks, timers))
+    }
+    # Close the ticket once every run has finished or been cancelled
+    pending = [len(futures)]
+    pending_lock = threading.Lock()
+    
+    def run_done(future):
+        with pending_lock:
+            pending[0] -= 1
+            if pending[0] == 0 and ticket is not None:
+                ticket.close()
+    
+    for future in futures:
+        future.add_done_callback(run_done)
+    
+    def generate():
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Client went away - drop the jobs that have not started yet
+            for future in futures:
+                future.cancel()
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def run_job(code, level_number, frame_format, grid_format, ticket, checked):
+    """Job queue entry point: run a submission, then release its admission (if it needed one)"""
+    with ticket or nullcontext():
+        return run_submission(code, level_number, frame_format, grid_format=grid_format, ticket=ticket,
+                              checked=checked)
+
+job_queue = jobs.JobQueue(run_job)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue an execution and return its job ID at once (202)
+
+    Same body as /execute. Poll GET /jobs/<id> for the result. Answers 429
+    with Retry-After when the client is over its limits or the queue is
+    full. Jobs of sessions with short past runs are started first.
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('code'), str):
+        return jsonify({'success': False, 'error': 'No code provided'}), 400
+    
+    frame_format = data.get('frames', 'delta')
+    if frame_format not in FRAME_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid frames format. Must be one of: {', '.join(FRAME_FORMATS)}"
+        }), 400
+    grid_format = data.get('grid_format', 'emoji')
+    if grid_format not in GRID_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid grid format. Must be one of: {', '.join(GRID_FORMATS)}"
+        }), 400
+    
+    level_number = data.get('level', current_level)
+    checked = check_submission(data['code'], level_number, frame_format, grid_format)
+    client = current_client()
+    ticket = None
+    if checked.result is None:
+        try:
+            ticket = execution_scheduler.admit(client, max_wait=None)
+        except scheduler.Rejected as e:
+            return rejected_response(e)
+    
+    try:
+        job = job_queue.submit(data['code'], level_number, frame_format, grid_format, ticket, checked,
+                               priority=execution_scheduler.expected_cost(client.session))
+    except jobs.QueueFull as e:
+        if ticket is not None:
+            ticket.close()
+        logger.warning(f"Job queue full, rejecting submission (retry in {e.retry_after}s)")
+        return rejected_response(e)
+    
+    response = jsonify({'success': True, **job.to_dict()})
+    response.status_code = 202
+    response.headers['Location'] = f"/jobs/{job.id}"
+    return response
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """
+    Status of a job, with its result once done
+
+    ?wait=<seconds> long-polls: the response is held until the job finishes
+    or the wait (capped at JOB_MAX_WAIT) runs out.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    
+    wait = request.args.get('wait', 0, type=float)
+    if wait > 0 and job.status != 'done':
+        job.wait(min(wait, jobs.JOB_MAX_WAIT))
+    
+    response = jsonify({'success': True, **job.to_dict()})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def initial_grid_state(compiled, grid_format):
+    """A compiled level's starting grid in one of GRID_FORMATS"""
+    if grid_format == 'emoji':
+        return compiled.grid_state
+    return GridRenderer(compiled.new_grid(), compiled.number).render(grid_format, compiled.start_pos[0], compiled.start_pos[1], compiled.start_dir)
 
 @app.route('/grid')
 def get_grid():
-    """Get the current grid state for a specific level"""
+    """Get the current grid state for a specific level (?format= one of GRID_FORMATS, default emoji)"""
     level_number = request.args.get('level', current_level, type=int)
+    grid_format = request.args.get('format', 'emoji')
     
     # Validate level number
     if not isinstance(level_number, int) or level_number < 1 or level_number > len(grids.ALL_LEVELS):
         logger.warning(f"Invalid level number attempted: {level_number}")
         return jsonify({'error': 'Invalid level number'}), 400
+    if grid_format not in GRID_FORMATS:
+        return jsonify({'error': f"Invalid grid format. Must be one of: {', '.join(GRID_FORMATS)}"}), 400
     
     try:
-        game_grid = grids.create_grid(level_number)
-        bot = Bot(game_grid)
-        level_info = grids.get_level_info(level_number)
+        compiled = grids.get_compiled_level(level_number)
         
-        return jsonify({
-            'grid_state': str(bot),
-            'max_commands': game_grid.par,
-            'level_info': level_info
+        return cached_json_response(('grid', level_number, grid_format), lambda: {
+            'grid_state': initial_grid_state(compiled, grid_format),
+            'max_commands': compiled.par,
+            'level_info': compiled.level_info
         })
     except ValueError as e:
         logger.warning(f"Error loading level {level_number}: {e}")
         return jsonify({'error': 'Invalid level'}), 404
 
+@app.route('/tiles/<tile_id>')
+def get_tile(tile_id):
+    """
+    One viewport tile by id (see renderer)
+
+    An id always names the same tiles, so the response is cached for good.
+    Tiles this process no longer (or never) held are rebuilt from the id.
+    """
+    tile = tile_store.get(tile_id)
+    if tile is None:
+        return jsonify({'error': 'Unknown tile'}), 404
+    response = jsonify(tile_payload(tile_id, tile))
+    response.set_etag(tile_id)
+    response.cache_control.public = True
+    response.cache_control.max_age = TILE_MAX_AGE
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
 @app.route('/levels')
 def get_levels():
     """Get list of all available levels with progress icons"""
@@ -360,6 +995,50 @@ def get_levels():
         'total': len(grids.ALL_LEVELS)
     })
 
+@app.route('/bootstrap')
+def bootstrap():
+    """
+    Everything the page needs on first load, in one response
+
+    The level list and the current level's grid are the same for every
+    player, so that part of the body is serialized once per process (like
+    cached_json_response) and only the player's icons, stats and level
+    progress are serialized per request. Same fields as /levels, /grid,
+    /progress/stats and /progress/<n>.
+    """
+    level_number = request.args.get('level', 1, type=int)
+    if level_number is None or level_number < 1 or level_number > len(grids.ALL_LEVELS):
+        logger.warning(f"Invalid level number attempted: {level_number}")
+        return jsonify({'error': 'Invalid level number'}), 400
+    
+    static = _static_responses.get(('bootstrap', level_number))
+    if static is None:
+        compiled = grids.get_compiled_level(level_number)
+        # Object body without its closing brace; the player part is appended per request
+        static = _static_responses[('bootstrap', level_number)] = app.json.dumps({
+            'levels': grids.list_all_levels(),
+            'total': len(grids.ALL_LEVELS),
+            'grid': {
+                'grid_state': compiled.grid_state,
+                'max_commands': compiled.par,
+                'level_info': compiled.level_info
+            }
+        }).encode('utf-8')[:-1]
+    
+    progress = init_session_progress()
+    level_progress = progress.level(level_number)
+    player = {
+        'icons': [level_icon(progress.level(number)) for number in range(1, len(grids.ALL_LEVELS) + 1)],
+        'stats': progress.stats(),
+        'progress': level_progress,
+        'icon': level_icon(level_progress)
+    }
+    body = static + b',"player":' + app.json.dumps(player).encode('utf-8') + b'}\n'
+    response = app.response_class(body, mimetype='application/json')
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
 @app.route('/level/<int:level_number>')
 def get_level_details(level_number):
     """Get detailed information about a specific level"""
@@ -369,101 +1048,115 @@ def get_level_details(level_number):
         return jsonify({'error': 'Invalid level number'}), 400
     
     try:
-        level_info = grids.get_level_info(level_number)
-        game_grid = grids.create_grid(level_number)
-        bot = Bot(game_grid)
+        compiled = grids.get_compiled_level(level_number)
         
-        return jsonify({
-            'level_info': level_info,
-            'grid_state': str(bot),
+        return cached_json_response(('level', level_number), lambda: {
+            'level_info': compiled.level_info,
+            'grid_state': compiled.grid_state,
             'grid_size': {
-                'rows': game_grid.rows,
-                'cols': game_grid.cols
+                'rows': compiled.rows,
+                'cols': compiled.cols
             }
         })
     except ValueError as e:
         logger.warning(f"Error loading level {level_number}: {e}")
         return jsonify({'error': 'Invalid level'}), 404
 
+@app.route('/hint')
+def get_hint():
+    """
+    Next best action and distance to the goal for a bot state
+
+    Query: level, row, col, direction (0 up, 1 left, 2 down, 3 right) and
+    one keys=<row>,<col> per collected key. Answers from distance tables
+    built once per level and key state (see solver.LevelHints).
+    """
+    level_number = request.args.get('level', type=int)
+    row = request.args.get('row', type=int)
+    col = request.args.get('col', type=int)
+    direction = request.args.get('direction', type=int)
+    if level_number is None or level_number < 1 or level_number > len(grids.ALL_LEVELS):
+        return jsonify({'success': False, 'error': 'Invalid level number'}), 400
+    if row is None or col is None or direction not in (0, 1, 2, 3):
+        return jsonify({'success': False, 'error': 'row, col and direction (0-3) are required'}), 400
+    
+    hints = solver.level_hints(level_number)
+    if not (0 <= row < hints.cells // hints.cols and 0 <= col < hints.cols):
+        return jsonify({'success': False, 'error': 'Position is outside the grid'}), 400
+    
+    collected = 0
+    for key in request.args.getlist('keys'):
+        try:
+            key_row, key_col = (int(part) for part in key.split(','))
+            collected |= hints.key_bits[key_row * hints.cols + key_col]
+        except (ValueError, KeyError):
+            return jsonify({'success': False, 'error': f'No key at {key}'}), 400
+    
+    cell = row * hints.cols + col
+    if not hints.can_stand(cell, collected):
+        return jsonify({'success': False, 'error': 'The bot cannot stand there'}), 400
+    
+    action, distance = hints.hint(cell, direction, collected)
+    reachable = distance != solver.UNREACHABLE
+    return jsonify({
+        'success': True,
+        'action': action,
+        'distance': distance if reachable else None,
+        'reachable': reachable
+    })
+
 
 def init_session_progress():
-    """Initialize progress tracking in session if not exists"""
-    if 'progress' not in session:
-        session['progress'] = {}
-        session.modified = True
+    """
+    Load this request's progress from the progress store (once per request)
+
+    The session cookie only holds an opaque 'sid'. Progress still stored in
+    the cookie by older versions is moved into the store on first sight.
+    """
+    if 'player_progress' in g:
+        return g.player_progress
+    
+    levels = len(grids.ALL_LEVELS)
+    store = progress_store.get_store()
+    sid = session.get('sid')
+    progress = store.load(sid, levels) if sid else None
+    if progress is None:
+        legacy = session.pop('progress', None)
+        progress = progress_store.PlayerProgress.from_session_dict(legacy, levels) if isinstance(legacy, dict) else progress_store.PlayerProgress(levels)
+        if not sid:
+            sid = session['sid'] = secrets.token_urlsafe(16)
+        if legacy:
+            store.save(sid, progress)
+    elif 'progress' in session:
+        session.pop('progress')
+    g.player_progress = progress
+    return progress
 
 def get_level_progress(level_number):
-    """Get progress for a specific level from session"""
-    init_session_progress()
-    level_key = str(level_number)
-    if level_key not in session['progress']:
-        session['progress'][level_key] = {
-            'completed': False,
-            'best_commands': None,
-            'attempts': 0,
-            'has_star': False
-        }
-        session.modified = True
-    return session['progress'][level_key]
+    """Get progress for a specific level"""
+    return init_session_progress().level(level_number)
 
 def save_level_progress(level_number, commands_used, par, completed):
-    """Save progress for a level"""
-    init_session_progress()
-    level_key = str(level_number)
-    progress = get_level_progress(level_number)
-    
-    if completed:
-        progress['completed'] = True
-        
-        # Determine what type of completion this is
-        earned_star = commands_used <= par  # True for star, False for checkmark
-        
-        # Star/Checkmark logic:
-        # - Complete at or below par = star (⭐)
-        # - Complete above par = checkmark (✅)
-        # - Star can replace checkmark (upgrade)
-        # - Checkmark CANNOT replace star (no downgrade)
-        
-        if earned_star:
-            # Always set star if earned (replaces checkmark if present)
-            progress['has_star'] = True
-        else:
-            # Only set checkmark if we don't already have a star
-            if not progress.get('has_star', False):
-                progress['has_star'] = False
-        
-        # Update best score
-        if progress['best_commands'] is None or commands_used < progress['best_commands']:
-            progress['best_commands'] = commands_used
+    """
+    Save progress for a level
     
-    session['progress'][level_key] = progress
-    session.modified = True
-    return progress
+    Star/Checkmark logic:
+    - Complete at or below par = star (⭐)
+    - Complete above par = checkmark (✅)
+    - Star can replace checkmark (upgrade)
+    - Checkmark CANNOT replace star (no downgrade)
+    """
+    progress = init_session_progress()
+    level_progress = progress.record(level_number, commands_used, par, completed)
+    progress_store.get_store().save(session['sid'], progress)
+    return level_progress
 
 def get_progress_stats():
     """Get overall progress statistics"""
-    init_session_progress()
-    total_levels = len(grids.ALL_LEVELS)
-    total_stars = 0
-    levels_completed = 0
-    
-    for level_num in range(1, total_levels + 1):
-        progress = get_level_progress(level_num)
-        if progress.get('has_star', False):
-            total_stars += 1
-        if progress.get('completed', False):
-            levels_completed += 1
-    
-    return {
-        'total_stars': total_stars,
-        'levels_completed': levels_completed,
-        'total_levels': total_levels
-    }
+    return init_session_progress().stats()
 
-def get_completion_icon(level_number):
-    """Get completion icon for a level based on progress"""
-    progress = get_level_progress(level_number)
-    
+def level_icon(progress):
+    """Completion icon for a level progress dict"""
     if not progress.get('completed', False):
         return "⚪"  # Not completed
     
@@ -474,6 +1167,10 @@ def get_completion_icon(level_number):
     else:
         return "✅"  # Completed over par
 
+def get_completion_icon(level_number):
+    """Get completion icon for a level based on progress"""
+    return level_icon(get_level_progress(level_number))
+
 @app.route('/progress/<int:level_number>')
 def get_progress_route(level_number):
     """Get progress for a specific level"""
@@ -516,6 +1213,11 @@ def save_progress():
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics for /execute, merged across all web workers"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
 def health_check():
     """Health check endpoint for deployment platforms"""
@@ -524,6 +1226,11 @@ def health_check():
         'app': 'Bot Game',
         'version': '1.0.0',
         'levels': len(grids.ALL_LEVELS),
+        'code_cache': code_cache.stats(),
+        'result_cache': result_cache.stats(),
+        'jobs': job_queue.stats(),
+        'scheduler': execution_scheduler.stats(),
+        'tiles': tile_store.stats(),
         'features': [
             '15 progressive levels',
             'Star system',
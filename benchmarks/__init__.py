@@ -0,0 +1 @@
+"""Performance benchmarks for the game engine (run from the repository root, e.g. python -m benchmarks.step_kernel)"""
@@ -0,0 +1,98 @@
+"""
+Load test a running server with concurrent /execute requests
+
+Each client keeps its own session cookie and posts benchmarks.scaling's
+WALL_FOLLOWER program to the chosen levels, round robin. Per level it
+reports requests, successes, 429s (admission control, see scheduler),
+latency percentiles and the mean response size. To see how costs grow with
+grid area, serve generated levels and point the load test at them (raise
+the rate limits unless they are what you want to measure):
+
+    python level_generator.py --sizes 25 100 250 -o stress.pack
+    LEVEL_PACK=stress.pack SESSION_RATE=100 SESSION_BURST=100 IP_RATE=1000 IP_BURST=1000 gunicorn app:app ...
+    python -m benchmarks.loadtest --url http://localhost:8000 --clients 8 --requests 200
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+from benchmarks.scaling import WALL_FOLLOWER
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0
+
+
+def _client(url, levels, requests, frames, grid_format, results, lock):
+    """One client: a session of its own, posting to each level in turn"""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    for number in range(requests):
+        level = levels[number % len(levels)]
+        body = json.dumps({'code': WALL_FOLLOWER, 'level': level, 'frames': frames, 'grid_format': grid_format}).encode()
+        request = urllib.request.Request(f'{url}/execute', data=body, headers={'Content-Type': 'application/json'})
+        started = time.perf_counter()
+        try:
+            with opener.open(request) as response:
+                status, size = response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            status, size = e.code, len(e.read())
+            if status == 429:
+                # Back off as told, like a well-behaved client
+                time.sleep(float(e.headers.get('Retry-After', 1)))
+        except urllib.error.URLError:
+            status, size = None, 0
+        with lock:
+            results.setdefault(level, []).append((status, time.perf_counter() - started, size))
+
+
+def run(url, levels, clients=4, requests=50, frames='delta', grid_format='emoji'):
+    """{level: [(status, seconds, bytes), ...]} after `clients` clients made `requests` requests each"""
+    results, lock = {}, threading.Lock()
+    with ThreadPoolExecutor(clients) as pool:
+        for _ in range(clients):
+            pool.submit(_client, url, levels, requests, frames, grid_format, results, lock)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /execute on a running server")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--levels', nargs='+', type=int, help='Level numbers (default: every level the server has)')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent clients, each with its own session')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per client')
+    parser.add_argument('--frames', default='delta', help='Frame format to request')
+    parser.add_argument('--grid-format', default='emoji', help='Grid format to request')
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    levels = args.levels
+    if not levels:
+        with urllib.request.urlopen(f'{url}/levels') as response:
+            levels = [level['number'] for level in json.load(response)['levels']]
+
+    started = time.perf_counter()
+    results = run(url, levels, args.clients, args.requests, args.frames, args.grid_format)
+    elapsed = time.perf_counter() - started
+
+    print(f"{'level':>6s} {'requests':>9s} {'ok':>6s} {'429':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'mean bytes':>11s}")
+    total = 0
+    for level in sorted(results):
+        samples = results[level]
+        total += len(samples)
+        latencies = [seconds * 1000 for status, seconds, _ in samples if status == 200]
+        sizes = [size for status, _, size in samples if status == 200]
+        print(f"{level:6d} {len(samples):9d} {len(latencies):6d} {sum(status == 429 for status, _, _ in samples):6d} "
+              f"{_percentile(latencies, 0.5):9.1f} {_percentile(latencies, 0.95):9.1f} {_percentile(latencies, 0.99):9.1f} "
+              f"{sum(sizes) // max(len(sizes), 1):11d}")
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f}/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+How engine and response costs scale with grid area
+
+Generates one solvable level per size (see level_generator), serves them
+from a temporary level pack and reports, per size:
+
+    construct_us      Grid construction from nested rows
+    step_ns           One bot call (can_move, turns, move_forward) of a wall follower
+    pick_up_us        Collecting a key and resetting the grid
+    str_us            Bot.__str__ (one-off emoji render of the whole grid)
+    frame_delta_us    Capturing one frame in the 'delta' format
+    frame_full_us     Capturing one frame in the 'full' format (a rendered grid per frame)
+    grid_bytes        /grid response size with ?format=emoji and base64
+    execute_bytes     /execute response size for WALL_FOLLOWER with frames=delta and full
+                      ('-' if the run failed, e.g. the sandbox ran out of memory)
+
+Run from the repository root (add --csv for a table to chart):
+
+    python -m benchmarks.scaling --sizes 13 50 100 250 500
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import timeit
+
+import level_generator
+import levelpack
+from level_generator import parse_size
+from python_decoder import Bot, Grid, WinInterruption
+
+# Left-hand wall follower: explores any maze; used for /execute sizes and by benchmarks.loadtest
+WALL_FOLLOWER = (
+    "for _ in range(2000):\n"
+    "    bot.turn_left()\n"
+    "    while not bot.can_move():\n"
+    "        bot.turn_right()\n"
+    "    bot.move_forward()\n"
+)
+STEPS_PER_RUN = 1000
+FRAMES_PER_RUN = 200
+
+COLUMNS = ('size', 'area', 'construct_us', 'step_ns', 'pick_up_us', 'str_us', 'frame_delta_us', 'frame_full_us',
+           'grid_bytes_emoji', 'grid_bytes_base64', 'execute_bytes_delta', 'execute_bytes_full')
+
+
+def _best(func, repeat, number=None):
+    """Best seconds per call of func"""
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _walk(bot, calls):
+    """Make `calls` wall-follower calls, starting over whenever the bot wins"""
+    made = 0
+    while made < calls:
+        try:
+            bot.turn_left()
+            made += 1
+            while not bot.can_move():
+                bot.turn_right()
+                made += 2
+            bot.move_forward()
+            made += 2
+        except WinInterruption:
+            bot.i, bot.j = bot.start
+            bot.win_state = False
+            bot.grid.reset()
+
+
+def engine_costs(level, repeat):
+    """Engine timings for one level dict"""
+    def new_grid():
+        return Grid(level['data'], level['start_pos'], level['start_dir'], level['par'])
+
+    bot = Bot(new_grid())
+    bot.moves_limit = float('inf')
+    key_cell = next(iter(bot.grid.keys.key_bits), None)
+
+    def pick_up():
+        bot.pick_up(bot.grid.template[key_cell], divmod(key_cell, bot.grid.cols))
+        bot.grid.reset()
+
+    return {
+        'construct_us': _best(new_grid, repeat) * 1e6,
+        'step_ns': _best(lambda: _walk(bot, STEPS_PER_RUN), repeat) / STEPS_PER_RUN * 1e9,
+        'pick_up_us': _best(pick_up, repeat) * 1e6 if key_cell is not None else None,
+        'str_us': _best(bot.__str__, repeat) * 1e6,
+    }
+
+
+def frame_costs(app_module, level, repeat):
+    """Per-frame capture cost of AnimatedBot in the delta and full formats"""
+    costs = {}
+    for frame_format in ('delta', 'full'):
+        def capture():
+            bot = app_module.AnimatedBot(Grid(level['data'], level['start_pos'], level['start_dir'], level['par']),
+                                         frame_format)
+            for _ in range(FRAMES_PER_RUN):
+                bot.turn_left()
+                bot.capture_frame("Turn left")
+        costs[f'frame_{frame_format}_us'] = _best(capture, repeat, number=1) / FRAMES_PER_RUN * 1e6
+    return costs
+
+
+def response_sizes(app_module, level_number):
+    """Bytes of /grid and /execute responses for a level"""
+    client = app_module.app.test_client()
+    sizes = {}
+    for grid_format in ('emoji', 'base64'):
+        sizes[f'grid_bytes_{grid_format}'] = len(client.get(f'/grid?level={level_number}&format={grid_format}').data)
+    for frame_format in ('delta', 'full'):
+        response = client.post('/execute', json={'code': WALL_FOLLOWER, 'level': level_number, 'frames': frame_format})
+        # A run that failed (e.g. the sandbox ran out of memory building 'full' frames) has no size to report
+        failed = len(response.data) < 4096 and 'error' in response.get_json()
+        sizes[f'execute_bytes_{frame_format}'] = None if failed else len(response.data)
+    return sizes
+
+
+def run(sizes, seed=0, repeat=3):
+    """One result row (dict keyed by COLUMNS) per (rows, cols) size"""
+    levels = level_generator.generate_levels(sizes, seed)
+    pack = tempfile.NamedTemporaryFile(suffix='.pack', delete=False)
+    pack.close()
+    levelpack.write_pack(levels, pack.name)
+    # grids opens LEVEL_PACK on import, so point it at the generated levels first
+    os.environ['LEVEL_PACK'] = pack.name
+    # Failed runs are reported in the table; keep their tracebacks out of it
+    logging.disable(logging.ERROR)
+    import app as app_module
+    import scheduler
+    unlimited = 1e9
+    app_module.execution_scheduler = scheduler.Scheduler(session_rate=unlimited, session_burst=unlimited,
+                                                         ip_rate=unlimited, ip_burst=unlimited)
+    try:
+        rows = []
+        for number, ((height, width), level) in enumerate(zip(sizes, levels), 1):
+            row = {'size': f'{height}x{width}', 'area': height * width}
+            row.update(engine_costs(level, repeat))
+            row.update(frame_costs(app_module, level, repeat))
+            row.update(response_sizes(app_module, number))
+            rows.append(row)
+        return rows
+    finally:
+        os.unlink(pack.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling of engine and response costs with grid area")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(13, 13), (50, 50), (100, 100), (250, 250), (500, 500)],
+                        help='Grid sizes as N or ROWSxCOLS')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--csv', action='store_true', help='Print comma-separated values')
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.seed, args.repeat)
+    if args.csv:
+        print(','.join(COLUMNS))
+        for row in rows:
+            print(','.join('' if row[column] is None else f'{row[column]:.2f}' if isinstance(row[column], float)
+                           else str(row[column]) for column in COLUMNS))
+        return
+    print(' '.join(f'{column:>19s}' for column in COLUMNS))
+    for row in rows:
+        print(' '.join(f'{"-":>19s}' if row[column] is None else f'{row[column]:19.2f}' if isinstance(row[column], float)
+                       else f'{row[column]:>19}' for column in COLUMNS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Reference solutions for every level in grids.ALL_LEVELS, keyed by level number
+
+Shortest winning action sequences (fewest bot actions, not fewest commands),
+written the way a player would, with repeated actions folded into loops.
+"""
+
+SOLUTIONS = {
+    # Tutorial: First Steps
+    1: "for _ in range(3):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\n",
+    # Back to the Basics
+    2: "bot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\n",
+    # The Corner
+    3: "for _ in range(5):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_backward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\n",
+    # The Maze
+    4: "bot.turn_left()\nfor _ in range(4):\n    bot.move_backward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_backward()\n",
+    # Red Key Challenge
+    5: "bot.turn_left()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nfor _ in range(3):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(3):\n    bot.move_backward()\nbot.turn_left()\nbot.move_forward()\n",
+    # The Rocks
+    6: "bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(6):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\n",
+    # Spiral
+    7: "bot.turn_left()\nfor _ in range(8):\n    bot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(6):\n    bot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\n",
+    # The Trap
+    8: "bot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(3):\n    bot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\n",
+    # Key Hunt
+    9: "bot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(6):\n    bot.move_backward()\nbot.turn_left()\nfor _ in range(6):\n    bot.move_forward()\n",
+    # Double Keys
+    10: "for _ in range(6):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(6):\n    bot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(6):\n    bot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\n",
+    # Key Mania
+    11: "bot.turn_left()\nfor _ in range(7):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(3):\n    bot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(5):\n    bot.move_forward()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(3):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nbot.move_forward()\n",
+    # Key Sequence
+    12: "for _ in range(3):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(5):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(5):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(5):\n    bot.move_forward()\n",
+    # Algorithm Mastery
+    13: "bot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nfor _ in range(8):\n    bot.move_backward()\nbot.turn_left()\nfor _ in range(8):\n    bot.move_backward()\nfor _ in range(8):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(3):\n    bot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_backward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\n",
+    # Zappy Navigation
+    14: "bot.move_forward()\nbot.turn_left()\nfor _ in range(5):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(6):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nfor _ in range(3):\n    bot.move_forward()\nfor _ in range(3):\n    bot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(3):\n    bot.move_forward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\n",
+    # The Challenge
+    15: "for _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nfor _ in range(4):\n    bot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_backward()\nbot.move_backward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nfor _ in range(4):\n    bot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\nbot.turn_left()\nbot.move_forward()\nbot.move_forward()\n",
+}
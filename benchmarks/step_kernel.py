@@ -0,0 +1,82 @@
+"""
+Microbenchmark for the Bot step kernel
+
+Times the movement and sensing calls user code hammers in its loops:
+move_forward, move_backward, can_move and can_move_back, plus a mixed
+wall-follower loop. Run from the repository root:
+
+    python -m benchmarks.step_kernel [--repeat N]
+"""
+
+import argparse
+import timeit
+
+from python_decoder import Bot, Grid
+
+# Open 6x6 room with a zappy wall in one corner, so the sensing calls see every tile kind
+ROOM = [[1, 1, 1, 1, 1, 1, 1, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 0, 0, 0, 0, 2, 1],
+        [1, 0, 0, 0, 0, 0, 0, 1],
+        [1, 1, 1, 1, 1, 1, 1, 1]]
+CALLS_PER_RUN = 1000
+
+
+def new_bot():
+    bot = Bot(Grid(ROOM, (3, 3), 0, 0))
+    bot.moves_limit = float('inf')
+    return bot
+
+
+def shuttle(bot):
+    """Step forward and back inside the room"""
+    for _ in range(CALLS_PER_RUN // 2):
+        bot.move_forward()
+        bot.move_backward()
+
+
+def sense(bot):
+    for _ in range(CALLS_PER_RUN // 2):
+        bot.can_move()
+        bot.can_move_back()
+
+
+def wall_follower(bot):
+    """Typical user loop: move while possible, otherwise turn (can_move keeps it off the zappy wall)"""
+    for _ in range(CALLS_PER_RUN // 2):
+        if bot.can_move():
+            bot.move_forward()
+        else:
+            bot.turn_left()
+
+
+SCENARIOS = {
+    'move_forward+move_backward': shuttle,
+    'can_move+can_move_back': sense,
+    'wall_follower': wall_follower,
+}
+
+
+def run(repeat=5, number=200):
+    """Return {scenario: best nanoseconds per bot call}"""
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        bot = new_bot()
+        best = min(timeit.repeat(lambda: scenario(bot), repeat=repeat, number=number))
+        results[name] = best / (number * CALLS_PER_RUN) * 1e9
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for name, ns in run(args.repeat).items():
+        print(f"{name:30s} {ns:8.1f} ns/call")
+
+
+if __name__ == '__main__':
+    main()
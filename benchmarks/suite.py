@@ -0,0 +1,239 @@
+"""
+Benchmark suite for the engine, code analysis and HTTP paths
+
+Every benchmark is timed with timeit (best of --repeat runs) and reported in
+microseconds per call. Results can be saved as a JSON baseline and later
+runs compared against it; any benchmark slower than the baseline by more
+than --tolerance makes the run exit with status 1. Timings are only
+comparable on the same machine, so keep one baseline per machine/CI runner.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --save            # record benchmarks/baseline.json
+    python -m benchmarks.suite                   # compare against it
+    python -m benchmarks.suite --only execute    # benchmarks whose name contains 'execute'
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import timeit
+
+import grids
+from python_decoder import Grid, Bot, count_bot_commands
+from renderer import GridRenderer
+from benchmarks import step_kernel
+from benchmarks.solutions import SOLUTIONS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25
+
+# Worst case for the frame pipeline: as many actions as the move limit allows
+TEN_THOUSAND_MOVES = "for i in range(9999):\n    bot.turn_left()\n"
+
+# Largest level by cell count, used for the rendering benchmarks
+LARGEST_LEVEL = max(range(1, len(grids.ALL_LEVELS) + 1), key=lambda n: len(grids.get_template(n)))
+
+
+def _level_grid(level):
+    return Grid(level['data'], level['start_pos'], level['start_dir'], level['par'])
+
+
+def _key_level():
+    """First level with a key, and where its first key is"""
+    for number in range(1, len(grids.ALL_LEVELS) + 1):
+        grid = grids.create_grid(number)
+        if grid.keys.key_bits:
+            return number, next(iter(grid.keys.key_bits))
+    raise RuntimeError("No level has keys")
+
+
+def engine_benchmarks():
+    """name -> callable to time"""
+    levels = range(1, len(grids.ALL_LEVELS) + 1)
+    level_dicts = [grids.get_level(n) for n in levels]
+    benchmarks = {
+        'grid_construct_all_levels': lambda: [_level_grid(level) for level in level_dicts],
+        'grid_create_compiled_all_levels': lambda: [grids.create_grid(n) for n in levels],
+    }
+
+    reset_grid = grids.create_grid(LARGEST_LEVEL)
+    benchmarks['grid_reset'] = reset_grid.reset
+
+    # A room without an end tile (and no move limit), so the bot can walk forever
+    step_bot = step_kernel.new_bot()
+    benchmarks['bot_step_1000_calls'] = lambda: step_kernel.wall_follower(step_bot)
+
+    key_level, key_cell = _key_level()
+    key_grid = grids.create_grid(key_level)
+    key_bot = Bot(key_grid)
+    key_location = divmod(key_cell, key_grid.cols)
+    key_tile = key_grid.template[key_cell]
+
+    def pick_up():
+        key_bot.pick_up(key_tile, key_location)
+        key_grid.reset()
+    benchmarks['pick_up_and_reset'] = pick_up
+
+    render_bot = Bot(grids.create_grid(LARGEST_LEVEL))
+    benchmarks['bot_str_largest_level'] = render_bot.__str__
+
+    # A frame per turn, as AnimatedBot renders them in the 'full' format
+    renderer = GridRenderer(render_bot.grid)
+
+    def render_frames():
+        for direction in range(1000):
+            renderer.emoji(render_bot.i, render_bot.j, direction & 3)
+    benchmarks['render_incremental_1000_frames'] = render_frames
+    return benchmarks
+
+
+def analysis_benchmarks(app_module):
+    """Safety check and command counting over every reference solution"""
+    programs = list(SOLUTIONS.values())
+
+    def safety():
+        # Bypass the content-addressed cache so the analysis itself is timed
+        app_module.code_cache.clear()
+        for program in programs:
+            app_module.is_code_safe(program)
+
+    return {
+        'is_code_safe_all_solutions': safety,
+        'count_bot_commands_all_solutions': lambda: [count_bot_commands(p) for p in programs],
+    }
+
+
+def http_benchmarks(app_module):
+    """Full /execute round trips through the Flask test client"""
+    import scheduler
+    client = app_module.app.test_client()
+    # Keep the scheduler in the path but lift its rate limits, which a benchmark loop would hit at once
+    unlimited = 1e9
+    app_module.execution_scheduler = scheduler.Scheduler(session_rate=unlimited, session_burst=unlimited,
+                                                         ip_rate=unlimited, ip_burst=unlimited)
+
+    def execute(code, level, frames='delta', memo=False):
+        def run():
+            if not memo:
+                app_module.result_cache.clear()
+            result = client.post('/execute', json={'code': code, 'level': level, 'frames': frames}).get_json()
+            if not result.get('success') and code is not TEN_THOUSAND_MOVES:
+                raise RuntimeError(f"/execute failed on level {level}: {result}")
+        return run
+
+    benchmarks = {}
+    for number, program in SOLUTIONS.items():
+        benchmarks[f'execute_level_{number:02d}'] = execute(program, number)
+    benchmarks['execute_10000_moves_delta'] = execute(TEN_THOUSAND_MOVES, 1)
+    benchmarks['execute_10000_moves_headless'] = execute(TEN_THOUSAND_MOVES, 1, 'none')
+    benchmarks['execute_memoized_hit'] = execute(SOLUTIONS[1], 1, memo=True)
+    return benchmarks
+
+
+def check_solutions():
+    """Fail loudly if a reference solution no longer wins its level"""
+    from python_decoder import grade
+    for number, program in SOLUTIONS.items():
+        result = grade(program, grids.create_grid(number))
+        if not result.win_state:
+            raise SystemExit(f"Reference solution for level {number} does not win: {result}")
+
+
+def run(repeat=5, only=None, names=None):
+    """Return {benchmark name: best microseconds per call}, optionally for a subset of names"""
+    logging.disable(logging.WARNING)
+    import app as app_module
+
+    check_solutions()
+    benchmarks = {}
+    benchmarks.update(engine_benchmarks())
+    benchmarks.update(analysis_benchmarks(app_module))
+    benchmarks.update(http_benchmarks(app_module))
+
+    results = {}
+    for name, func in benchmarks.items():
+        if (only and only not in name) or (names is not None and name not in names):
+            continue
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number))
+        results[name] = best / number * 1e6
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print a comparison table and return the names that regressed"""
+    regressions = []
+    print(f"{'benchmark':36s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:36s} {'-':>12s} {current:10.2f}us {'new':>8s}")
+            continue
+        change = current / previous - 1
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:36s} {previous:10.2f}us {current:10.2f}us {change:+7.0%}{flag}")
+    return regressions
+
+
+def _environment():
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpu': platform.machine()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot Game benchmark suite")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown before failing, as a fraction (default 0.25)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='Only run benchmarks whose name contains this string')
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.only)
+
+    if args.save:
+        baseline = {}
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'environment': _environment(), 'results': baseline}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        for name, us in results.items():
+            print(f"{name:36s} {us:10.2f}us")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        for name, us in results.items():
+            print(f"{name:36s} {us:10.2f}us")
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+        return
+
+    with open(args.baseline) as f:
+        saved = json.load(f)
+    if saved.get('environment') != _environment():
+        print(f"Warning: baseline was recorded on {saved.get('environment')}, timings may not be comparable\n")
+    baseline = saved['results']
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        # Rule out a noisy moment before failing: time the slow ones again
+        print(f"\nRe-running {len(regressions)} slow benchmark(s) to confirm\n")
+        regressions = compare(run(args.repeat, names=set(regressions)), baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
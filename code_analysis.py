@@ -0,0 +1,208 @@
+"""
+Single-pass analysis of submitted bot programs
+
+analyze() parses a submission once and, in one walk over the AST, works out:
+- the safety verdict (blocked imports, dangerous names and attributes, __builtins__ access)
+- the exact number of bot commands written in the program
+- the sanitized program (imports other than math removed), compiled
+- basic program shape: loops, conditionals and node count
+- a fingerprint of the normalized program (comments and formatting ignored)
+
+The compiled program is metered: every loop iteration, function call and
+comprehension item calls METER_CHARGE (or goes through METER_ITERATE), so
+the run can be stopped once its instruction budget is spent (see
+python_decoder.ExecutionBudget). Both names must be in the globals the
+code runs with. User code cannot refer to them because dunder names are
+rejected.
+"""
+
+import ast
+import hashlib
+import logging
+import re
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Bot methods that count as commands towards a level's par
+BOT_COMMANDS = frozenset({
+    'move_forward', 'move_backward', 'turn_left', 'turn_right', 'can_move', 'can_move_back'
+})
+
+# Dangerous built-in functions and attributes that could cause harm
+DANGEROUS_NAMES = frozenset({
+    'exec', 'eval', '__import__', 'open', 'file', 'input', 'exit', 'quit',
+    'compile', 'globals', 'locals', 'vars', 'getattr', 'setattr', 'delattr',
+    'reload', 'breakpoint', '__builtins__', 'memoryview', 'bytearray'
+})
+
+DANGEROUS_MODULES = frozenset({
+    'os', 'sys', 'subprocess', 'socket', 'urllib', 'requests', 'http',
+    'ftplib', 'smtplib', 'ssl', 'pdb', '__main__', 'importlib',
+    'pickle', 'shelve', 'tempfile', 'shutil', 'glob'
+})
+
+# Imports kept in the sanitized program; any other import statement is dropped
+ALLOWED_IMPORTS = frozenset({'math'})
+
+# Additional checks on the raw source for obfuscated patterns
+DANGEROUS_PATTERNS = [
+    re.compile(r'__.*__'),  # Dunder methods
+    re.compile(r'\\x[0-9a-fA-F]{2}'),  # Hex escapes for obfuscation
+]
+
+# Calls and literals whose results can differ between processes (hash
+# randomization changes id()/hash() values and set iteration order)
+NONDETERMINISTIC_CALLS = frozenset({'hash', 'id', 'set', 'frozenset'})
+NONDETERMINISTIC_NODES = (ast.Set, ast.SetComp)
+
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While, ast.comprehension)
+CONDITIONAL_NODES = (ast.If, ast.IfExp)
+
+# Statement-list fields whose import statements may be stripped
+_BODY_FIELDS = ('body', 'orelse', 'finalbody')
+
+# Globals the metered program calls: METER_CHARGE() charges one step (and
+# returns None), METER_ITERATE(iterable) charges one step per item
+METER_CHARGE = '__charge__'
+METER_ITERATE = '__metered__'
+METERED_BODIES = (ast.For, ast.AsyncFor, ast.While, ast.FunctionDef, ast.AsyncFunctionDef)
+
+CodeAnalysis = namedtuple('CodeAnalysis', [
+    'safe',           # False if the code must not run
+    'reason',         # Why the code was rejected (None if safe)
+    'code_object',    # Compiled sanitized program (None if unsafe or it failed to compile)
+    'clean_code',     # Sanitized source, only kept when compilation failed so exec can report the error
+    'command_count',  # Bot command calls written in the program
+    'loops',
+    'conditionals',
+    'node_count',
+    'fingerprint',    # SHA-256 of the normalized sanitized AST (None if unsafe)
+    'deterministic'   # False if the outcome may vary between runs
+])
+
+
+def _unsafe(reason):
+    logger.warning(f"Blocked: {reason}")
+    return CodeAnalysis(False, reason, None, None, 0, 0, 0, 0, None, False)
+
+
+def _import_roots(node):
+    """Top-level module names an import statement refers to"""
+    if isinstance(node, ast.Import):
+        return [alias.name.split('.')[0] for alias in node.names]
+    return [node.module.split('.')[0]] if node.module else []
+
+
+def _is_bot_command(node):
+    """A zero-argument call of a bot command method, e.g. bot.move_forward()"""
+    return (isinstance(node.func, ast.Attribute) and node.func.attr in BOT_COMMANDS
+            and not node.args and not node.keywords)
+
+
+def _strip_imports(node):
+    """Drop non-allowed import statements from a node's statement lists"""
+    for field in _BODY_FIELDS:
+        body = getattr(node, field, None)
+        if not body or not isinstance(body, list):
+            continue
+        kept = [stmt for stmt in body
+                if not isinstance(stmt, (ast.Import, ast.ImportFrom))
+                or set(_import_roots(stmt)) <= ALLOWED_IMPORTS]
+        if len(kept) != len(body):
+            if not kept and field == 'body' and not isinstance(node, ast.Module):
+                # A block can't be empty
+                kept = [ast.copy_location(ast.Pass(), body[0])]
+            setattr(node, field, kept)
+
+
+def _meter(node):
+    """Charge the budget at the top of loop and function bodies, lambdas and comprehension items"""
+    if isinstance(node, METERED_BODIES):
+        charge = ast.Expr(ast.Call(ast.Name(METER_CHARGE, ast.Load()), [], []))
+        node.body.insert(0, ast.copy_location(charge, node.body[0]))
+    elif isinstance(node, ast.Lambda):
+        # `__charge__() or <body>` charges before the body runs
+        charge = ast.Call(ast.Name(METER_CHARGE, ast.Load()), [], [])
+        node.body = ast.copy_location(ast.BoolOp(ast.Or(), [charge, node.body]), node.body)
+    elif isinstance(node, ast.comprehension):
+        node.iter = ast.copy_location(ast.Call(ast.Name(METER_ITERATE, ast.Load()), [node.iter], []), node.iter)
+
+
+def analyze(code):
+    """
+    Analyze and sanitize a submission in a single AST traversal
+
+    Returns a CodeAnalysis. Syntax errors make the code unsafe, matching
+    the original is_code_safe behaviour.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        logger.warning(f"Syntax error in user code: {e}")
+        return CodeAnalysis(False, f"syntax error: {e}", None, None, 0, 0, 0, 0, None, False)
+
+    command_count = loops = conditionals = node_count = 0
+    deterministic = True
+    todo = [tree]
+    while todo:
+        node = todo.pop()
+        node_count += 1
+        # Children are queued before stripping, so dropped imports are still checked
+        todo.extend(ast.iter_child_nodes(node))
+
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for module_name in _import_roots(node):
+                if module_name in DANGEROUS_MODULES:
+                    return _unsafe(f"import {module_name}")
+        elif isinstance(node, ast.Name):
+            # Any reference, not just calls: `f = open` then `f(...)` is the same call
+            if node.id in DANGEROUS_NAMES:
+                return _unsafe(f"use of {node.id}")
+        elif isinstance(node, ast.Call):
+            if _is_bot_command(node):
+                command_count += 1
+            elif isinstance(node.func, ast.Name) and node.func.id in NONDETERMINISTIC_CALLS:
+                deterministic = False
+        elif isinstance(node, ast.Attribute):
+            if isinstance(node.value, ast.Name) and node.value.id == '__builtins__':
+                return _unsafe("access to __builtins__")
+            # e.g. builtins.open(...) or x.__import__(...)
+            if node.attr in DANGEROUS_NAMES:
+                return _unsafe(f"attribute .{node.attr}")
+        elif isinstance(node, LOOP_NODES):
+            loops += 1
+        elif isinstance(node, CONDITIONAL_NODES):
+            conditionals += 1
+        elif isinstance(node, NONDETERMINISTIC_NODES):
+            deterministic = False
+
+        _strip_imports(node)
+        # Children were queued above, so the inserted meter calls are never walked
+        _meter(node)
+
+    for pattern in DANGEROUS_PATTERNS:
+        if pattern.search(code):
+            return _unsafe(f"suspicious pattern {pattern.pattern}")
+
+    # ast.dump leaves out positions, so comments and formatting don't change it
+    fingerprint = hashlib.sha256(ast.dump(tree).encode('utf-8')).hexdigest()
+    ast.fix_missing_locations(tree)
+    try:
+        code_object = compile(tree, '<string>', 'exec')
+        clean_code = None
+    except SyntaxError:
+        # e.g. 'return' outside a function - let execution report it as usual
+        code_object = None
+        clean_code = ast.unparse(tree)
+    return CodeAnalysis(True, None, code_object, clean_code, command_count, loops, conditionals, node_count,
+                        fingerprint, deterministic)
+
+
+def count_commands(code):
+    """Number of bot command calls in a program (0 if it doesn't parse)"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return 0
+    return sum(1 for node in ast.walk(tree) if isinstance(node, ast.Call) and _is_bot_command(node))
@@ -0,0 +1,334 @@
+"""
+Source definitions of the default level pack
+
+These dicts are not imported by the game at runtime: the server reads levels
+from the pack file built from them (see levelpack). After editing a level or
+the DEFAULT_LEVELS order, rebuild the pack with `python levelpack.py build`.
+Tile types are listed in grids.py.
+"""
+
+LEVEL_1 = {
+    'name': 'Tutorial: First Steps',
+    'description': 'Learn to move forward and turn',
+    'data': [
+        [1,1,1,1,1],
+        [1,0,0,3,1],
+        [1,0,1,1,1],
+        [1,0,1,1,1],
+        [1,0,1,1,1]
+    ],
+    'start_pos': (4,1),
+    'start_dir': 0,
+    'par': 3,
+    'difficulty': 'Easy'
+}
+
+LEVEL_12 = {
+    'name': 'Back to the Basics',
+    'description': 'It\'s not that bad',
+    'data': [
+        [1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,1],
+        [1,1,1,0,1,1,1],
+        [1,0,0,0,0,0,1],
+        [1,0,1,1,1,0,1],
+        [1,0,0,0,0,0,0],
+        [1,1,1,1,1,1,3]
+    ],
+    'start_pos': (1,1),
+    'start_dir': 3,  # Facing right
+    'par': 4,
+    'difficulty': 'Easy'
+}
+
+LEVEL_2 = {
+    'name': 'The Corner',
+    'description': 'Navigate around corners',
+    'data': [
+        [1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,1],
+        [1,0,1,1,1,0,1],
+        [1,0,1,3,1,0,1],
+        [1,0,1,0,1,0,1],
+        [1,0,1,0,0,0,1],
+        [1,0,1,1,1,1,1]
+    ],
+    'start_pos': (6,1),
+    'start_dir': 0,
+    'par': 3,
+    'difficulty': 'Easy'
+}
+
+LEVEL_3 = {
+    'name': 'The Maze',
+    'description': 'Find your way through the maze',
+    'data': [
+        [1,1,1,1,1,1,1,1,1],
+        [1,0,0,0,1,0,0,0,1],
+        [1,0,1,0,1,0,1,0,1],
+        [1,0,1,0,0,0,1,0,1],
+        [1,0,1,1,1,1,1,0,1],
+        [1,0,0,0,0,0,0,0,1],
+        [1,1,1,1,1,0,1,1,1],
+        [1,3,0,0,0,0,0,0,1],
+        [1,1,1,1,1,1,1,1,1]
+    ],
+    'start_pos': (1,1),
+    'start_dir': 3,
+    'par': 4,
+    'difficulty': 'Medium'
+}
+
+LEVEL_4 = {
+    'name': 'Red Key Challenge',
+    'description': 'Collect the red key to pass through the red gate',
+    'data': [
+        [1,0,0,0,0,0,3],  # Row 0: wall, five empty, finish
+        [1,1,1,1,1,7,1],  # Row 1: walls with the red gate in column 5
+        [6,0,0,0,1,0,1],  # Row 2: red key, three empty, wall, empty, wall
+        [1,1,0,0,0,0,1],  # Row 3: wall, wall, four empty, wall
+        [0,0,0,1,1,1,1],  # Row 4: three empty, four walls
+        [0,1,1,1,1,1,1]   # Row 5: empty (bot start), six walls
+    ],
+    'start_pos': (5,0),
+    'start_dir': 3,  # Facing right
+    'par': 4,
+    'difficulty': 'Medium'
+}
+
+LEVEL_5 = {
+    'name': 'The Rocks',
+    'description': 'Find your way through the rough terrain',
+    'data': [
+        [1,1,0,0,0,1,1,1,1,1],
+        [1,1,0,1,0,0,1,1,1,1],
+        [1,0,0,1,1,0,0,1,1,1],
+        [1,0,0,1,1,1,0,0,1,1],
+        [1,0,1,1,1,1,1,0,0,1],
+        [1,0,1,1,1,1,1,1,0,1],
+        [0,0,1,1,1,1,1,1,0,0],
+        [1,0,0,1,1,1,1,1,1,0],
+        [1,0,0,1,1,3,1,0,0,0],
+        [1,1,0,0,1,0,0,0,1,1]
+    ],
+    'start_pos': (9,3),
+    'start_dir': 1,
+    'par': 4,
+    'difficulty': 'Medium'
+}
+
+
+LEVEL_6 = {
+    'name': 'Spiral',
+    'description': 'Navigate the spiral path',
+    'data': [
+        [1,1,1,1,1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,0,0,0,0,1],
+        [1,0,1,1,1,1,1,1,1,0,1],
+        [1,0,1,0,0,0,0,0,1,0,1],
+        [1,0,1,0,1,1,1,0,1,0,1],
+        [1,0,1,0,0,3,1,0,1,0,1],
+        [1,0,1,0,1,1,1,0,1,0,1],
+        [1,0,1,0,0,0,0,0,0,0,1],
+        [1,0,1,1,1,1,1,1,1,0,1],
+        [1,0,0,0,0,0,0,0,0,0,1],
+        [1,1,1,1,1,1,1,1,1,1,1]
+    ],
+    'start_pos': (9,1),
+    'start_dir': 0,
+    'par': 6,
+    'difficulty': 'Medium'
+}
+
+LEVEL_7 = {
+    'name': 'The Trap',
+    'description': 'Avoid the zappy walls!',
+    'data': [
+        [1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,1],
+        [1,0,2,2,2,0,1],
+        [1,0,2,0,0,0,1],
+        [1,0,2,3,2,0,1],
+        [1,0,2,2,2,0,1],
+        [1,0,0,0,0,0,1],
+        [1,1,1,1,1,1,1]
+    ],
+    'start_pos': (6,3),
+    'start_dir': 0,
+    'par': 4,
+    'difficulty': 'Medium'
+}
+
+LEVEL_8 = {
+    'name': 'Key Hunt',
+    'description': 'Collect the yellow key to open the gate',
+    'data': [
+        [1,1,1,1,1,1,1,1,1],
+        [1,0,0,0,1,0,0,4,1],
+        [1,0,1,0,1,0,1,0,1],
+        [1,0,1,0,0,0,1,0,1],
+        [1,0,1,1,1,1,1,0,1],
+        [1,0,0,0,0,0,0,0,1],
+        [1,5,1,1,1,1,1,0,1],
+        [1,3,5,0,0,0,0,0,1],
+        [1,1,1,1,1,1,1,1,1]
+    ],
+    'start_pos': (1,1),
+    'start_dir': 3,
+    'par': 6,
+    'difficulty': 'Hard'
+}
+
+LEVEL_9 = {
+    'name': 'Double Keys',
+    'description': 'Navigate through multiple locked gates',
+    'data': [
+        [1,1,1,1,1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,0,0,7,0,1],
+        [1,0,1,0,1,0,1,0,1,0,1],
+        [1,0,1,4,1,0,1,0,1,3,1],
+        [1,0,1,1,1,0,1,0,1,1,1],
+        [1,0,0,0,0,0,1,0,0,0,1],
+        [1,0,1,1,1,1,1,0,1,1,1],
+        [1,0,0,0,0,0,0,0,5,6,1],
+        [1,1,1,1,1,1,1,1,1,1,1]
+    ],
+    'start_pos': (7,1),
+    'start_dir': 0,
+    'par': 6,
+    'difficulty': 'Hard'
+}
+
+LEVEL_10 = {
+    'name': 'Key Mania',
+    'description': 'Collect all the keys without touching the zappy walls',
+    'data': [
+        [2,2,10,0,0,0,0 ,2,12,0],
+        [2,0, 0,2,2,2,0 ,2, 2,0],
+        [0,0, 0,0,2,0,0 ,0, 0,0],
+        [0,0, 2,0,0,0,2 ,2, 0,2],
+        [0,2, 2,0,2,2,2 ,0, 0,2],
+        [0,0, 0,0,0,2,0 ,0, 0,2],
+        [0,2, 0,2,8,0,0 ,2, 0,2],
+        [0,0, 0,2,2,0,0 ,2, 6,2],
+        [0,2, 0,2,0,0,2 ,2, 2,3],
+        [0,0, 0,2,0,0,11,13,7,9]
+    ],
+    'start_pos':(9,0),
+    'start_dir': 3,
+    'par': 5,
+    'difficulty': 'Expert'
+}
+
+LEVEL_11 = {
+    'name': 'The Challenge',
+    'description': 'The ultimate test of your skills',
+    'data': [
+        [1,1,1,1,1,1,1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,1,0,0,0,0,0,1],
+        [1,0,2,2,2,0,1,0,2,2,2,0,1],
+        [1,0,0,8,2,0,9,0,2,6,0,0,1],
+        [1,0,2,2,2,0,1,0,2,2,2,0,1],
+        [1,0,0,0,0,0,1,0,0,0,0,0,1],
+        [1,1,1,5,1,1,1,1,1,7,1,1,1],
+        [1,0,0,0,0,0,1,0,0,0,0,0,1],
+        [1,0,2,0,2,0,1,0,2,2,2,0,1],
+        [1,0,2,4,2,0,1,0,2,3,2,0,1],
+        [1,0,2,2,2,0,1,0,2,0,2,0,1],
+        [1,0,0,0,0,0,1,0,0,0,0,0,1],
+        [1,1,1,1,1,1,1,1,1,1,1,1,1]
+    ],
+    'start_pos': (11,1),
+    'start_dir': 0,
+    'par': 6,
+    'difficulty': 'Expert'
+}
+
+
+LEVEL_13 = {
+    'name': 'Key Sequence',
+    'description': 'Collect keys in the right order while avoiding zappy walls',
+    'data': [
+        [1,1,1,1,1,1,1,1,1],
+        [1,0,2,0,2,0,2,0,1],
+        [1,0,0,0,0,0,0,0,1],
+        [1,2,0,4,0,6,0,2,1],
+        [1,0,0,0,0,0,0,0,1],
+        [1,0,2,0,2,0,2,0,1],
+        [1,0,0,0,0,0,0,0,1],
+        [1,2,0,0,0,2,2,2,1],
+        [0,0,0,0,0,0,7,5,3]
+    ],
+    'start_pos': (8,0),
+    'start_dir': 3,  # Facing right
+    'par': 6,
+    'difficulty': 'Medium'
+}
+
+LEVEL_14 = {
+    'name': 'Algorithm Mastery',
+    'description': 'Use loops and conditions to navigate complex key-gate combinations',
+    'data': [
+        [1,1,1,1,1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,0,0,0,6,1],
+        [1,0,2,2,2,2,2,2,2,0,1],
+        [1,0,2,0,0,0,0,4,2,0,1],
+        [1,0,2,5,2,2,2,0,2,0,1],
+        [1,0,2,11,0,3,2,0,2,0,1],
+        [1,0,2,5,2,2,2,0,2,0,1],
+        [1,0,2,0,0,0,7,10,2,0,1],
+        [1,0,2,2,2,2,9,2,2,0,1],
+        [1,8,0,0,0,0,0,0,0,0,1],
+        [1,1,1,1,1,1,1,1,1,1,1]
+    ],
+    'start_pos': (9,5),
+    'start_dir': 0,  # Facing up
+    'par': 4,
+    'difficulty': 'Hard'
+}
+
+LEVEL_15 = {
+    'name': 'Zappy Navigation',
+    'description': 'Navigate through zappy walls to collect multiple keys',
+    'data': [
+        [1,1,1,1,1,1,1,1,1,1,1,1],
+        [1,0,0,0,0,0,0,0,0,0,0,1],
+        [1,0,2,2,0,0,0,0,2,2,0,1],
+        [1,0,2,4,2,0,0,2,6,2,0,1],
+        [1,0,0,9,2,0,0,2,9,0,0,1],
+        [1,0,2,0,2,0,0,2,0,2,0,1],
+        [1,0,2,0,0,0,0,0,0,2,0,1],
+        [1,0,2,2,0,0,0,0,2,2,0,1],
+        [1,0,0,0,0,5,7,0,0,0,0,1],
+        [1,2,2,0,2,0,10,2,0,2,2,1],
+        [1,8,0,0,2,0,0,2,0,11,3,1],
+        [1,1,1,1,1,1,1,1,1,1,1,1]
+    ],
+    'start_pos': (2,10),
+    'start_dir': 0,  # Facing up
+    'par': 6,
+    'difficulty': 'Hard'
+}
+
+
+# ============================================================================
+# LEVEL ORDER (level number = position in this list + 1)
+# ============================================================================
+
+DEFAULT_LEVELS = [
+    LEVEL_1,
+    LEVEL_12,
+    LEVEL_2,
+    LEVEL_3,
+    LEVEL_4,
+    LEVEL_5,
+    LEVEL_6,
+    LEVEL_7,
+    LEVEL_8,
+    LEVEL_9,
+    LEVEL_10,
+    LEVEL_13,
+    LEVEL_14,
+    LEVEL_15,
+    LEVEL_11,
+]
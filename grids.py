@@ -1,5 +1,5 @@
 """
-Grid definitions for all levels in the Bot Game
+Levels of the Bot Game, read from a level pack (see levelpack)
 
 Tile types:
 0 = Blank tile (walkable)
@@ -18,337 +18,21 @@ Tile types:
 13 = Purple gate
 """
 
-from python_decoder import Grid
-
-# ============================================================================
-# LEVEL DEFINITIONS
-# ============================================================================
-
-LEVEL_1 = {
-    'name': 'Tutorial: First Steps',
-    'description': 'Learn to move forward and turn',
-    'data': [
-        [1,1,1,1,1],
-        [1,0,0,3,1],
-        [1,0,1,1,1],
-        [1,0,1,1,1],
-        [1,0,1,1,1]
-    ],
-    'start_pos': (4,1),
-    'start_dir': 0,
-    'par': 3,
-    'difficulty': 'Easy'
-}
-
-LEVEL_12 = {
-    'name': 'Back to the Basics',
-    'description': 'It\'s not that bad',
-    'data': [
-        [1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,1],
-        [1,1,1,0,1,1,1],
-        [1,0,0,0,0,0,1],
-        [1,0,1,1,1,0,1],
-        [1,0,0,0,0,0,0],
-        [1,1,1,1,1,1,3]
-    ],
-    'start_pos': (1,1),
-    'start_dir': 3,  # Facing right
-    'par': 4,
-    'difficulty': 'Easy'
-}
-
-LEVEL_2 = {
-    'name': 'The Corner',
-    'description': 'Navigate around corners',
-    'data': [
-        [1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,1],
-        [1,0,1,1,1,0,1],
-        [1,0,1,3,1,0,1],
-        [1,0,1,0,1,0,1],
-        [1,0,1,0,0,0,1],
-        [1,0,1,1,1,1,1]
-    ],
-    'start_pos': (6,1),
-    'start_dir': 0,
-    'par': 3,
-    'difficulty': 'Easy'
-}
-
-LEVEL_3 = {
-    'name': 'The Maze',
-    'description': 'Find your way through the maze',
-    'data': [
-        [1,1,1,1,1,1,1,1,1],
-        [1,0,0,0,1,0,0,0,1],
-        [1,0,1,0,1,0,1,0,1],
-        [1,0,1,0,0,0,1,0,1],
-        [1,0,1,1,1,1,1,0,1],
-        [1,0,0,0,0,0,0,0,1],
-        [1,1,1,1,1,0,1,1,1],
-        [1,3,0,0,0,0,0,0,1],
-        [1,1,1,1,1,1,1,1,1]
-    ],
-    'start_pos': (1,1),
-    'start_dir': 3,
-    'par': 4,
-    'difficulty': 'Medium'
-}
-
-LEVEL_4 = {
-    'name': 'Red Key Challenge',
-    'description': 'Collect the red key to pass through the red gate',
-    'data': [
-        [1,0,0,0,0,0,3],  # Row 0: wall, empty, empty, empty, empty, empty, red gate
-        [1,1,1,1,1,7,1],  # Row 1: all walls
-        [6,0,0,0,1,0,1],  # Row 2: wall, red key, wall, empty, wall, empty, wall
-        [1,1,0,0,0,0,1],  # Row 3: wall, empty, wall, empty, wall, empty, wall
-        [0,0,0,1,1,1,1],  # Row 4: wall, empty, wall, empty, wall, empty, wall
-        [0,1,1,1,1,1,1]   # Row 5: empty (bot start), wall, empty path, wall
-    ],
-    'start_pos': (5,0),
-    'start_dir': 3,  # Facing right
-    'par': 4,
-    'difficulty': 'Medium'
-}
-
-LEVEL_5 = {
-    'name': 'The Rocks',
-    'description': 'Find your way through the rough terrain',
-    'data': [
-        [1,1,0,0,0,1,1,1,1,1],
-        [1,1,0,1,0,0,1,1,1,1],
-        [1,0,0,1,1,0,0,1,1,1],
-        [1,0,0,1,1,1,0,0,1,1],
-        [1,0,1,1,1,1,1,0,0,1],
-        [1,0,1,1,1,1,1,1,0,1],
-        [0,0,1,1,1,1,1,1,0,0],
-        [1,0,0,1,1,1,1,1,1,0],
-        [1,0,0,1,1,3,1,0,0,0],
-        [1,1,0,0,1,0,0,0,1,1]
-    ],
-    'start_pos': (9,3),
-    'start_dir': 1,
-    'par': 4,
-    'difficulty': 'Medium'
-}
-
-
-LEVEL_6 = {
-    'name': 'Spiral',
-    'description': 'Navigate the spiral path',
-    'data': [
-        [1,1,1,1,1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,0,0,0,0,1],
-        [1,0,1,1,1,1,1,1,1,0,1],
-        [1,0,1,0,0,0,0,0,1,0,1],
-        [1,0,1,0,1,1,1,0,1,0,1],
-        [1,0,1,0,0,3,1,0,1,0,1],
-        [1,0,1,0,1,1,1,0,1,0,1],
-        [1,0,1,0,0,0,0,0,0,0,1],
-        [1,0,1,1,1,1,1,1,1,0,1],
-        [1,0,0,0,0,0,0,0,0,0,1],
-        [1,1,1,1,1,1,1,1,1,1,1]
-    ],
-    'start_pos': (9,1),
-    'start_dir': 0,
-    'par': 6,
-    'difficulty': 'Medium'
-}
-
-LEVEL_7 = {
-    'name': 'The Trap',
-    'description': 'Avoid the zappy walls!',
-    'data': [
-        [1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,1],
-        [1,0,2,2,2,0,1],
-        [1,0,2,0,0,0,1],
-        [1,0,2,3,2,0,1],
-        [1,0,2,2,2,0,1],
-        [1,0,0,0,0,0,1],
-        [1,1,1,1,1,1,1]
-    ],
-    'start_pos': (6,3),
-    'start_dir': 0,
-    'par': 4,
-    'difficulty': 'Medium'
-}
-
-LEVEL_8 = {
-    'name': 'Key Hunt',
-    'description': 'Collect the yellow key to open the gate',
-    'data': [
-        [1,1,1,1,1,1,1,1,1],
-        [1,0,0,0,1,0,0,4,1],
-        [1,0,1,0,1,0,1,0,1],
-        [1,0,1,0,0,0,1,0,1],
-        [1,0,1,1,1,1,1,0,1],
-        [1,0,0,0,0,0,0,0,1],
-        [1,5,1,1,1,1,1,0,1],
-        [1,3,5,0,0,0,0,0,1],
-        [1,1,1,1,1,1,1,1,1]
-    ],
-    'start_pos': (1,1),
-    'start_dir': 3,
-    'par': 6,
-    'difficulty': 'Hard'
-}
-
-LEVEL_9 = {
-    'name': 'Double Keys',
-    'description': 'Navigate through multiple locked gates',
-    'data': [
-        [1,1,1,1,1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,0,0,7,0,1],
-        [1,0,1,0,1,0,1,0,1,0,1],
-        [1,0,1,4,1,0,1,0,1,3,1],
-        [1,0,1,1,1,0,1,0,1,1,1],
-        [1,0,0,0,0,0,1,0,0,0,1],
-        [1,0,1,1,1,1,1,0,1,1,1],
-        [1,0,0,0,0,0,0,0,5,6,1],
-        [1,1,1,1,1,1,1,1,1,1,1]
-    ],
-    'start_pos': (7,1),
-    'start_dir': 0,
-    'par': 6,
-    'difficulty': 'Hard'
-}
-
-LEVEL_10 = {
-    'name': 'Key Mania',
-    'description': 'Collect all the keys without touching the zappy walls',
-    'data': [
-        [2,2,10,0,0,0,0 ,2,12,0],
-        [2,0, 0,2,2,2,0 ,2, 2,0],
-        [0,0, 0,0,2,0,0 ,0, 0,0],
-        [0,0, 2,0,0,0,2 ,2, 0,2],
-        [0,2, 2,0,2,2,2 ,0, 0,2],
-        [0,0, 0,0,0,2,0 ,0, 0,2],
-        [0,2, 0,2,8,0,0 ,2, 0,2],
-        [0,0, 0,2,2,0,0 ,2, 6,2],
-        [0,2, 0,2,0,0,2 ,2, 2,3],
-        [0,0, 0,2,0,0,11,13,7,9]
-    ],
-    'start_pos':(9,0),
-    'start_dir': 3,
-    'par': 5,
-    'difficulty': 'Expert'
-}
-
-LEVEL_11 = {
-    'name': 'The Challenge',
-    'description': 'The ultimate test of your skills',
-    'data': [
-        [1,1,1,1,1,1,1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,1,0,0,0,0,0,1],
-        [1,0,2,2,2,0,1,0,2,2,2,0,1],
-        [1,0,0,8,2,0,9,0,2,6,0,0,1],
-        [1,0,2,2,2,0,1,0,2,2,2,0,1],
-        [1,0,0,0,0,0,1,0,0,0,0,0,1],
-        [1,1,1,5,1,1,1,1,1,7,1,1,1],
-        [1,0,0,0,0,0,1,0,0,0,0,0,1],
-        [1,0,2,0,2,0,1,0,2,2,2,0,1],
-        [1,0,2,4,2,0,1,0,2,3,2,0,1],
-        [1,0,2,2,2,0,1,0,2,0,2,0,1],
-        [1,0,0,0,0,0,1,0,0,0,0,0,1],
-        [1,1,1,1,1,1,1,1,1,1,1,1,1]
-    ],
-    'start_pos': (11,1),
-    'start_dir': 0,
-    'par': 6,
-    'difficulty': 'Expert'
-}
+import os
 
+import levelpack
+from python_decoder import Grid, Bot, EXECUTION_BUDGET
 
-LEVEL_13 = {
-    'name': 'Key Sequence',
-    'description': 'Collect keys in the right order while avoiding zappy walls',
-    'data': [
-        [1,1,1,1,1,1,1,1,1],
-        [1,0,2,0,2,0,2,0,1],
-        [1,0,0,0,0,0,0,0,1],
-        [1,2,0,4,0,6,0,2,1],
-        [1,0,0,0,0,0,0,0,1],
-        [1,0,2,0,2,0,2,0,1],
-        [1,0,0,0,0,0,0,0,1],
-        [1,2,0,0,0,2,2,2,1],
-        [0,0,0,0,0,0,7,5,3]
-    ],
-    'start_pos': (8,0),
-    'start_dir': 3,  # Facing right
-    'par': 6,
-    'difficulty': 'Medium'
-}
-
-LEVEL_14 = {
-    'name': 'Algorithm Mastery',
-    'description': 'Use loops and conditions to navigate complex key-gate combinations',
-    'data': [
-        [1,1,1,1,1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,0,0,0,6,1],
-        [1,0,2,2,2,2,2,2,2,0,1],
-        [1,0,2,0,0,0,0,4,2,0,1],
-        [1,0,2,5,2,2,2,0,2,0,1],
-        [1,0,2,11,0,3,2,0,2,0,1],
-        [1,0,2,5,2,2,2,0,2,0,1],
-        [1,0,2,0,0,0,7,10,2,0,1],
-        [1,0,2,2,2,2,9,2,2,0,1],
-        [1,8,0,0,0,0,0,0,0,0,1],
-        [1,1,1,1,1,1,1,1,1,1,1]
-    ],
-    'start_pos': (9,5),
-    'start_dir': 0,  # Facing up
-    'par': 4,
-    'difficulty': 'Hard'
-}
-
-LEVEL_15 = {
-    'name': 'Zappy Navigation',
-    'description': 'Navigate through zappy walls to collect multiple keys',
-    'data': [
-        [1,1,1,1,1,1,1,1,1,1,1,1],
-        [1,0,0,0,0,0,0,0,0,0,0,1],
-        [1,0,2,2,0,0,0,0,2,2,0,1],
-        [1,0,2,4,2,0,0,2,6,2,0,1],
-        [1,0,0,9,2,0,0,2,9,0,0,1],
-        [1,0,2,0,2,0,0,2,0,2,0,1],
-        [1,0,2,0,0,0,0,0,0,2,0,1],
-        [1,0,2,2,0,0,0,0,2,2,0,1],
-        [1,0,0,0,0,5,7,0,0,0,0,1],
-        [1,2,2,0,2,0,10,2,0,2,2,1],
-        [1,8,0,0,2,0,0,2,0,11,3,1],
-        [1,1,1,1,1,1,1,1,1,1,1,1]
-    ],
-    'start_pos': (2,10),
-    'start_dir': 0,  # Facing up
-    'par': 6,
-    'difficulty': 'Hard'
-}
-
+# Level pack the game serves (see levelpack); the default pack is built from default_levels.py
+LEVEL_PACK = os.environ.get('LEVEL_PACK', levelpack.DEFAULT_PACK)
 
 # ============================================================================
 # LEVEL REGISTRY
 # ============================================================================
 
-ALL_LEVELS = [
-    LEVEL_1,
-    LEVEL_12,
-    LEVEL_2,
-    LEVEL_3,
-    LEVEL_4,
-    LEVEL_5,
-    LEVEL_6,
-    LEVEL_7,
-    LEVEL_8,
-    LEVEL_9,
-    LEVEL_10,
-    LEVEL_13,
-    LEVEL_14,
-    LEVEL_15,
-    LEVEL_11,
-]
+# Sequence of level dicts in level order; opening the pack only reads its header
+ALL_LEVELS = levelpack.LevelPack(LEVEL_PACK)
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -369,6 +53,114 @@ def get_level(level_number):
     
     return ALL_LEVELS[level_number - 1]
 
+def get_record(level_number):
+    """
+    Get the packed form of a level, read from the level pack
+    
+    Args:
+        level_number (int): The level number (1-indexed)
+    
+    Returns:
+        levelpack.LevelRecord: Tiles, start position, par, budget and metadata
+    """
+    if level_number < 1 or level_number > len(ALL_LEVELS):
+        raise ValueError(f"Level {level_number} does not exist. Available levels: 1-{len(ALL_LEVELS)}")
+    
+    return ALL_LEVELS.record(level_number - 1)
+
+class CompiledLevel:
+    """
+    A level prepared once per process
+
+    Holds the immutable tile template shared by every Grid of the level, the
+    rendered initial grid (bot at its start position) and the level info, so
+    read endpoints never have to rebuild them.
+    """
+    __slots__ = ('number', 'template', 'cols', 'start_pos', 'start_dir', 'par', 'budget', 'rows', 'grid_state', 'level_info')
+
+    def __init__(self, level_number, record):
+        self.number = level_number
+        self.template = record.tiles
+        self.cols = record.cols
+        self.rows = record.rows
+        self.start_pos = record.start_pos
+        self.start_dir = record.start_dir
+        self.par = record.par
+        # Optional per-level instruction budget (see python_decoder.ExecutionBudget)
+        self.budget = record.budget or EXECUTION_BUDGET
+        self.grid_state = str(Bot(self.new_grid()))
+        self.level_info = get_cached_level_info(level_number, record)
+
+    def new_grid(self):
+        """Create a fresh Grid backed by the shared template"""
+        return Grid.from_template(
+            self.template,
+            cols=self.cols,
+            start_pos=self.start_pos,
+            start_dir=self.start_dir,
+            par=self.par
+        )
+
+def level_info(level_number, record):
+    """Level info dict (name, description, difficulty, par, size) for a pack record"""
+    return {
+        'number': level_number,
+        'name': record.metadata['name'],
+        'description': record.metadata['description'],
+        'difficulty': record.metadata['difficulty'],
+        'par': record.par,
+        'size': f"{record.rows}x{record.cols}"
+    }
+
+# Process-wide cache of level info dicts, so the pack's JSON metadata is decoded once per level
+_level_infos = {}
+
+def get_cached_level_info(level_number, record=None):
+    """
+    Get the shared level info dict of a level, decoding its metadata on first use
+    
+    Args:
+        level_number (int): The level number (1-indexed)
+        record (levelpack.LevelRecord): The level's record, if already read
+    
+    Returns:
+        dict: Level information shared by every caller (copy it before changing it)
+    """
+    info = _level_infos.get(level_number)
+    if info is None:
+        info = _level_infos[level_number] = level_info(level_number, record or get_record(level_number))
+    return info
+
+# Process-wide cache of compiled levels, filled the first time each level is used
+_compiled_levels = {}
+
+def get_compiled_level(level_number):
+    """
+    Get the compiled form of a level, building it on first use
+    
+    Args:
+        level_number (int): The level number (1-15)
+    
+    Returns:
+        CompiledLevel: Template, initial grid state and level info
+    """
+    compiled = _compiled_levels.get(level_number)
+    if compiled is None:
+        compiled = _compiled_levels[level_number] = CompiledLevel(level_number, get_record(level_number))
+    return compiled
+
+def get_template(level_number):
+    """
+    Get the immutable tile template for a level
+    
+    Args:
+        level_number (int): The level number (1-15)
+    
+    Returns:
+        bytes: Row-major tile types, one byte per cell
+    """
+    return get_compiled_level(level_number).template
+
 def create_grid(level_number):
     """
     Create a Grid object for a specific level
@@ -379,13 +171,7 @@ def create_grid(level_number):
     Returns:
         Grid: A Grid object ready for gameplay
     """
-    level = get_level(level_number)
-    return Grid(
-        data=level['data'],
-        start_pos=level['start_pos'],
-        start_dir=level['start_dir'],
-        par=level['par']
-    )
+    return get_compiled_level(level_number).new_grid()
 
 def get_level_info(level_number):
     """
@@ -397,15 +183,7 @@ def get_level_info(level_number):
     Returns:
         dict: Level information (name, description, difficulty, par)
     """
-    level = get_level(level_number)
-    return {
-        'number': level_number,
-        'name': level['name'],
-        'description': level['description'],
-        'difficulty': level['difficulty'],
-        'par': level['par'],
-        'size': f"{len(level['data'])}x{len(level['data'][0])}"
-    }
+    return dict(get_cached_level_info(level_number))
 
 def list_all_levels():
     """
@@ -414,7 +192,7 @@ def list_all_levels():
     Returns:
         list: List of level information dictionaries
     """
-    return [get_level_info(i + 1) for i in range(len(ALL_LEVELS))]
+    return [dict(get_cached_level_info(number)) for number in range(1, len(ALL_LEVELS) + 1)]
 
 def get_levels_by_difficulty(difficulty):
     """
@@ -426,13 +204,16 @@ def get_levels_by_difficulty(difficulty):
     Returns:
         list: List of level numbers matching the difficulty
     """
-    return [i + 1 for i, level in enumerate(ALL_LEVELS) if level['difficulty'] == difficulty]
+    return [number for number in range(1, len(ALL_LEVELS) + 1)
+            if get_cached_level_info(number)['difficulty'] == difficulty]
 
 # ============================================================================
 # TESTING
 # ============================================================================
 
 if __name__ == "__main__":
+    from solver import solve_level
+    
     print("=" * 60)
     print("BOT GAME - LEVEL CATALOG")
     print("=" * 60)
@@ -444,6 +225,8 @@ if __name__ == "__main__":
         print(f"  Difficulty: {level_info['difficulty']}")
         print(f"  Grid Size: {level_info['size']}")
         print(f"  Par: {level_info['par']} commands")
+        solution = solve_level(level_info['number'])
+        print(f"  Shortest route: {solution.actions} actions" if solution.solvable else "  UNSOLVABLE")
         print()
     
     print("=" * 60)
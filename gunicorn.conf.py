@@ -0,0 +1,31 @@
+"""
+Gunicorn settings, read automatically from the working directory (see Procfile)
+
+Workers share /metrics through METRICS_DIR (see metrics.py). The directory
+must hold the snapshots of this server only, so every start gets a fresh
+one, or the configured one is emptied, before any worker is forked.
+"""
+
+import glob
+import os
+import shutil
+import tempfile
+
+# Set once per master process; a reload (SIGHUP) reads this file again and must keep the counters
+_STARTED_BY = 'BOT_GAME_METRICS_MASTER'
+_TEMPORARY = 'BOT_GAME_METRICS_TEMPORARY'
+
+if os.environ.get(_STARTED_BY) != str(os.getpid()):
+    if os.environ.get('METRICS_DIR'):
+        os.makedirs(os.environ['METRICS_DIR'], exist_ok=True)
+        for stale in glob.glob(os.path.join(os.environ['METRICS_DIR'], 'metrics-*.json')):
+            os.remove(stale)
+    else:
+        os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='bot-game-metrics-')
+        os.environ[_TEMPORARY] = '1'
+    os.environ[_STARTED_BY] = str(os.getpid())
+
+
+def on_exit(server):
+    if os.environ.get(_TEMPORARY):
+        shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
@@ -0,0 +1,180 @@
+"""
+Asynchronous execution jobs with a bounded queue
+
+POST /jobs puts a submission on a bounded queue and answers at once with a
+job ID; a small pool of job threads (each waiting on one sandbox run) works
+through the queue, cheapest expected run first (see scheduler), and
+GET /jobs/<id> polls or long-polls for the result.
+When the queue is full, submit() raises QueueFull with a Retry-After
+estimate instead of letting requests pile up on the web workers.
+
+Jobs live in the web process that accepted them, so polls must reach the
+same process: run a single gthread worker (see Procfile), which also keeps
+/health and static pages responsive while runs are in progress.
+
+Environment variables:
+    JOB_WORKERS        Jobs run at the same time per web process (default: SANDBOX_WORKERS)
+    JOB_QUEUE_SIZE     Jobs waiting to run before POST /jobs answers 429 (default 32)
+    JOB_RESULT_TTL     Seconds a finished job's result is kept for polling (default 300)
+    JOB_MAX_WAIT       Longest long-poll allowed by GET /jobs/<id>?wait= in seconds (default 25)
+"""
+
+import logging
+import math
+import os
+import queue
+import secrets
+import threading
+import time
+from itertools import count
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', os.environ.get('SANDBOX_WORKERS', 2)))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 32))
+JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 300))
+JOB_MAX_WAIT = float(os.environ.get('JOB_MAX_WAIT', 25))
+
+# Bounds of the Retry-After estimate (seconds)
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+
+class QueueFull(Exception):
+    """The job queue is full; retry_after is a suggested wait in seconds"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    """One queued execution and, once finished, its result"""
+    __slots__ = ('id', 'args', 'kwargs', 'status', 'result', 'created', 'started', 'finished', '_done')
+
+    def __init__(self, args, kwargs):
+        self.id = secrets.token_urlsafe(16)
+        self.args = args
+        self.kwargs = kwargs
+        self.status = 'queued'  # queued -> running -> done
+        self.result = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._done = threading.Event()
+
+    def wait(self, timeout):
+        """Block until the job is done or timeout seconds pass; True if done"""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        payload = {'job_id': self.id, 'status': self.status}
+        if self.started is not None:
+            payload['queued_seconds'] = round(self.started - self.created, 3)
+        if self.finished is not None:
+            payload['run_seconds'] = round(self.finished - self.started, 3)
+            payload['result'] = self.result
+        return payload
+
+
+class JobQueue:
+    """Bounded priority queue of jobs served by dedicated threads calling run(*args, **kwargs)"""
+
+    def __init__(self, run, workers=JOB_WORKERS, size=JOB_QUEUE_SIZE, ttl=JOB_RESULT_TTL):
+        self.run = run
+        self.workers = workers
+        self.size = size
+        self.ttl = ttl
+        self._queue = queue.PriorityQueue(maxsize=size)  # (priority, sequence, job)
+        self._sequence = count()  # FIFO among equal priorities
+        self._jobs = {}  # id -> Job, until ttl seconds after it finished
+        self._lock = threading.Lock()
+        self._pid = None
+        self._average_seconds = 1.0  # Moving average of run times, for Retry-After
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _start(self):
+        """Start the job threads in this process (again after a fork)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Threads don't survive fork (e.g. gunicorn --preload); start fresh ones
+            self._pid = os.getpid()
+            self._queue = queue.PriorityQueue(maxsize=self.size)
+            self._jobs = {}
+            for number in range(self.workers):
+                threading.Thread(target=self._work, name=f'job-{number}', daemon=True).start()
+
+    def retry_after(self):
+        """Seconds until a queue slot is likely to free up"""
+        waiting = self._queue.qsize() + 1
+        estimate = math.ceil(self._average_seconds * waiting / max(self.workers, 1))
+        return min(max(estimate, MIN_RETRY_AFTER), MAX_RETRY_AFTER)
+
+    def submit(self, *args, priority=0, **kwargs):
+        """Queue run(*args, **kwargs), lower priority first; returns the Job or raises QueueFull"""
+        self._start()
+        self._expire()
+        job = Job(args, kwargs)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), job))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                self.rejected += 1
+            metrics.registry.inc('botgame_scheduler_rejections_total', {'reason': 'queue_full'})
+            raise QueueFull(self.retry_after())
+        metrics.registry.set('botgame_jobs_queued', {}, self._queue.qsize())
+        return job
+
+    def get(self, job_id):
+        """The job with this ID, or None if it is unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and job.finished < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            metrics.registry.set('botgame_jobs_queued', {}, self._queue.qsize())
+            job.started = time.time()
+            job.status = 'running'
+            with self._lock:
+                self.running += 1
+            try:
+                job.result = self.run(*job.args, **job.kwargs)
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {type(e).__name__}: {e}", exc_info=True)
+                job.result = {'success': False, 'error': 'A server error occurred. Please try again later.'}
+            job.finished = time.time()
+            job.args = job.kwargs = None  # Don't keep the submitted code around with the result
+            job.status = 'done'
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * (job.finished - job.started)
+            job._done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'running': self.running,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'workers': self.workers,
+                'capacity': self.size
+            }
@@ -0,0 +1,195 @@
+"""
+Seeded generator of large, solvable levels for scale and stress testing
+
+generate_level(rows, cols, seed) returns a level dict in the shape of
+default_levels.py. The same arguments always give the same level.
+
+1. A maze is carved through the odd cells by a randomized depth-first
+   search, so every open cell is reachable from the start (1, 1).
+2. With probability `loops`, walls between two corridors are knocked out,
+   so there is more than one way around.
+3. The end tile goes on the open cell farthest from the start.
+4. Up to five gates of distinct colors are placed on the start-to-end
+   path. Each gate's key goes on a cell that can be reached with only the
+   earlier gates open, so the key chain can always be followed.
+5. With probability `zappy`, interior walls become zappy walls. Walls are
+   never walkable, so this cannot cut a route.
+
+Each step preserves a route from the start to the end, so every generated
+level is solvable; verify() checks it with solver.solve.
+
+Write a pack of generated levels to serve (LEVEL_PACK=stress.pack) or to
+load-test against:
+
+    python level_generator.py --sizes 25 100 500 --seed 1 -o stress.pack [--verify]
+"""
+
+import argparse
+import random
+import sys
+from collections import deque
+
+# Key tiles in color order; a key's gate is key + 1
+KEY_TILES = (4, 6, 8, 10, 12)
+END_TILE = 3
+# Generated levels are for stress tests, not for stars; any reasonable program earns one
+GENERATED_PAR = 10
+MIN_SIZE = 5
+
+
+def _carve(data, rows, cols, rng):
+    """Open a perfect maze through the odd cells, starting at (1, 1)"""
+    start = cols + 1
+    data[start] = 0
+    stack = [start]
+    while stack:
+        cell = stack[-1]
+        i, j = divmod(cell, cols)
+        options = []
+        for di, dj in ((0, 2), (0, -2), (2, 0), (-2, 0)):
+            ni, nj = i + di, j + dj
+            if 1 <= ni <= rows - 2 and 1 <= nj <= cols - 2 and data[ni * cols + nj] == 1:
+                options.append((ni * cols + nj, (i + di // 2) * cols + j + dj // 2))
+        if not options:
+            stack.pop()
+            continue
+        nxt, between = rng.choice(options)
+        data[between] = data[nxt] = 0
+        stack.append(nxt)
+
+
+def _braid(data, rows, cols, rng, loops):
+    """Knock out walls that separate two corridors, with probability loops"""
+    for i in range(1, rows - 1):
+        for j in range(1, cols - 1):
+            cell = i * cols + j
+            if data[cell] != 1:
+                continue
+            across = (data[cell - 1] == 0 and data[cell + 1] == 0) if i % 2 else \
+                (j % 2 and data[cell - cols] == 0 and data[cell + cols] == 0)
+            if across and rng.random() < loops:
+                data[cell] = 0
+
+
+def _search(data, cols, start, passable):
+    """Breadth-first search over cells whose tile passes passable(); returns {cell: parent}"""
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        for nxt in (cell - 1, cell + 1, cell - cols, cell + cols):
+            if nxt not in parents and passable(data[nxt]):
+                parents[nxt] = cell
+                queue.append(nxt)
+    return parents
+
+
+def generate_level(rows, cols, seed=0, keys=3, zappy=0.1, loops=0.05):
+    """
+    A solvable level dict of rows x cols tiles (at least 5x5)
+
+    keys is the length of the key/gate chain (at most five, fewer if the
+    route is too short); zappy and loops are the fractions of walls turned
+    into zappy walls and of corridor walls knocked out.
+    """
+    if rows < MIN_SIZE or cols < MIN_SIZE:
+        raise ValueError(f"Generated levels must be at least {MIN_SIZE}x{MIN_SIZE}")
+    rng = random.Random(f"{seed}:{rows}x{cols}")
+    data = bytearray([1]) * (rows * cols)
+    _carve(data, rows, cols, rng)
+    _braid(data, rows, cols, rng, loops)
+
+    start = cols + 1
+    parents = _search(data, cols, start, lambda tile: tile == 0)
+    # The last cell a breadth-first search reaches is the farthest one
+    end = next(reversed(parents))
+    data[end] = END_TILE
+    path = []
+    cell = parents[end]
+    while cell != start:
+        path.append(cell)
+        cell = parents[cell]
+    path.reverse()
+
+    # Gates on the route, in route order, each with a key reachable through the earlier gates
+    chain = min(keys, len(KEY_TILES), max(len(path) - 1, 0))
+    gates = sorted(rng.sample(range(1, len(path)), chain))
+    colors = rng.sample(KEY_TILES, chain)
+    for position, key in zip(gates, colors):
+        data[path[position]] = key + 1
+    opened = set()
+    for number, key in enumerate(colors):
+        reachable = _search(data, cols, start,
+                            lambda tile: tile == 0 or tile in KEY_TILES or tile - 1 in opened)
+        spots = [cell for cell in reachable if data[cell] == 0 and cell != start]
+        if not spots:
+            # No room left for a key in a tiny maze: drop this gate and the rest of the chain
+            for position in gates[number:]:
+                data[path[position]] = 0
+            break
+        data[rng.choice(spots)] = key
+        opened.add(key)
+
+    for i in range(1, rows - 1):
+        for j in range(1, cols - 1):
+            if data[i * cols + j] == 1 and rng.random() < zappy:
+                data[i * cols + j] = 2
+
+    return {
+        'name': f'Generated {rows}x{cols} #{seed}',
+        'description': f'Procedurally generated maze with {len(opened)} key(s)',
+        'data': [list(data[i * cols:(i + 1) * cols]) for i in range(rows)],
+        'start_pos': (1, 1),
+        'start_dir': rng.randrange(4),
+        'par': GENERATED_PAR,
+        'difficulty': 'Expert'
+    }
+
+
+def generate_levels(sizes, seed=0, **options):
+    """One level per (rows, cols) in sizes, each with its own seed derived from seed"""
+    return [generate_level(rows, cols, seed + number, **options) for number, (rows, cols) in enumerate(sizes)]
+
+
+def verify(level, max_states=None):
+    """Solve a level dict with solver.solve; returns the Solution"""
+    from python_decoder import Grid
+    from solver import solve
+    return solve(Grid(level['data'], level['start_pos'], level['start_dir'], level['par']), max_states)
+
+
+def parse_size(text):
+    """'100' -> (100, 100), '60x200' -> (60, 200)"""
+    rows, _, cols = text.lower().partition('x')
+    return int(rows), int(cols or rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate solvable levels of any size into a level pack")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(25, 25), (100, 100), (500, 500)],
+                        help='Grid sizes as N or ROWSxCOLS (default: 25 100 500)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keys', type=int, default=3, help='Key/gate chain length (at most 5)')
+    parser.add_argument('--zappy', type=float, default=0.1, help='Fraction of walls that are zappy')
+    parser.add_argument('--loops', type=float, default=0.05, help='Fraction of corridor walls knocked out')
+    parser.add_argument('-o', '--output', default='stress.pack', help='Level pack to write')
+    parser.add_argument('--verify', action='store_true', help='Solve every level with solver.solve (slow on huge grids)')
+    args = parser.parse_args()
+
+    import levelpack
+    levels = generate_levels(args.sizes, args.seed, keys=args.keys, zappy=args.zappy, loops=args.loops)
+    failed = 0
+    for number, level in enumerate(levels, 1):
+        line = f"Level {number:3d}: {level['name']}"
+        if args.verify:
+            solution = verify(level)
+            failed += not solution.solvable
+            line += f", shortest route {solution.actions} actions" if solution.solvable else "  UNSOLVABLE"
+        print(line)
+    levelpack.write_pack(levels, args.output)
+    print(f"Wrote {len(levels)} levels to {args.output}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
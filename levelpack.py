@@ -0,0 +1,202 @@
+"""
+Level pack files: many levels in one compact, memory-mapped file
+
+Layout (all integers little-endian):
+
+    header   magic b'BGLP', version (u16), flags (u16, 0), level count (u32),
+             index offset (u32)
+    index    one (record offset u32, record length u32) per level, in level order
+    records  rows (u16), cols (u16), start row (u16), start col (u16),
+             start direction (u8), reserved (u8), par (u16),
+             budget (u32, 0 = EXECUTION_BUDGET), metadata length (u16),
+             metadata (UTF-8 JSON object: name, description, difficulty and
+             any extra keys), tiles (rows * cols bytes, row-major)
+
+LevelPack maps the file and only reads the header when opened; a level's
+index entry and record are decoded when that level is asked for, so opening
+a pack costs the same for fifteen levels as for fifteen thousand. The mapping
+is read-only and shared between forked workers.
+
+Build the default pack from default_levels.py, or a pack from a JSON list of
+level dicts (the same keys as in default_levels.py):
+
+    python levelpack.py build                       # default_levels -> levels.pack
+    python levelpack.py build teacher.json -o teacher.pack
+    python levelpack.py list teacher.pack
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+from collections.abc import Sequence
+
+DEFAULT_PACK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'levels.pack')
+
+MAGIC = b'BGLP'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHII')
+INDEX_ENTRY = struct.Struct('<II')
+RECORD = struct.Struct('<HHHHBBHIH')
+
+# Level keys stored in the record header or tiles rather than in the metadata
+RECORD_KEYS = ('data', 'start_pos', 'start_dir', 'par', 'budget')
+
+LevelRecord = namedtuple('LevelRecord', [
+    'rows', 'cols',
+    'start_pos',   # (row, col)
+    'start_dir',
+    'par',
+    'budget',      # Instruction budget, None for the default
+    'tiles',       # bytes, one tile per cell, row-major (a Grid template)
+    'metadata'     # dict: name, description, difficulty, ...
+])
+
+
+class LevelPackError(ValueError):
+    """A pack file is malformed, or a level cannot be packed"""
+
+
+class LevelPack(Sequence):
+    """Read-only sequence of level dicts backed by a memory-mapped pack file"""
+
+    def __init__(self, path=DEFAULT_PACK):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise LevelPackError(f"{path}: too short to be a level pack")
+        magic, version, _, self._count, self._index = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise LevelPackError(f"{path}: not a level pack")
+        if version != VERSION:
+            raise LevelPackError(f"{path}: unsupported level pack version {version}")
+        if self._index + self._count * INDEX_ENTRY.size > len(self._map):
+            raise LevelPackError(f"{path}: truncated level index")
+
+    def __len__(self):
+        return self._count
+
+    def record(self, index):
+        """The LevelRecord at a 0-based index, decoded from the file"""
+        if not 0 <= index < self._count:
+            raise IndexError(f"level index {index} out of range")
+        offset, length = INDEX_ENTRY.unpack_from(self._map, self._index + index * INDEX_ENTRY.size)
+        if length < RECORD.size or offset + length > len(self._map):
+            raise LevelPackError(f"{self.path}: level {index + 1} lies outside the file")
+        rows, cols, start_row, start_col, start_dir, _, par, budget, meta_length = RECORD.unpack_from(self._map, offset)
+        tiles_start = offset + RECORD.size + meta_length
+        if tiles_start + rows * cols != offset + length:
+            raise LevelPackError(f"{self.path}: level {index + 1} has a bad record length")
+        metadata = json.loads(self._map[offset + RECORD.size:tiles_start].decode('utf-8'))
+        return LevelRecord(rows, cols, (start_row, start_col), start_dir, par, budget or None,
+                           self._map[tiles_start:tiles_start + rows * cols], metadata)
+
+    def __getitem__(self, index):
+        """Level dict in the shape of default_levels.py (negative indexes count from the end)"""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        return level_dict(self.record(index))
+
+    def close(self):
+        self._map.close()
+
+
+def level_dict(record):
+    """Level dict ('data' as nested rows) for a LevelRecord"""
+    level = dict(record.metadata)
+    level['data'] = [list(record.tiles[row * record.cols:(row + 1) * record.cols]) for row in range(record.rows)]
+    level['start_pos'] = record.start_pos
+    level['start_dir'] = record.start_dir
+    level['par'] = record.par
+    if record.budget is not None:
+        level['budget'] = record.budget
+    return level
+
+
+def pack_level(level):
+    """Encode one level dict as a pack record"""
+    data = level['data']
+    rows, cols = len(data), len(data[0]) if data else 0
+    name = level.get('name', '?')
+    if not all(isinstance(level.get(key), str) for key in ('name', 'description', 'difficulty')):
+        raise LevelPackError(f"Level {name!r}: name, description and difficulty must be strings")
+    if not (0 < rows <= 0xFFFF and 0 < cols <= 0xFFFF) or any(len(row) != cols for row in data):
+        raise LevelPackError(f"Level {name!r}: grid must be a non-empty rectangle of at most 65535x65535")
+    start_row, start_col = level['start_pos']
+    if not (0 <= start_row < rows and 0 <= start_col < cols):
+        raise LevelPackError(f"Level {name!r}: start position {level['start_pos']} is outside the grid")
+    if not 0 <= level['start_dir'] <= 3:
+        raise LevelPackError(f"Level {name!r}: start direction must be 0-3")
+    budget = level.get('budget') or 0
+    if not (0 <= level['par'] <= 0xFFFF and 0 <= budget <= 0xFFFFFFFF):
+        raise LevelPackError(f"Level {name!r}: par or budget out of range")
+    try:
+        tiles = bytes(tile for row in data for tile in row)
+    except ValueError:
+        raise LevelPackError(f"Level {name!r}: tiles must be 0-255") from None
+    metadata = json.dumps({key: value for key, value in level.items() if key not in RECORD_KEYS},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(metadata) > 0xFFFF:
+        raise LevelPackError(f"Level {name!r}: metadata is too long")
+    header = RECORD.pack(rows, cols, start_row, start_col, level['start_dir'], 0, level['par'], budget, len(metadata))
+    return header + metadata + tiles
+
+
+def write_pack(levels, path=DEFAULT_PACK):
+    """Write level dicts (in level order) as a pack file, replacing it atomically"""
+    records = [pack_level(level) for level in levels]
+    index = bytearray()
+    offset = HEADER.size + len(records) * INDEX_ENTRY.size
+    for record in records:
+        index += INDEX_ENTRY.pack(offset, len(record))
+        offset += len(record)
+    if offset > 0xFFFFFFFF:
+        raise LevelPackError("Level pack would exceed 4 GiB")
+    temporary = f"{path}.tmp{os.getpid()}"
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records), HEADER.size))
+        f.write(index)
+        for record in records:
+            f.write(record)
+    os.replace(temporary, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect level pack files")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Build a pack from default_levels.py or a JSON list of levels')
+    build.add_argument('source', nargs='?', help='JSON file with a list of level dicts (default: default_levels.py)')
+    build.add_argument('-o', '--output', default=DEFAULT_PACK, help='Pack file to write')
+    listing = commands.add_parser('list', help='Print the levels in a pack')
+    listing.add_argument('pack', nargs='?', default=DEFAULT_PACK)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.source:
+            with open(args.source, encoding='utf-8') as f:
+                levels = json.load(f)
+        else:
+            from default_levels import DEFAULT_LEVELS
+            levels = DEFAULT_LEVELS
+        try:
+            write_pack(levels, args.output)
+        except LevelPackError as e:
+            sys.exit(str(e))
+        print(f"Wrote {len(levels)} levels to {args.output} ({os.path.getsize(args.output)} bytes)")
+    else:
+        pack = LevelPack(args.pack)
+        for index in range(len(pack)):
+            record = pack.record(index)
+            print(f"Level {index + 1:4d}: {record.metadata.get('name', '?'):32s} "
+                  f"{record.rows}x{record.cols}, par {record.par}, {record.metadata.get('difficulty', '?')}")
+
+
+if __name__ == '__main__':
+    main()
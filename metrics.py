@@ -0,0 +1,254 @@
+"""
+Request metrics: per-stage timing (Server-Timing) and a Prometheus text export
+
+Each web worker keeps its own counters, gauges and histograms and writes a snapshot
+of them to METRICS_DIR/metrics-<pid>-<start>.json at most every
+METRICS_FLUSH_SECONDS. /metrics merges every snapshot in the directory, so a
+scrape that lands on any gunicorn worker reports the totals of all of them.
+Snapshots of exited workers are kept so counters and histograms never go
+backwards when gunicorn restarts a worker; their gauges (queue depths, runs
+in flight) are dropped, as they described a process that is gone.
+
+The directory must belong to one server: gunicorn.conf.py gives every
+gunicorn start a fresh one (or clears the configured one). Without
+METRICS_DIR nothing is written and /metrics reports this process only, so
+CLI and benchmark runs never mix into a server's metrics.
+
+Environment variables:
+    METRICS_DIR             Directory shared by the workers of one server (default: none, not shared)
+    METRICS_FLUSH_SECONDS   Minimum seconds between snapshot writes (default 1)
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 1))
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+FRAME_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000, 10000)
+BYTE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# name -> (type, help) for every exported metric
+METRICS = {
+    'botgame_execute_duration_seconds': ('histogram', 'Time to handle an /execute request, by level'),
+    'botgame_execute_outcomes_total': ('counter', 'Finished /execute requests by outcome and level'),
+    'botgame_execute_frames': ('histogram', 'Animation frames returned per /execute response'),
+    'botgame_execute_response_bytes': ('histogram', 'Size of /execute response bodies'),
+    'botgame_execute_stage_seconds_total': ('counter', 'Time spent in each /execute stage'),
+    'botgame_scheduler_waiting': ('gauge', 'Runs waiting for a sandbox slot'),
+    'botgame_scheduler_running': ('gauge', 'Runs holding a sandbox slot'),
+    'botgame_scheduler_wait_seconds': ('histogram', 'Time runs waited for a sandbox slot'),
+    'botgame_scheduler_rejections_total': ('counter', 'Executions refused by admission control, by reason'),
+    'botgame_jobs_queued': ('gauge', 'Jobs waiting in the /jobs queue'),
+}
+
+
+class RequestTimer:
+    """Times the named stages of one request and remembers how it ended"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []  # (name, seconds), in order
+        self.outcome = 'error'
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def header(self):
+        """Server-Timing header value, e.g. 'analyze;dur=0.41, run;dur=12.03, total;dur=13.10'"""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages]
+        parts.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ', '.join(parts)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """Counters and histograms of this process, shared with sibling workers through METRICS_DIR"""
+
+    def __init__(self, directory=METRICS_DIR, flush_seconds=METRICS_FLUSH_SECONDS):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._counters = {}    # (name, labels) -> value
+        self._gauges = {}      # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [buckets, per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._shared = directory is not None
+        # Tells this process's snapshot apart from one left by an earlier process with the same pid
+        self._started = time.time_ns()
+
+    def inc(self, name, labels, amount=1):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, labels, value):
+        """Set a gauge (summed over workers when collected)"""
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, labels, value, buckets):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [list(buckets), [0] * (len(buckets) + 1), 0, 0]
+            bounds, counts = histogram[0], histogram[1]
+            index = next((i for i, bound in enumerate(bounds) if value <= bound), len(bounds))
+            counts[index] += 1
+            histogram[2] += value
+            histogram[3] += 1
+
+    def snapshot(self):
+        """JSON-ready copy of this process's metrics"""
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'gauges': [[name, list(labels), value] for (name, labels), value in self._gauges.items()],
+                'histograms': [[name, list(labels), bounds, list(counts), total, count]
+                               for (name, labels), (bounds, counts, total, count) in self._histograms.items()]
+            }
+
+    def _path(self):
+        return os.path.join(self.directory, f"metrics-{os.getpid()}-{self._started}.json")
+
+    def flush(self, force=False):
+        """Write this process's snapshot for the other workers (throttled unless forced)"""
+        now = time.monotonic()
+        if not self._shared or (not force and now - self._last_flush < self.flush_seconds):
+            return
+        self._last_flush = now
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.metrics-')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self._path())
+        except OSError as e:
+            # Read-only or missing filesystem - report this worker only
+            logger.warning(f"Cannot write metrics to {self.directory}, reporting this worker only: {e}")
+            self._shared = False
+
+    def _snapshots(self):
+        if not self._shared:
+            return [self.snapshot()]
+        snapshots = []
+        own = os.path.basename(self._path())
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue  # Being replaced right now or corrupt - skip it this scrape
+            if filename != own and not _running(filename):
+                # An exited worker: its counters still count, its gauges no longer describe anything
+                snapshot['gauges'] = []
+            snapshots.append(snapshot)
+        return snapshots
+
+    def collect(self):
+        """Merge the snapshots of every worker into ({counter/gauge key: value}, {histogram key: [...]})"""
+        self.flush(force=True)
+        counters, histograms = {}, {}
+        for snapshot in self._snapshots():
+            for name, labels, value in snapshot['counters'] + snapshot.get('gauges', []):
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, bounds, counts, total, count in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.get(key)
+                if merged is None or merged[0] != bounds:
+                    histograms[key] = [bounds, list(counts), total, count]
+                else:
+                    merged[1] = [a + b for a, b in zip(merged[1], counts)]
+                    merged[2] += total
+                    merged[3] += count
+        return counters, histograms
+
+    def render(self):
+        """All workers' metrics in the Prometheus text exposition format"""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            for (metric, labels), (bounds, counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(list(bounds) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _running(filename):
+    """Whether the process that wrote metrics-<pid>-<start>.json is still running"""
+    try:
+        pid = int(filename.split('-')[1])
+        if pid == os.getpid():
+            return False  # An earlier process that had this pid; this process's own file is named differently
+        os.kill(pid, 0)
+    except (ValueError, IndexError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass  # Exists, owned by someone else
+    return True
+
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush, force=True)
+
+
+def record_execution(level, timer, frames, response_bytes):
+    """Record one finished /execute request"""
+    level = str(level)
+    registry.observe('botgame_execute_duration_seconds', {'level': level}, timer.elapsed(), LATENCY_BUCKETS)
+    registry.inc('botgame_execute_outcomes_total', {'outcome': timer.outcome, 'level': level})
+    registry.observe('botgame_execute_frames', {}, frames, FRAME_BUCKETS)
+    registry.observe('botgame_execute_response_bytes', {}, response_bytes, BYTE_BUCKETS)
+    for stage, seconds in timer.stages:
+        registry.inc('botgame_execute_stage_seconds_total', {'stage': stage}, seconds)
+    registry.flush()
@@ -0,0 +1,275 @@
+"""
+Server-side storage for player progress
+
+The Flask session cookie only carries an opaque session ID; the progress
+itself lives in a ProgressStore under that ID. A player's progress is kept
+compact: a completed bitset, a star bitset and an array of best command
+counts, one entry per level (0 = no completion yet).
+
+The SQLite backend runs in WAL mode and writes behind: saves go to an
+in-memory dirty set that a background thread flushes in one transaction
+every PROGRESS_FLUSH_SECONDS (and at exit). Reads check the dirty set
+first, so a worker always sees its own writes; another gunicorn worker may
+see a save up to one flush interval late.
+
+Environment variables:
+    PROGRESS_BACKEND         'sqlite' (default) or 'memory' (lost on restart)
+    PROGRESS_DB              SQLite database file (default: progress.db)
+    PROGRESS_FLUSH_SECONDS   Write-behind interval in seconds (default 1)
+"""
+
+import abc
+import atexit
+import logging
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_BACKEND = os.environ.get('PROGRESS_BACKEND', 'sqlite')
+PROGRESS_DB = os.environ.get('PROGRESS_DB', 'progress.db')
+PROGRESS_FLUSH_SECONDS = float(os.environ.get('PROGRESS_FLUSH_SECONDS', 1))
+
+# Largest best-command count that fits the stored array
+MAX_BEST_COMMANDS = 0xFFFF
+
+
+class PlayerProgress:
+    """One player's progress: completed/star bitsets (bit n-1 = level n) and best command counts"""
+    __slots__ = ('completed', 'stars', 'best')
+
+    def __init__(self, levels, completed=0, stars=0, best=None):
+        self.completed = completed
+        self.stars = stars
+        self.best = array('H', best if best is not None else [0] * levels)
+        if len(self.best) < levels:
+            # Levels were added since this was stored
+            self.best.extend([0] * (levels - len(self.best)))
+
+    @property
+    def levels(self):
+        return len(self.best)
+
+    def level(self, level_number):
+        """Progress dict for one level, in the shape the /progress API has always returned"""
+        # Level 0 and below have no bit: no progress, like levels past the end
+        bit = 1 << (level_number - 1) if level_number >= 1 else 0
+        best = self.best[level_number - 1] if 1 <= level_number <= self.levels else 0
+        return {
+            'completed': bool(self.completed & bit),
+            'best_commands': best or None,
+            'attempts': 0,
+            'has_star': bool(self.stars & bit)
+        }
+
+    def record(self, level_number, commands_used, par, completed):
+        """
+        Apply a finished attempt; returns the level's progress dict
+
+        A star (at or under par) replaces a checkmark, never the other way around.
+        """
+        if not 1 <= level_number <= self.levels:
+            raise ValueError(f"Invalid level number: {level_number}")
+        if completed:
+            bit = 1 << (level_number - 1)
+            self.completed |= bit
+            if commands_used <= par:
+                self.stars |= bit
+            commands_used = min(max(commands_used, 1), MAX_BEST_COMMANDS)
+            best = self.best[level_number - 1]
+            if best == 0 or commands_used < best:
+                self.best[level_number - 1] = commands_used
+        return self.level(level_number)
+
+    def stats(self):
+        return {
+            'total_stars': bin(self.stars).count('1'),
+            'levels_completed': bin(self.completed).count('1'),
+            'total_levels': self.levels
+        }
+
+    def to_bytes(self):
+        """Pack as <level count><completed bitset><star bitset><best counts>, little-endian"""
+        size = (self.levels + 7) // 8
+        best = array('H', self.best)
+        if sys.byteorder != 'little':
+            best.byteswap()
+        return (struct.pack('<H', self.levels) + self.completed.to_bytes(size, 'little')
+                + self.stars.to_bytes(size, 'little') + best.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data, levels):
+        stored = struct.unpack_from('<H', data)[0]
+        size = (stored + 7) // 8
+        completed = int.from_bytes(data[2:2 + size], 'little')
+        stars = int.from_bytes(data[2 + size:2 + 2 * size], 'little')
+        best = array('H')
+        best.frombytes(data[2 + 2 * size:])
+        if sys.byteorder != 'little':
+            best.byteswap()
+        return cls(max(levels, stored), completed, stars, best)
+
+    @classmethod
+    def from_session_dict(cls, progress, levels):
+        """Convert the old cookie format ({"<level>": {"completed", "best_commands", "has_star", ...}})"""
+        player = cls(levels)
+        for level_key, entry in progress.items():
+            try:
+                level_number = int(level_key)
+            except (TypeError, ValueError):
+                continue
+            if not (1 <= level_number <= levels) or not isinstance(entry, dict):
+                continue
+            bit = 1 << (level_number - 1)
+            if entry.get('completed'):
+                player.completed |= bit
+            if entry.get('has_star'):
+                player.stars |= bit
+            best = entry.get('best_commands')
+            if isinstance(best, int) and best > 0:
+                player.best[level_number - 1] = min(best, MAX_BEST_COMMANDS)
+        return player
+
+
+class ProgressStore(abc.ABC):
+    """Backend interface: packed PlayerProgress blobs by session ID"""
+
+    @abc.abstractmethod
+    def load(self, sid, levels):
+        """The player's progress, or None if nothing is stored for sid"""
+
+    @abc.abstractmethod
+    def save(self, sid, progress):
+        """Store the player's progress under sid"""
+
+    def flush(self):
+        """Persist pending writes (no-op for backends that write through)"""
+
+    def close(self):
+        self.flush()
+
+
+class MemoryProgressStore(ProgressStore):
+    """Per-process dict; for development and tests"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, sid, levels):
+        with self._lock:
+            data = self._data.get(sid)
+        return PlayerProgress.from_bytes(data, levels) if data is not None else None
+
+    def save(self, sid, progress):
+        with self._lock:
+            self._data[sid] = progress.to_bytes()
+
+
+class SQLiteProgressStore(ProgressStore):
+    """SQLite (WAL) table of packed progress with write-behind batching"""
+
+    def __init__(self, path=PROGRESS_DB, flush_seconds=PROGRESS_FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS progress ('
+            'sid TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self._db_lock = threading.Lock()
+        self._dirty = {}  # sid -> packed progress waiting to be written
+        self._dirty_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name='progress-flush', daemon=True)
+        self._flusher.start()
+
+    def load(self, sid, levels):
+        with self._dirty_lock:
+            data = self._dirty.get(sid)
+        if data is None:
+            with self._db_lock:
+                row = self._conn.execute('SELECT data FROM progress WHERE sid = ?', (sid,)).fetchone()
+            if row is None:
+                return None
+            data = row[0]
+        return PlayerProgress.from_bytes(data, levels)
+
+    def save(self, sid, progress):
+        with self._dirty_lock:
+            self._dirty[sid] = progress.to_bytes()
+
+    def flush(self):
+        with self._dirty_lock:
+            pending, self._dirty = self._dirty, {}
+        if not pending:
+            return
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._conn.execute('BEGIN')
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO progress (sid, data, updated_at) VALUES (?, ?, ?)',
+                    [(sid, data, now) for sid, data in pending.items()]
+                )
+                self._conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write progress for {len(pending)} players: {e}")
+            with self._db_lock:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+            with self._dirty_lock:
+                # Keep newer saves made meanwhile, retry the rest next time
+                for sid, data in pending.items():
+                    self._dirty.setdefault(sid, data)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_seconds)
+            self.flush()
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+BACKENDS = {
+    'sqlite': SQLiteProgressStore,
+    'memory': MemoryProgressStore,
+}
+
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """This process's progress store, opened on first use"""
+    global _store, _store_pid
+    with _store_lock:
+        # SQLite connections and threads don't survive fork; reopen in each worker
+        if _store is None or _store_pid != os.getpid():
+            backend = BACKENDS.get(PROGRESS_BACKEND)
+            if backend is None:
+                raise ValueError(f"Unknown PROGRESS_BACKEND {PROGRESS_BACKEND!r}. Must be one of: {', '.join(BACKENDS)}")
+            _store, _store_pid = backend(), os.getpid()
+            logger.info(f"Opened {PROGRESS_BACKEND} progress store")
+        return _store
+
+
+@atexit.register
+def _close_store():
+    if _store is not None and _store_pid == os.getpid():
+        _store.close()
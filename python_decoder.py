@@ -1,8 +1,10 @@
-import threading
-from queue import Queue
-import time
+import builtins
+import os
+from collections import namedtuple
+from code_analysis import analyze, count_commands, METER_CHARGE, METER_ITERATE
+from renderer import TILE_EMOJIS, BOT_EMOJIS, render_emoji
 
-class TimeoutError(Exception):
+class TimeoutError(builtins.TimeoutError):
     pass
 
 class WinInterruption(Exception):
@@ -14,6 +16,49 @@ class MovesExceeded(Exception):
 class DeathInterruption(Exception):
     pass
 
+class BudgetExceeded(BaseException):
+    """
+    Raised inside user code when its instruction budget runs out
+
+    A BaseException, so `except Exception:` in user code can't swallow it.
+    """
+    pass
+
+# Steps (loop iterations, function calls, comprehension items) a program may
+# take per run unless its level sets a 'budget'
+EXECUTION_BUDGET = int(os.environ.get('EXECUTION_BUDGET', 100_000))
+
+class ExecutionBudget:
+    """Step counter charged by metered programs (see code_analysis)"""
+
+    def __init__(self, limit=EXECUTION_BUDGET):
+        self.limit = limit
+        self.used = 0
+
+    def charge(self):
+        self.used += 1
+        if self.used > self.limit:
+            # Raised again on every later charge, so a bare except can't keep the program going
+            raise BudgetExceeded(f"Instruction budget of {self.limit} steps used up")
+
+    def iterate(self, iterable):
+        charge = self.charge
+        for item in iterable:
+            charge()
+            yield item
+
+    @property
+    def exhausted(self):
+        return self.used > self.limit
+
+    def report(self):
+        return {'limit': self.limit, 'used': min(self.used, self.limit)}
+
+def program_globals(bot, budget):
+    """Globals a metered program runs with"""
+    return {'bot': bot, METER_CHARGE: budget.charge, METER_ITERATE: budget.iterate, '__budget__': budget}
+
+
 def exec_func(source, globals=None, locals=None):
     try:
         exec(source, globals, locals)
@@ -23,69 +68,198 @@ def exec_func(source, globals=None, locals=None):
 def timeout_handler(signality, frame):
     raise TimeoutError("Code execution exceeded allotted time. Please try a faster solution/remove infinite loops.")
 
-def execute_with_timeout(source, globals=None, locals=None, timeout_seconds=20):
-    result_queue = Queue()
-    exception_queue = Queue()
-
-    def code_executor():
-        """Execute code in a separate thread"""
-        try:
-            exec(source, globals, locals)
-            result_queue.put("success")
-        except WinInterruption:
-            # WinInterruption is expected - bot won
-            result_queue.put("win")
-        except Exception as e:
-            # Put exception in queue for re-raising
-            exception_queue.put(e)
-    
-    # Create and start thread with proper target (no args needed - it captures from closure)
-    thread = threading.Thread(target=code_executor)
-    thread.daemon = True  # Dies when main thread dies
-    thread.start()
-    
-    # Wait for thread to complete, with timeout
-    thread.join(timeout=timeout_seconds)
-    
-    # Check if thread is still alive (timed out)
-    if thread.is_alive():
-        raise TimeoutError(f"Code execution exceeded {timeout_seconds} seconds")
-    
-    # Check for exceptions first
-    if not exception_queue.empty():
-        raise exception_queue.get()
-    
-    # Return result if available (success or win)
-    return result_queue.get() if not result_queue.empty() else None
+def execute_with_timeout(source, globals=None, locals=None, timeout_seconds=20, on_event=None):
+    """
+    Execute user code in the sandbox (see sandbox.py) with a wall-clock timeout
+
+    Returns "success", or "win" if the bot reached the finish line. Raises
+    TimeoutError if the code ran too long (the executor process is killed),
+    and re-raises any other exception the code raised (MovesExceeded,
+    DeathInterruption, ...). Objects passed in globals/locals reflect the
+    state they had when the code stopped. Events the code publishes through
+    sandbox.publish are passed to on_event(event, payload) as they happen.
+    """
+    import sandbox
+    return sandbox.execute(source, globals, locals, timeout_seconds, on_event)
+
+# Key tiles and the gate tile each one opens (gate = key + 1), indexed by color
+KEY_TILES = (4, 6, 8, 10, 12)
+GATE_TILES = (5, 7, 9, 11, 13)
+
+# Row/column offset of the cell in front of the bot, indexed by direction (0 up, 1 left, 2 down, 3 right)
+DIRECTION_DELTAS = ((-1, 0), (0, -1), (1, 0), (0, 1))
+
+# What stepping onto a tile does, indexed by tile id (templates are bytes, so 256 entries)
+TILE_OPEN, TILE_BLOCKED, TILE_ZAPPY, TILE_KEY = range(4)
+TILE_KINDS = tuple(
+    TILE_BLOCKED if tile == 1 or tile in GATE_TILES
+    else TILE_ZAPPY if tile == 2
+    else TILE_KEY if tile in KEY_TILES
+    else TILE_OPEN
+    for tile in range(256)
+)
+
+
+class KeyIndex:
+    """
+    Where a level's keys and gates are, precomputed once per template
+
+    Every key cell gets its own bit in the collected-keys mask. A gate opens
+    as soon as any key of its color has been collected, so `unlock` maps each
+    key or gate cell to the mask bits that make it disappear.
+    """
+    __slots__ = ('key_bits', 'key_colors', 'color_keys', 'gates_by_color', 'unlock')
+
+    def __init__(self, template):
+        self.key_bits = {}
+        self.key_colors = {}
+        color_keys = [0] * len(KEY_TILES)
+        gates_by_color = [[] for _ in KEY_TILES]
+        for cell, tile in enumerate(template):
+            if tile in KEY_TILES:
+                color = KEY_TILES.index(tile)
+                bit = 1 << len(self.key_bits)
+                self.key_bits[cell] = bit
+                self.key_colors[cell] = color
+                color_keys[color] |= bit
+            elif tile in GATE_TILES:
+                gates_by_color[GATE_TILES.index(tile)].append(cell)
+        self.color_keys = tuple(color_keys)
+        self.gates_by_color = tuple(tuple(cells) for cells in gates_by_color)
+        self.unlock = dict(self.key_bits)
+        for color, cells in enumerate(self.gates_by_color):
+            for cell in cells:
+                self.unlock[cell] = self.color_keys[color]
+
+
+# KeyIndex per template, shared by every Grid built from the same level layout
+_key_indexes = {}
+
+
+class GridRow:
+    """One row of a GridRows view"""
+    __slots__ = ('_grid', '_row')
+
+    def __init__(self, grid, row):
+        self._grid = grid
+        self._row = row
+
+    def __len__(self):
+        return self._grid.cols
+
+    def __getitem__(self, col):
+        if col < 0:
+            col += self._grid.cols
+        if not 0 <= col < self._grid.cols:
+            raise IndexError("grid column out of range")
+        return self._grid.get(self._row, col)
+
+    def __iter__(self):
+        for col in range(self._grid.cols):
+            yield self._grid.get(self._row, col)
+
+
+class GridRows:
+    """Read-only row view over a Grid so grid.data[i][j] keeps working"""
+    __slots__ = ('_grid',)
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    def __len__(self):
+        return self._grid.rows
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self._grid.rows
+        if not 0 <= row < self._grid.rows:
+            raise IndexError("grid row out of range")
+        return GridRow(self._grid, row)
+
+    def __iter__(self):
+        for row in range(self._grid.rows):
+            yield GridRow(self._grid, row)
+
 
 class Grid:
     """Data denotes tile types: 0 = blank tile, 1 = basic wall tile, 2 = zappy wall tile, 3 = end
         4 = Yellow key, 5 = Yellow gate, 6 = Red key, 7 = Red gate, 8 = Blue key, 9 = Blue gate,
         10 = Green key, 11 = Green gate, 12 = Purple key, 13 = Purple gate 
+
+        The level layout is an immutable, row-major bytes template (cell index =
+        row * cols + col) that can be shared between every Grid of the same level.
+        Collected keys live in a small bitmask overlaid on it: a collected key and
+        the gates of its color read as blank tiles. Reset just clears the mask.
     """
+    __slots__ = ('start_pos', 'rows', 'cols', 'template', 'keys', 'collected', 'start_direction', 'par')
+
     def __init__(self, data, start_pos, start_dir, par):
-        self.start_pos = start_pos
-        self.rows = len(data)
-        self.cols = len(data[0])
-        
-        # Create a deep copy of data to avoid modifying the original level data
-        self.data = [[data[i][j] for j in range(len(data[0]))] for i in range(len(data))]
+        self._setup(self.build_template(data), len(data[0]), start_pos, start_dir, par)
 
-        
-        # Create a backup copy for reset functionality
-        self.data_copy = [[data[i][j] for j in range(len(data[0]))] for i in range(len(data))]
-        
+    @classmethod
+    def from_template(cls, template, cols, start_pos, start_dir, par):
+        """Create a Grid from a bytes template built by build_template"""
+        grid = cls.__new__(cls)
+        grid._setup(template, cols, start_pos, start_dir, par)
+        return grid
+
+    @staticmethod
+    def build_template(data):
+        """Flatten nested tile rows into an immutable bytes template"""
+        return bytes(tile for row in data for tile in row)
+
+    def _setup(self, template, cols, start_pos, start_dir, par):
+        self.start_pos = start_pos
+        self.rows = len(template) // cols
+        self.cols = cols
+        self.template = template
+        self.keys = _key_indexes.get(template)
+        if self.keys is None:
+            self.keys = _key_indexes[template] = KeyIndex(template)
+        self.collected = 0
         self.start_direction = start_dir
         self.par = par
+
+    @property
+    def data(self):
+        """Nested-list style access (grid.data[row][col]) to the current tiles"""
+        return GridRows(self)
+
     def get(self, row, col):
-        return self.data[row][col]
+        cell = row * self.cols + col
+        if self.collected & self.keys.unlock.get(cell, 0):
+            return 0
+        return self.template[cell]
+
+    def tiles(self):
+        """Current tiles of every cell, row-major, with collected keys and open gates blanked"""
+        tiles = bytearray(self.template)
+        if self.collected:
+            for cell, bits in self.keys.unlock.items():
+                if self.collected & bits:
+                    tiles[cell] = 0
+        return tiles
+
+    def collect(self, cell):
+        """
+        Collect the key at a cell index
+
+        Returns the cells that became blank: the key itself, plus the gates of
+        its color if no key of that color had been collected before.
+        """
+        bit = self.keys.key_bits.get(cell, 0)
+        if not bit or self.collected & bit:
+            return ()
+        color = self.keys.key_colors[cell]
+        opened = (cell,)
+        if not self.collected & self.keys.color_keys[color]:
+            opened += self.keys.gates_by_color[color]
+        self.collected |= bit
+        return opened
+
     def reset(self):
         """Restore grid to original state - all keys and gates are regenerated"""
-        for i in range(len(self.data)):
-            for j in range(len(self.data[i])):
-                self.data[i][j] = self.data_copy[i][j]
-
-        
+        self.collected = 0
 
 class Bot:
     def __init__(self, grid:Grid):
@@ -99,97 +273,16 @@ class Bot:
         self.moves = 0
         self.moves_limit = 10000
 
+    @property
+    def state(self):
+        """Hashable snapshot of everything that affects future moves: (row, col, direction, collected keys)"""
+        return (self.i, self.j, self.direction, self.grid.collected)
         
     def move_backward(self):
-        self.moves += 1
-        directions = ["up", "left", "down", "right"]
-        keys = [4, 6, 8, 10, 12]
-        dir = directions[self.direction]
-        if dir == "down" and self.alive and not self.win_state:
-            if self._can_move_back():
-                if self.grid.data[self.i-1][self.j] == 2:
-                    self.reset()
-                elif self.grid.data[self.i-1][self.j] in keys:
-                    self.pick_up(self.grid.data[self.i-1][self.j], (self.i-1, self.j))
-                    self.i -= 1
-                else:
-                    self.i -= 1
-        elif dir == "up" and self.alive and not self.win_state:
-            if self._can_move_back():
-                if self.grid.data[self.i+1][self.j] == 2:
-                    self.reset()
-                elif self.grid.data[self.i+1][self.j] in keys:
-                    self.pick_up(self.grid.data[self.i+1][self.j], (self.i+1, self.j))
-                    self.i += 1
-                else:
-                    self.i += 1
-        if dir == "left" and self.alive and not self.win_state:
-            if self._can_move_back():
-                if self.grid.data[self.i][self.j+1] == 2:
-                    self.reset()
-                elif self.grid.data[self.i][self.j+1] in keys:
-                    self.pick_up(self.grid.data[self.i][self.j+1], (self.i, self.j+1))
-                    self.j += 1
-                else:
-                    self.j+=1
-        if dir == "right" and self.alive and not self.win_state:
-            if self._can_move_back():
-                if self.grid.data[self.i][self.j-1] == 2:
-                    self.reset()
-                elif self.grid.data[self.i][self.j-1] in keys:
-                    self.pick_up(self.grid.data[self.i][self.j-1], (self.i, self.j-1))
-                    self.j -= 1
-                else:
-                    self.j -= 1
-        # print(self.__str__())
-        self.win_state = self.check_win()
-        if (self.win_state):
-            raise WinInterruption
+        self._step(True)
 
     def move_forward(self):
-        self.moves += 1
-        directions = ["up", "left", "down", "right"]
-        keys = [4, 6, 8, 10, 12]
-        dir = directions[self.direction]
-        if dir == "up" and self.alive and not self.win_state:
-            if self._can_move():
-                if self.grid.data[self.i-1][self.j] == 2:
-                    self.reset()
-                elif self.grid.data[self.i-1][self.j] in keys:
-                    self.pick_up(self.grid.data[self.i-1][self.j], (self.i-1, self.j))
-                    self.i -= 1
-                else:
-                    self.i -= 1
-        elif dir == "down" and self.alive and not self.win_state:
-            if self._can_move():
-                if self.grid.data[self.i+1][self.j] == 2:
-                    self.reset()
-                elif self.grid.data[self.i+1][self.j] in keys:
-                    self.pick_up(self.grid.data[self.i+1][self.j], (self.i+1, self.j))
-                    self.i += 1
-                else:
-                    self.i += 1
-        if dir == "right" and self.alive and not self.win_state:
-            if self._can_move():
-                if self.grid.data[self.i][self.j+1] == 2:
-                    self.reset()
-                elif self.grid.data[self.i][self.j+1] in keys:
-                    self.pick_up(self.grid.data[self.i][self.j+1], (self.i, self.j+1))
-                    self.j += 1
-                else:
-                    self.j+=1
-        if dir == "left" and self.alive and not self.win_state:
-            if self._can_move():
-                if self.grid.data[self.i][self.j-1] == 2:
-                    self.reset()
-                elif self.grid.data[self.i][self.j-1] in keys:
-                    self.pick_up(self.grid.data[self.i][self.j-1], (self.i, self.j-1))
-                    self.j -= 1
-                else:
-                    self.j -= 1
-        self.win_state = self.check_win()
-        if (self.win_state):
-            raise WinInterruption
+        self._step(False)
     
     def turn_right(self):
         self.moves += 1
@@ -202,61 +295,68 @@ class Bot:
         self.direction %= 4
     
     def pick_up(self, key, key_location):
-        for i in range(self.grid.rows):
-            for j in range(self.grid.cols):
-                if self.grid.data[i][j]==key+1:
-                    self.grid.data[i][j] = 0
-                if i == key_location[0] and j == key_location[1]:
-                    self.grid.data[i][j] = 0
+        """Collect a key, opening its gates; returns the cells that became blank"""
+        return self.grid.collect(key_location[0] * self.grid.cols + key_location[1])
         
-    def _can_move_back(self, additional_blocks=[]):
+    def _target(self, backward):
+        """
+        Step kernel shared by movement and sensing: the cell in front of (or
+        behind) the bot as (row, col, tile), or None if it is off the grid or
+        blocked by a wall or closed gate
+        """
+        grid = self.grid
+        rows, cols = grid.rows, grid.cols
+        i, j = self.i, self.j
         # Safety check: ensure bot position is valid
-        if not (0 <= self.i < self.grid.rows and 0 <= self.j < self.grid.cols):
-            return False
-            
-        directions = ["up", "left", "down", "right"]
-        dir = directions[self.direction]
-        if dir == "down":
-            if self.i > 0:
-                return self.grid.data[self.i-1][self.j] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        elif dir == "up":
-            if self.i < self.grid.rows - 1:  # Fixed: was self.grid.rows
-                return self.grid.data[self.i+1][self.j] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        elif dir == "left":
-            if self.j < self.grid.cols - 1:  # Fixed: was self.grid.cols
-                return self.grid.data[self.i][self.j+1] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        elif dir == "right":
-            if self.j > 0:
-                return self.grid.data[self.i][self.j-1] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        return False
-    
-    def can_move_back(self):
-        return self._can_move_back([2])
+        if not (0 <= i < rows and 0 <= j < cols):
+            return None
+        di, dj = DIRECTION_DELTAS[self.direction]
+        if backward:
+            i -= di
+            j -= dj
+        else:
+            i += di
+            j += dj
+        if not (0 <= i < rows and 0 <= j < cols):
+            return None
+        # Inlined Grid.get: collected keys and opened gates read as blank
+        cell = i * cols + j
+        tile = 0 if grid.collected & grid.keys.unlock.get(cell, 0) else grid.template[cell]
+        if TILE_KINDS[tile] == TILE_BLOCKED:
+            return None
+        return i, j, tile
 
-    def can_move(self):
-        return self._can_move([2])
+    def _step(self, backward):
+        self.moves += 1
+        if self.alive and not self.win_state:
+            target = self._target(backward)
+            if target is not None:
+                i, j, tile = target
+                kind = TILE_KINDS[tile]
+                if kind == TILE_ZAPPY:
+                    self.reset()
+                elif kind == TILE_KEY:
+                    self.pick_up(tile, (i, j))
+                self.i, self.j = i, j
+        self.win_state = self.check_win()
+        if (self.win_state):
+            raise WinInterruption
 
+    def _can_move_back(self, additional_blocks=()):
+        target = self._target(True)
+        return target is not None and target[2] not in additional_blocks
 
-    def _can_move(self, additional_blocks=[]):
-        # Safety check: ensure bot position is valid
-        if not (0 <= self.i < self.grid.rows and 0 <= self.j < self.grid.cols):
-            return False
-            
-        directions = ["up", "left", "down", "right"]
-        dir = directions[self.direction]
-        if dir == "up":
-            if self.i > 0:
-                return self.grid.data[self.i-1][self.j] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        elif dir == "down":
-            if self.i < self.grid.rows - 1:  # Fixed: was self.grid.rows
-                return self.grid.data[self.i+1][self.j] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        elif dir == "right":
-            if self.j < self.grid.cols - 1:  # Fixed: was self.grid.cols
-                return self.grid.data[self.i][self.j+1] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        elif dir == "left":
-            if self.j > 0:
-                return self.grid.data[self.i][self.j-1] not in [1, 5, 7, 9, 11, 13] + additional_blocks
-        return False
+    def _can_move(self, additional_blocks=()):
+        target = self._target(False)
+        return target is not None and target[2] not in additional_blocks
+
+    def can_move_back(self):
+        target = self._target(True)
+        return target is not None and TILE_KINDS[target[2]] != TILE_ZAPPY
+
+    def can_move(self):
+        target = self._target(False)
+        return target is not None and TILE_KINDS[target[2]] != TILE_ZAPPY
 
     def check_win(self):
         if self.moves > self.moves_limit:
@@ -274,77 +374,63 @@ class Bot:
         self.alive = True
         self.win_state = False
         self.moves = 0
-        self.grid.reset()  # This restores all keys and gates from data_copy
+        self.grid.reset()  # This restores all keys and gates
         raise DeathInterruption("The bot has died")
     
     def __str__(self):
-        strong = ""
-        emojis = ["⬜","⬛","🟧","🟫", "🟡", "🟨", "🔴", "🟥", "🔵", "🟦", "🟢","🟩", "🟣","🟪"]
-        bot_emoji = ["⬆️","⬅️","⬇️","➡️"]
-        for i in range(self.grid.rows):
-            for j in range(self.grid.cols):
-                if i == self.i and j == self.j:
-                    # Safety check for direction index
-                    if 0 <= self.direction < len(bot_emoji):
-                        strong+=bot_emoji[self.direction]
-                    else:
-                        strong+=emojis[0]  # Default emoji if direction is invalid
-                else:
-                    cell_value = self.grid.get(i,j)
-                    # Safety check for emoji index
-                    if 0 <= cell_value < len(emojis):
-                        strong+=emojis[cell_value]
-                    else:
-                        strong+=emojis[0]  # Default emoji if value is invalid
-            strong+="\n"
-        return strong
+        return render_emoji(self.grid, self.i, self.j, self.direction)
     
             
 def count_bot_commands(code:str):
-    lines = code.split("\n")
-    commands = 0
-    for i in lines:
-        parts = i.split(";")
-        for part in parts:
-            if "can_move()" in part:
-                if part.find("#") == -1 or part.find("#")>part.find("can_move()"):
-                    commands+=1
-            if "turn_right()" in part:
-                if part.find("#") == -1 or part.find("#")>part.find("turn_right()"):
-                    commands+=1
-            if "turn_left()" in part:
-                if part.find("#") == -1 or part.find("#")>part.find("turn_left()"):
-                    commands+=1
-            if "move_forward()" in part:
-                if part.find("#") == -1 or part.find("#")>part.find("move_forward()"):
-                    commands+=1
-            if "move_backward()" in part:
-                if part.find("#") == -1 or part.find("#")>part.find("move_backward()"):
-                    commands+=1
-            if "can_move_back()" in part:
-                if part.find("#") == -1 or part.find("#")>part.find("can_move_back()"):
-                    commands+=1
-    return commands
+    """Number of bot command calls in the program, counted on its AST"""
+    return count_commands(code)
 
 def interpreter(code:str, grid):
     bot = Bot(grid)
     bot.moves = 0
-    lines = code.split("\n")
-    code_arr = []
-    for line in lines:
-        if "import" in line:
-            pass
-        else:
-            code_arr.append(line)
-    mod_string = "\n".join(code_arr)
-    execute_with_timeout(mod_string, globals={"bot":bot})
+    analysis = analyze(code)
+    if not analysis.safe:
+        raise ValueError(f"Refusing to run unsafe code: {analysis.reason}")
+    execute_with_timeout(analysis.code_object or analysis.clean_code, globals=program_globals(bot, ExecutionBudget()))
     if bot.win_state:
-        commands = count_bot_commands(mod_string)
+        commands = analysis.command_count
         # if commands <= grid.par:
         #     print("Star")
         # else:
         #     print("check")  
 
+# Outcome of a headless run; error is the exception that stopped the program (None if it finished)
+GradeResult = namedtuple('GradeResult', ['win_state', 'alive', 'command_count', 'moves', 'star', 'error', 'budget'])
+
+def grade(code:str, grid, timeout_seconds=20, analysis=None, budget=None):
+    """
+    Run code on a bare Bot without capturing any frames and grade the outcome
+
+    Nothing is rendered, so the cost is the step logic alone. Pass a
+    precomputed code_analysis result as analysis to skip re-analyzing, and
+    an ExecutionBudget to use a level's own budget. Raises ValueError for
+    unsafe code.
+    """
+    analysis = analysis or analyze(code)
+    if not analysis.safe:
+        raise ValueError(f"Refusing to run unsafe code: {analysis.reason}")
+    budget = budget or ExecutionBudget()
+    bot = Bot(grid)
+    alive, error = True, None
+    try:
+        execute_with_timeout(analysis.code_object or analysis.clean_code, program_globals(bot, budget), timeout_seconds=timeout_seconds)
+    except WinInterruption:
+        bot.win_state = True
+    except DeathInterruption as e:
+        alive, error = False, e
+    except (Exception, BudgetExceeded) as e:
+        error = e
+    if error is None and not bot.win_state and budget.exhausted:
+        # The program caught BudgetExceeded itself and stopped
+        error = BudgetExceeded(f"Instruction budget of {budget.limit} steps used up")
+    star = bot.win_state and analysis.command_count <= grid.par
+    return GradeResult(bot.win_state, alive, analysis.command_count, bot.moves, star, error, budget.report())
+
 
 griddy = [[1,1,1,1,1],
           [1,0,0,3,1],
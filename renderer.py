@@ -0,0 +1,318 @@
+"""
+Grid rendering in the formats clients can ask for
+
+    emoji    The classic text grid (one emoji per cell, '\\n' after each row)
+             with the bot drawn in its cell; byte-identical to what
+             Bot.__str__ has always returned
+    ints     {'rows', 'cols', 'tiles': [[tile, ...], ...], 'bot': [row, col, direction]}
+    base64   {'rows', 'cols', 'tiles': <base64 of one byte per cell, row-major>, 'bot': [...]}
+    viewport {'rows', 'cols', 'tile_size', 'tiles': [[tile hash, ...], ...], 'view': [height, width],
+              'camera': [top, left], 'bot': [...], 'palette'}
+
+GridRenderer keeps the rendered rows of one grid and only re-renders the
+rows whose tiles changed (collected keys, opened gates, a reset) or that
+the bot entered or left, so rendering one frame of a long run costs about
+one row instead of the whole grid.
+
+In the viewport format the grid is cut into TILE_SIZE x TILE_SIZE tiles.
+A tile's id is a hash of its contents followed by where it comes from
+(tile_name): the level, the tile's index and the collected keys that show
+in it. A client fetches the tiles it needs once (GET /tiles/<id>, see
+tile_store) and keeps them by content hash; after that a frame only names
+the bot, the camera window (VIEWPORT_SIZE cells per side, centred on the
+bot) and the tiles whose id changed (changed_tiles). Any process can
+rebuild a tile from its id (build_tile), so ids in memoized results or made
+by another worker stay servable.
+"""
+
+import base64
+import hashlib
+import os
+import struct
+
+from cache import LRUCache
+
+# Emoji palette used to render tiles (indexed by tile type) and the bot (indexed by direction)
+TILE_EMOJIS = ["⬜","⬛","🟧","🟫", "🟡", "🟨", "🔴", "🟥", "🔵", "🟦", "🟢","🟩", "🟣","🟪"]
+BOT_EMOJIS = ["⬆️","⬅️","⬇️","➡️"]
+
+GRID_FORMATS = ('emoji', 'ints', 'base64', 'viewport')
+
+# Cells per side of a viewport tile and of the camera window, and tiles kept ready to serve
+TILE_SIZE = int(os.environ.get('TILE_SIZE', 16))
+VIEWPORT_SIZE = int(os.environ.get('VIEWPORT_SIZE', 16))
+TILE_CACHE_SIZE = int(os.environ.get('TILE_CACHE_SIZE', 4096))
+
+# Emoji for every possible tile byte (unknown tiles render as blank)
+_TILE_TEXT = tuple(TILE_EMOJIS[tile] if tile < len(TILE_EMOJIS) else TILE_EMOJIS[0] for tile in range(256))
+
+
+def _bot_text(direction):
+    return BOT_EMOJIS[direction] if 0 <= direction < len(BOT_EMOJIS) else TILE_EMOJIS[0]
+
+
+def tile_hash(rows, cols, tiles):
+    """Content hash naming a tile of rows x cols tile bytes"""
+    return hashlib.blake2b(struct.pack('<HH', rows, cols) + tiles, digest_size=8).hexdigest()
+
+
+def tile_name(content_hash, level, index, keys):
+    """
+    Tile id: content hash, then level number, tile index and collected key bits (hex)
+
+    keys holds only the bits of keys whose cells (or gates) lie in the tile,
+    so the id doesn't change with keys collected elsewhere. Without a level
+    the id is the bare hash, which only the process that made it can serve.
+    """
+    if level is None:
+        return content_hash
+    return f"{content_hash}-{level}-{index}-{keys:x}"
+
+
+def tile_payload(name, tile):
+    """JSON body of GET /tiles/<id> for a (rows, cols, tiles) tile"""
+    rows, cols, tiles = tile
+    return {'hash': name, 'rows': rows, 'cols': cols, 'tiles': base64.b64encode(tiles).decode('ascii')}
+
+
+def build_tile(name):
+    """
+    Rebuild the (rows, cols, tiles) tile a tile id names from its level
+
+    Returns None if the id is malformed, points outside the level pack, or
+    its content hash doesn't match the rebuilt tile (e.g. an id from a
+    different pack).
+    """
+    import grids  # grids -> python_decoder -> renderer
+
+    parts = name.split('-')
+    if len(parts) != 4 or not all(parts):
+        return None
+    try:
+        level, index, keys = int(parts[1]), int(parts[2]), int(parts[3], 16)
+        compiled = grids.get_compiled_level(level)
+    except ValueError:
+        return None
+    grid = compiled.new_grid()
+    renderer = GridRenderer(grid, level)
+    if not 0 <= index < renderer.tile_count:
+        return None
+    grid.collected = keys & renderer.tile_keys()[index]
+    renderer._sync()
+    built, tile = renderer._name_tile(index)
+    return tile if built == name else None
+
+
+class TileStore:
+    """
+    Tile contents by id, for GET /tiles/<id>
+
+    A bounded LRU of the tiles viewports referred to recently. A tile that
+    isn't there (evicted, or named by another worker) is rebuilt from its id.
+    """
+
+    def __init__(self, size=TILE_CACHE_SIZE):
+        self._tiles = LRUCache(size)
+        self.built = 0
+
+    def add(self, name, tile):
+        self._tiles.put(name, tile)
+
+    def get(self, name):
+        """(rows, cols, tiles) for an id, or None if it doesn't name a tile"""
+        tile = self._tiles.get(name)
+        if tile is None:
+            tile = build_tile(name)
+            if tile is not None:
+                self.built += 1
+                self._tiles.put(name, tile)
+        return tile
+
+    def stats(self):
+        return {'cached': self._tiles.stats(), 'built': self.built}
+
+
+# Process-wide store of the tiles viewports have referred to
+tile_store = TileStore()
+
+
+def render_emoji(grid, i, j, direction):
+    """One-off emoji rendering of a grid with the bot at (i, j)"""
+    tiles = grid.tiles()
+    cols = grid.cols
+    lines = []
+    for row in range(grid.rows):
+        cells = [_TILE_TEXT[tile] for tile in tiles[row * cols:(row + 1) * cols]]
+        if row == i and 0 <= j < cols:
+            cells[j] = _bot_text(direction)
+        lines.append(''.join(cells))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+class GridRenderer:
+    """Rendered rows (or viewport tiles) of one grid, kept in step with its collected keys and the bot"""
+    __slots__ = ('grid', 'level', '_collected', '_tiles', '_cells', '_rows', '_bot', '_bot_row', '_text',
+                 '_tile_cols', '_tile_keys', '_tile_hashes', '_stale_tiles')
+
+    def __init__(self, grid, level=None):
+        self.grid = grid
+        self.level = level  # Level number the grid is from, named in tile ids (see tile_name)
+        self._collected = grid.collected
+        self._tiles = grid.tiles()
+        self._cells = None     # Emoji per cell, by row; built on the first emoji render
+        self._rows = None      # Text of each row without the bot
+        self._bot = None       # (i, j, direction) drawn in _bot_row
+        self._bot_row = None   # Text of the bot's row with the bot drawn in
+        self._text = None      # Whole emoji grid for _bot, None once stale
+        self._tile_cols = -(-grid.cols // TILE_SIZE)
+        self._tile_keys = None  # Key bits that show in each viewport tile; built on the first viewport render
+        self._tile_hashes = None  # Id of each viewport tile, row-major; built on the first viewport render
+        self._stale_tiles = set()  # Tiles whose cells changed since they were named
+
+    @property
+    def tile_count(self):
+        return self._tile_cols * -(-self.grid.rows // TILE_SIZE)
+
+    def tile_keys(self):
+        """Bits of grid.collected that change a cell of each viewport tile, by tile index"""
+        if self._tile_keys is None:
+            self._tile_keys = [0] * self.tile_count
+            for cell, bits in self.grid.keys.unlock.items():
+                row, col = divmod(cell, self.grid.cols)
+                self._tile_keys[(row // TILE_SIZE) * self._tile_cols + col // TILE_SIZE] |= bits
+        return self._tile_keys
+
+    def _sync(self):
+        """Re-render the rows (and mark the tiles) whose tiles changed since the last render"""
+        collected = self.grid.collected
+        if collected == self._collected:
+            return
+        changed = self._collected ^ collected
+        template, cols = self.grid.template, self.grid.cols
+        dirty = set()
+        for cell, bits in self.grid.keys.unlock.items():
+            if changed & bits:
+                tile = 0 if collected & bits else template[cell]
+                if self._tiles[cell] != tile:
+                    self._tiles[cell] = tile
+                    row, col = divmod(cell, cols)
+                    if self._cells is not None:
+                        self._cells[row][col] = _TILE_TEXT[tile]
+                    dirty.add(row)
+                    if self._tile_hashes is not None:
+                        self._stale_tiles.add((row // TILE_SIZE) * self._tile_cols + col // TILE_SIZE)
+        if self._cells is not None:
+            for row in dirty:
+                self._rows[row] = ''.join(self._cells[row]) + '\n'
+        self._collected = collected
+        if dirty:
+            self._bot = self._text = None
+
+    def emoji(self, i, j, direction):
+        """The emoji grid with the bot at (i, j), identical to render_emoji()"""
+        if self._cells is None:
+            cols = self.grid.cols
+            self._cells = [[_TILE_TEXT[tile] for tile in self._tiles[row * cols:(row + 1) * cols]]
+                           for row in range(self.grid.rows)]
+            self._rows = [''.join(cells) + '\n' for cells in self._cells]
+        self._sync()
+        bot = (i, j, direction)
+        if bot != self._bot:
+            self._bot = bot
+            self._text = None
+            if 0 <= i < self.grid.rows and 0 <= j < self.grid.cols:
+                cells = self._cells[i]
+                self._bot_row = ''.join(cells[:j]) + _bot_text(direction) + ''.join(cells[j + 1:]) + '\n'
+            else:
+                self._bot_row = None
+        if self._text is None:
+            if self._bot_row is None:
+                self._text = ''.join(self._rows)
+            else:
+                self._text = ''.join(self._rows[:i]) + self._bot_row + ''.join(self._rows[i + 1:])
+        return self._text
+
+    def ints(self, i, j, direction):
+        self._sync()
+        cols = self.grid.cols
+        return {
+            'rows': self.grid.rows,
+            'cols': cols,
+            'tiles': [list(self._tiles[row * cols:(row + 1) * cols]) for row in range(self.grid.rows)],
+            'bot': [i, j, direction]
+        }
+
+    def base64(self, i, j, direction):
+        self._sync()
+        return {
+            'rows': self.grid.rows,
+            'cols': self.grid.cols,
+            'tiles': base64.b64encode(bytes(self._tiles)).decode('ascii'),
+            'bot': [i, j, direction]
+        }
+
+    def _name_tile(self, index):
+        """(id, tile) of a viewport tile from the current tiles"""
+        rows, cols = self.grid.rows, self.grid.cols
+        tile_row, tile_col = divmod(index, self._tile_cols)
+        top, left = tile_row * TILE_SIZE, tile_col * TILE_SIZE
+        height, width = min(TILE_SIZE, rows - top), min(TILE_SIZE, cols - left)
+        tiles = b''.join(bytes(self._tiles[row * cols + left:row * cols + left + width])
+                         for row in range(top, top + height))
+        keys = self._collected & self.tile_keys()[index]
+        return tile_name(tile_hash(height, width, tiles), self.level, index, keys), (height, width, tiles)
+
+    def changed_tiles(self):
+        """[[tile index, new id], ...] for the tiles that changed since the last call"""
+        self._sync()
+        if self._tile_hashes is None:
+            self._tile_hashes = []
+            for index in range(self.tile_count):
+                name, tile = self._name_tile(index)
+                tile_store.add(name, tile)
+                self._tile_hashes.append(name)
+            self._stale_tiles.clear()
+            return []
+        changed = []
+        for index in sorted(self._stale_tiles):
+            name, tile = self._name_tile(index)
+            if name != self._tile_hashes[index]:
+                tile_store.add(name, tile)
+                self._tile_hashes[index] = name
+                changed.append([index, name])
+        self._stale_tiles.clear()
+        return changed
+
+    def camera(self, i, j):
+        """[top, left] of the VIEWPORT_SIZE window centred on (i, j), kept inside the grid"""
+        rows, cols = self.grid.rows, self.grid.cols
+        height, width = min(VIEWPORT_SIZE, rows), min(VIEWPORT_SIZE, cols)
+        return [min(max(i - height // 2, 0), rows - height), min(max(j - width // 2, 0), cols - width)]
+
+    def viewport(self, i, j, direction):
+        """The whole tile map (ids) with the bot and its camera window"""
+        self.changed_tiles()
+        rows, cols, tile_cols = self.grid.rows, self.grid.cols, self._tile_cols
+        return {
+            'rows': rows,
+            'cols': cols,
+            'tile_size': TILE_SIZE,
+            'tiles': [self._tile_hashes[start:start + tile_cols] for start in range(0, len(self._tile_hashes), tile_cols)],
+            'view': [min(VIEWPORT_SIZE, rows), min(VIEWPORT_SIZE, cols)],
+            'camera': self.camera(i, j),
+            'bot': [i, j, direction],
+            'palette': {'tiles': TILE_EMOJIS, 'bot': BOT_EMOJIS}
+        }
+
+    def render(self, grid_format, i, j, direction):
+        """The grid in one of GRID_FORMATS"""
+        if grid_format == 'emoji':
+            return self.emoji(i, j, direction)
+        if grid_format == 'ints':
+            return self.ints(i, j, direction)
+        if grid_format == 'base64':
+            return self.base64(i, j, direction)
+        if grid_format == 'viewport':
+            return self.viewport(i, j, direction)
+        raise ValueError(f"Unknown grid format {grid_format!r}. Must be one of: {', '.join(GRID_FORMATS)}")
@@ -0,0 +1,425 @@
+"""
+Process-pool sandbox for running user code
+
+User code runs in a small pool of pre-started worker processes instead of a
+thread inside the web worker. Each worker process has CPU-time and
+address-space rlimits. A worker that overruns its timeout is killed and
+respawned, so a runaway `while True:` never keeps burning CPU in the web
+process.
+
+The objects passed in `globals` (e.g. the bot) are pickled into the worker and
+their state is copied back after the run, so callers can keep reading the
+same objects afterwards exactly as with an in-process exec. Source may be a
+string or an already compiled code object (sent to the worker via marshal).
+
+Workers are started through a forkserver (spawn where that is missing):
+the web process runs request threads, and forking a threaded process can
+leave a worker stuck on a lock another thread held. The forkserver imports
+the modules in PRELOAD_MODULES once, so workers start warm and can unpickle
+the objects they are sent; modules defining such classes call preload().
+
+Code running in the sandbox can call publish(event, payload) to stream
+events (e.g. animation frames) back to the caller's on_event callback while
+it is still running.
+
+Environment variables:
+    SANDBOX_MODE        'process' (default where fork is available) or 'thread'
+    SANDBOX_START_METHOD  'forkserver' (default where available) or 'spawn'
+    SANDBOX_WORKERS     Number of executor processes per web worker (default 2)
+    SANDBOX_MEMORY_MB   Address space allowed on top of the forked baseline (default 256)
+    SANDBOX_MAX_TASKS   Runs before a worker process is recycled (default 500)
+    SANDBOX_ACQUIRE_TIMEOUT  Seconds a run waits for an idle worker before SandboxBusy (default 30)
+"""
+
+import atexit
+import logging
+import marshal
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import types
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from python_decoder import TimeoutError, WinInterruption, BudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+SANDBOX_WORKERS = int(os.environ.get('SANDBOX_WORKERS', 2))
+SANDBOX_MEMORY_MB = int(os.environ.get('SANDBOX_MEMORY_MB', 256))
+SANDBOX_MAX_TASKS = int(os.environ.get('SANDBOX_MAX_TASKS', 500))
+SANDBOX_ACQUIRE_TIMEOUT = float(os.environ.get('SANDBOX_ACQUIRE_TIMEOUT', 30))
+SANDBOX_START_METHOD = os.environ.get(
+    'SANDBOX_START_METHOD',
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+SANDBOX_MODE = os.environ.get(
+    'SANDBOX_MODE',
+    'process' if 'fork' in multiprocessing.get_all_start_methods() else 'thread'
+)
+
+# Extra CPU seconds granted on top of the wall-clock timeout before SIGXCPU
+CPU_GRACE_SECONDS = 1
+
+# Modules the forkserver imports before forking workers ('__main__' is the script that started the app).
+# Before Python 3.13 the forkserver skips '__main__' and every worker re-runs the script through
+# runpy while it starts, so runpy and what a worker unpickles first (this module, its Popen) are
+# preloaded by name; otherwise each (re)started worker spends ~10ms importing them again.
+PRELOAD_MODULES = ['__main__', 'runpy', 'pkgutil', 'multiprocessing.popen_forkserver', __name__, 'python_decoder']
+
+# Retry-After hint (seconds) when no worker frees up in time
+BUSY_RETRY_AFTER = 5
+
+# Where publish() delivers events for the run in progress: the pipe to the
+# caller inside an executor process, or the on_event callback in thread mode
+_event_channel = threading.local()
+
+
+class SandboxBusy(Exception):
+    """No executor process became idle in time; retry_after is a suggested wait in seconds"""
+
+    def __init__(self, retry_after=BUSY_RETRY_AFTER):
+        super().__init__(f"No sandbox worker available, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def preload(module_name):
+    """Have executor processes import module_name before their first run (call before the pool starts)"""
+    if module_name not in PRELOAD_MODULES:
+        PRELOAD_MODULES.append(module_name)
+
+
+def publish(event, payload):
+    """Stream an event to the caller of the current sandboxed run (no-op if nobody listens)"""
+    sink = getattr(_event_channel, 'sink', None)
+    if sink is not None:
+        sink(event, payload)
+
+
+def _address_space_baseline():
+    """Virtual memory size of the current process in bytes (Linux only)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[0])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _apply_memory_limit(memory_mb):
+    """Cap the worker's address space at its started size plus memory_mb"""
+    if resource is None:
+        return
+    baseline = _address_space_baseline()
+    if baseline is None:
+        return
+    limit = baseline + memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _apply_cpu_limit(seconds):
+    """Allow the worker `seconds` more CPU time from now before SIGXCPU"""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds) + CPU_GRACE_SECONDS
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, memory_mb):
+    """Executor process loop: receive a job, exec it, send back the outcome"""
+    _apply_memory_limit(memory_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        source, globals, locals, timeout_seconds, stream = job
+        if isinstance(source, bytes):
+            source = marshal.loads(source)
+        # Only the caller's entries go back; user-defined functions and generators may not pickle
+        provided_globals = set(globals) if globals is not None else ()
+        provided_locals = set(locals) if locals is not None else ()
+        _apply_cpu_limit(timeout_seconds)
+        _event_channel.sink = (lambda event, payload: conn.send(('event', event, payload))) if stream else None
+        status, error = None, None
+        try:
+            exec(source, globals, locals)
+            status = "success"
+        except WinInterruption:
+            # WinInterruption is expected - bot won
+            status = "win"
+        except SystemExit:
+            # Matches a thread that simply stopped without a result
+            pass
+        except BaseException as e:
+            error = e
+        _event_channel.sink = None
+
+        try:
+            conn.send(('result', status, _shareable(globals, provided_globals), _shareable(locals, provided_locals), error))
+        except Exception:
+            # The error (or the state) could not be pickled - send a plain description instead
+            if error is not None:
+                error = RuntimeError(f"{type(error).__name__}: {error}")
+            conn.send(('result', status, None, None, error))
+
+
+def _shareable(namespace, provided):
+    """Return the caller-provided entries of a namespace (without exec's or the program's additions)"""
+    if namespace is None:
+        return None
+    return {key: value for key, value in namespace.items() if key in provided and key != '__builtins__'}
+
+
+def _sync_namespace(target, state):
+    """Copy state returned by a worker back into the caller's namespace objects"""
+    if target is None or state is None:
+        return
+    for key in list(target):
+        if key not in state:
+            continue
+        original, updated = target[key], state[key]
+        if type(original) is type(updated) and hasattr(original, '__dict__'):
+            # Keep the caller's object identity (e.g. the bot) and refresh its state
+            original.__dict__.update(updated.__dict__)
+        else:
+            target[key] = updated
+
+
+class SandboxWorker:
+    """A single pre-started executor process and its pipe"""
+
+    def __init__(self, context, memory_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def kill(self):
+        """Terminate the process immediately and release its pipe"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        """Ask the process to exit after its current job"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+class SandboxPool:
+    """Fixed-size pool of executor processes with kill-and-respawn on timeout"""
+
+    def __init__(self, size=SANDBOX_WORKERS, memory_mb=SANDBOX_MEMORY_MB, max_tasks=SANDBOX_MAX_TASKS,
+                 acquire_timeout=SANDBOX_ACQUIRE_TIMEOUT, start_method=SANDBOX_START_METHOD):
+        self.size = size
+        self.memory_mb = memory_mb
+        self.max_tasks = max_tasks
+        self.acquire_timeout = acquire_timeout
+        self.pid = os.getpid()
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            self._context.set_forkserver_preload(PRELOAD_MODULES)
+        self._idle = queue.LifoQueue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        worker = SandboxWorker(self._context, self.memory_mb)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _replenish(self):
+        """Start workers in place of any lost to a failed respawn"""
+        # Dead workers are replaced where they are found: by run() if busy, by _acquire() if idle
+        with self._lock:
+            missing = self.size - len(self._workers)
+        for _ in range(missing):
+            try:
+                self._idle.put(self._spawn())
+            except OSError as e:
+                logger.error(f"Could not start a sandbox worker: {e}")
+                return
+
+    def _acquire(self):
+        """
+        An idle worker; raises SandboxBusy if none frees up within acquire_timeout
+
+        Workers are not checked for liveness here: is_alive() costs a select()
+        per run for forkserver children, and run() already replaces a worker
+        that died while idle when the job can't be sent to it.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                return self._idle.get(timeout=max(min(deadline - time.monotonic(), 1), 0))
+            except queue.Empty:
+                self._replenish()
+                if time.monotonic() >= deadline:
+                    raise SandboxBusy()
+
+    def _retire(self, worker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill()
+
+    def _release(self, worker, healthy):
+        """Return a worker to the pool, replacing it if it is unusable or worn out"""
+        if self._closed:
+            self._retire(worker)
+            return
+        if not healthy or worker.tasks >= self.max_tasks:
+            self._retire(worker)
+            try:
+                worker = self._spawn()
+            except OSError as e:
+                # _acquire tops the pool back up later
+                logger.error(f"Could not respawn a sandbox worker: {e}")
+                return
+        self._idle.put(worker)
+
+    def run(self, source, globals=None, locals=None, timeout_seconds=20, on_event=None):
+        """Execute source in a worker process; same contract as execute_with_timeout"""
+        if isinstance(source, types.CodeType):
+            # Code objects don't pickle; marshal is their native serialization
+            source = marshal.dumps(source)
+        job = (source, globals, locals, timeout_seconds, on_event is not None)
+        worker = self._acquire()
+        healthy = False
+        try:
+            try:
+                worker.conn.send(job)
+            except (BrokenPipeError, EOFError, OSError):
+                # The idle worker died (e.g. killed externally) - retry once on a fresh one
+                self._retire(worker)
+                worker = self._spawn()
+                worker.conn.send(job)
+            worker.tasks += 1
+
+            deadline = time.monotonic() + timeout_seconds
+            while True:
+                if not worker.conn.poll(max(deadline - time.monotonic(), 0)):
+                    logger.warning(f"Sandbox worker {worker.process.pid} timed out after {timeout_seconds}s, killing it")
+                    raise TimeoutError(f"Code execution exceeded {timeout_seconds} seconds")
+                try:
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(timeout=1)
+                    logger.warning(f"Sandbox worker {worker.process.pid} exited with code {worker.process.exitcode}")
+                    # SIGXCPU (CPU rlimit) is the common cause; report it like a timeout
+                    raise TimeoutError(f"Code execution exceeded {timeout_seconds} seconds")
+                if message[0] == 'event':
+                    # A failing callback aborts the run; the worker is replaced below
+                    on_event(message[1], message[2])
+                    continue
+                _, status, global_state, local_state, error = message
+                break
+            healthy = True
+        finally:
+            self._release(worker, healthy)
+
+        _sync_namespace(globals, global_state)
+        _sync_namespace(locals, local_state)
+        if error is not None:
+            raise error
+        return status
+
+    def close(self):
+        """Stop all executor processes"""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+def run_in_thread(source, globals=None, locals=None, timeout_seconds=20, on_event=None):
+    """Fallback executor for platforms without fork: a daemon thread that cannot be killed"""
+    result_queue = queue.Queue()
+    exception_queue = queue.Queue()
+
+    def code_executor():
+        """Execute code in a separate thread"""
+        _event_channel.sink = on_event
+        try:
+            exec(source, globals, locals)
+            result_queue.put("success")
+        except WinInterruption:
+            # WinInterruption is expected - bot won
+            result_queue.put("win")
+        except (Exception, BudgetExceeded) as e:
+            # Put exception in queue for re-raising
+            exception_queue.put(e)
+
+    thread = threading.Thread(target=code_executor)
+    thread.daemon = True  # Dies when main thread dies
+    thread.start()
+
+    # Wait for thread to complete, with timeout
+    thread.join(timeout=timeout_seconds)
+
+    # Check if thread is still alive (timed out)
+    if thread.is_alive():
+        raise TimeoutError(f"Code execution exceeded {timeout_seconds} seconds")
+
+    # Check for exceptions first
+    if not exception_queue.empty():
+        raise exception_queue.get()
+
+    # Return result if available (success or win)
+    return result_queue.get() if not result_queue.empty() else None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return this process's sandbox pool, starting the executor processes on first use"""
+    global _pool
+    with _pool_lock:
+        # A pool inherited through fork (e.g. gunicorn --preload) belongs to the parent
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = SandboxPool()
+            logger.info(f"Started sandbox pool with {_pool.size} executor processes")
+        return _pool
+
+
+def execute(source, globals=None, locals=None, timeout_seconds=20, on_event=None):
+    """Run source in the configured sandbox, passing published events to on_event(event, payload)"""
+    if SANDBOX_MODE == 'thread':
+        return run_in_thread(source, globals, locals, timeout_seconds, on_event)
+    return get_pool().run(source, globals, locals, timeout_seconds, on_event)
+
+
+@atexit.register
+def _shutdown():
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close()
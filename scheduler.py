@@ -0,0 +1,261 @@
+"""
+Fair scheduling and admission control for code executions
+
+Every run on the sandbox passes through the scheduler twice:
+
+1. admit(client) when the request arrives, unless nothing will run
+   (invalid or unsafe code, or a memoized result; see
+   app.check_submission). Each session and each client IP
+   has a token bucket (rate limit) and a cap on runs in flight (admitted
+   but not finished). A request over either limit is refused with
+   Rejected, carrying a Retry-After hint, before it takes any capacity.
+2. acquire(ticket) around the sandbox run itself. At most `slots` runs use
+   the sandbox at once. When a slot frees up, the waiting run with the
+   lowest expected cost goes next: its session's average run time so far,
+   minus the time it has already waited, so short runs overtake long ones
+   but a long run is never starved.
+
+Queue depth, running runs, wait times and rejections are exported through
+metrics.registry.
+
+Environment variables:
+    SCHEDULER_SLOTS       Runs using the sandbox at once (default: SANDBOX_WORKERS)
+    SCHEDULER_MAX_WAIT    Seconds an interactive run may wait for a slot (default 20)
+    SESSION_MAX_RUNS      Runs in flight per session (default 2)
+    SESSION_RATE          Runs per second per session, sustained (default 2)
+    SESSION_BURST         Runs a session may start back to back (default 10)
+    IP_MAX_RUNS           Runs in flight per client IP (default 16; classrooms share one)
+    IP_RATE               Runs per second per client IP, sustained (default 10)
+    IP_BURST              Runs an IP may start back to back (default 40)
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+
+import metrics
+from cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_SLOTS = int(os.environ.get('SCHEDULER_SLOTS', os.environ.get('SANDBOX_WORKERS', 2)))
+SCHEDULER_MAX_WAIT = float(os.environ.get('SCHEDULER_MAX_WAIT', 20))
+SESSION_MAX_RUNS = int(os.environ.get('SESSION_MAX_RUNS', 2))
+SESSION_RATE = float(os.environ.get('SESSION_RATE', 2))
+SESSION_BURST = float(os.environ.get('SESSION_BURST', 10))
+IP_MAX_RUNS = int(os.environ.get('IP_MAX_RUNS', 16))
+IP_RATE = float(os.environ.get('IP_RATE', 10))
+IP_BURST = float(os.environ.get('IP_BURST', 40))
+
+# Clients whose buckets and run-time history are remembered
+TRACKED_CLIENTS = 10_000
+# Expected run time (seconds) of a session without history
+DEFAULT_COST = 0.5
+# Weight of the newest run in a session's average run time
+HISTORY_WEIGHT = 0.3
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 20, 60)
+
+# Who is asking: session ID and client IP (either may be None)
+Client = namedtuple('Client', ['session', 'ip'])
+
+
+class Rejected(Exception):
+    """A run was refused; reason is a short label, retry_after a suggested wait in seconds"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Execution refused ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average and up to `burst` at once"""
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def wait_time(self, now, cost=1):
+        """Seconds until `cost` tokens are available (0 if they are available now)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            return 0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def take(self, cost=1):
+        self.tokens -= cost
+
+
+class Ticket:
+    """An admitted request; close it (or leave its with block) once all its runs are done"""
+    __slots__ = ('scheduler', 'client', 'max_wait', 'closed')
+
+    def __init__(self, scheduler, client, max_wait):
+        self.scheduler = scheduler
+        self.client = client
+        self.max_wait = max_wait
+        self.closed = False
+
+    def close(self):
+        self.scheduler._close(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Slot:
+    """A held sandbox slot; releasing it records the run time in the session's history"""
+    __slots__ = ('scheduler', 'ticket', 'started')
+
+    def __init__(self, scheduler, ticket):
+        self.scheduler = scheduler
+        self.ticket = ticket
+        self.started = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.scheduler._release(self)
+
+
+class Scheduler:
+    """Admission control (rate limits, in-flight caps) and cost-ordered sandbox slots"""
+
+    def __init__(self, slots=SCHEDULER_SLOTS, session_max_runs=SESSION_MAX_RUNS, session_rate=SESSION_RATE,
+                 session_burst=SESSION_BURST, ip_max_runs=IP_MAX_RUNS, ip_rate=IP_RATE, ip_burst=IP_BURST):
+        self.slots = slots
+        # kind -> (max runs in flight, rate, burst)
+        self.limits = {
+            'session': (session_max_runs, session_rate, session_burst),
+            'ip': (ip_max_runs, ip_rate, ip_burst),
+        }
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting = []    # [expected cost, enqueued at] per waiting run
+        self._in_flight = {}  # (kind, key) -> admitted tickets not yet closed
+        self._buckets = LRUCache(TRACKED_CLIENTS)  # (kind, key) -> TokenBucket
+        self._history = LRUCache(TRACKED_CLIENTS)  # session -> average run seconds
+        self.rejections = {}  # reason -> count
+
+    def _reject(self, reason, retry_after):
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        metrics.registry.inc('botgame_scheduler_rejections_total', {'reason': reason})
+        raise Rejected(reason, max(1, math.ceil(retry_after)))
+
+    def expected_cost(self, session):
+        """Average run time of a session's recent runs, in seconds"""
+        return self._history.get(session, DEFAULT_COST) if session is not None else DEFAULT_COST
+
+    def admit(self, client, max_wait=SCHEDULER_MAX_WAIT, cost=1):
+        """
+        Check a client's rate limits and in-flight caps; returns a Ticket or raises Rejected
+
+        max_wait bounds how long each run of the ticket may wait for a slot
+        (None waits as long as it takes, for queued jobs and batches). cost
+        is the number of runs the ticket covers, each charged to the rate
+        limits; more than a bucket's burst is refused outright.
+        """
+        keys = [(kind, key) for kind, key in (('session', client.session), ('ip', client.ip)) if key is not None]
+        now = time.monotonic()
+        with self._cond:
+            for kind, key in keys:
+                if self._in_flight.get((kind, key), 0) >= self.limits[kind][0]:
+                    self._reject(f'{kind}_runs', self.expected_cost(client.session))
+            buckets = []
+            for kind, key in keys:
+                bucket = self._buckets.get((kind, key))
+                if bucket is None:
+                    bucket = TokenBucket(*self.limits[kind][1:])
+                    self._buckets.put((kind, key), bucket)
+                if cost > bucket.burst:
+                    # Never admissible; the hint is when the bucket is full again
+                    self._reject(f'{kind}_burst', bucket.wait_time(now, bucket.burst))
+                wait = bucket.wait_time(now, cost)
+                if wait > 0:
+                    self._reject(f'{kind}_rate', wait)
+                buckets.append(bucket)
+            # Only take tokens once every check has passed
+            for bucket in buckets:
+                bucket.take(cost)
+            for kind_key in keys:
+                self._in_flight[kind_key] = self._in_flight.get(kind_key, 0) + 1
+        return Ticket(self, client, max_wait)
+
+    def _close(self, ticket):
+        with self._cond:
+            if ticket.closed:
+                return
+            ticket.closed = True
+            for kind_key in (('session', ticket.client.session), ('ip', ticket.client.ip)):
+                if kind_key[1] is None:
+                    continue
+                remaining = self._in_flight.get(kind_key, 0) - 1
+                if remaining > 0:
+                    self._in_flight[kind_key] = remaining
+                else:
+                    self._in_flight.pop(kind_key, None)
+
+    def _next(self, now):
+        """The waiting entry to start next: lowest expected cost minus time waited"""
+        return min(self._waiting, key=lambda entry: entry[0] - (now - entry[1]))
+
+    def acquire(self, ticket):
+        """Wait for a sandbox slot in cost order; returns a Slot or raises Rejected('busy')"""
+        now = time.monotonic()
+        entry = [self.expected_cost(ticket.client.session), now]
+        deadline = now + ticket.max_wait if ticket.max_wait is not None else None
+        with self._cond:
+            self._waiting.append(entry)
+            self._publish()
+            try:
+                while not (self._running < self.slots and self._next(time.monotonic()) is entry):
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            self._reject('busy', self.expected_cost(None) * len(self._waiting) / self.slots)
+                    self._cond.wait(timeout)
+            finally:
+                self._waiting.remove(entry)
+                # Whoever is next now may be able to start
+                self._cond.notify_all()
+            self._running += 1
+            self._publish()
+        metrics.registry.observe('botgame_scheduler_wait_seconds', {}, time.monotonic() - now, WAIT_BUCKETS)
+        return Slot(self, ticket)
+
+    def _release(self, slot):
+        seconds = time.monotonic() - slot.started
+        session = slot.ticket.client.session
+        with self._cond:
+            self._running -= 1
+            if session is not None:
+                average = self._history.get(session)
+                average = seconds if average is None else (1 - HISTORY_WEIGHT) * average + HISTORY_WEIGHT * seconds
+                self._history.put(session, average)
+            self._publish()
+            self._cond.notify_all()
+
+    def _publish(self):
+        metrics.registry.set('botgame_scheduler_waiting', {}, len(self._waiting))
+        metrics.registry.set('botgame_scheduler_running', {}, self._running)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'slots': self.slots,
+                'running': self._running,
+                'waiting': len(self._waiting),
+                'rejections': dict(self.rejections)
+            }
@@ -0,0 +1,304 @@
+"""
+State-space solver for levels
+
+Breadth-first search over (cell, direction, collected-keys mask) using the
+same movement rules as Bot: walls and closed gates block, stepping onto a
+zappy wall kills the bot (so those moves are never taken), stepping onto a
+key collects it and opens the gates of its color, and reaching the end tile
+wins. Every action (move_forward, move_backward, turn_left, turn_right)
+costs one, so the first win found is a shortest route.
+
+States are packed into single ints and only reached states are stored, so
+key-free grids of a few hundred cells per side solve in seconds.
+
+LevelHints answers "what next, and how far?" for any bot state. It uses
+distance fields computed lazily for each collected-keys mask.
+
+Run `python solver.py` to verify every level in grids.ALL_LEVELS (exits 1 if
+any level is unsolvable).
+"""
+
+import heapq
+import sys
+from collections import deque, namedtuple
+
+from python_decoder import DIRECTION_DELTAS, TILE_KINDS, TILE_OPEN, TILE_BLOCKED, TILE_ZAPPY, TILE_KEY
+
+END_TILE = 3
+
+# Action ids used in routes
+ACTIONS = ('move_forward', 'move_backward', 'turn_left', 'turn_right')
+MOVE_FORWARD, MOVE_BACKWARD, TURN_LEFT, TURN_RIGHT = range(4)
+# Moves first, so ties favour routes that make progress before turning
+ACTIONS_ORDER = (MOVE_FORWARD, TURN_LEFT, TURN_RIGHT, MOVE_BACKWARD)
+
+Solution = namedtuple('Solution', [
+    'solvable',  # True if the end tile can be reached
+    'actions',   # Length of the shortest winning route (None if unsolvable)
+    'route',     # Action names of one shortest route (None if unsolvable)
+    'states'     # Number of states visited
+])
+
+
+def _neighbours(rows, cols):
+    """Per direction, the cell in front of each cell (-1 if off the grid)"""
+    cells = rows * cols
+    tables = []
+    for di, dj in DIRECTION_DELTAS:
+        table = [-1] * cells
+        for cell in range(cells):
+            i, j = divmod(cell, cols)
+            ni, nj = i + di, j + dj
+            if 0 <= ni < rows and 0 <= nj < cols:
+                table[cell] = ni * cols + nj
+        tables.append(table)
+    return tables
+
+
+def solve(grid, max_states=None):
+    """
+    Find a shortest winning route for a Grid from its start position
+
+    Starts from the grid's current collected keys. max_states bounds the
+    search; the level counts as unsolvable if it is exceeded.
+    """
+    cols, cells = grid.cols, grid.rows * grid.cols
+    template = grid.template
+    unlock = grid.keys.unlock
+    key_bits = grid.keys.key_bits
+    ahead = _neighbours(grid.rows, cols)
+    # Behind the bot is what is ahead of it when facing the opposite way
+    behind = [ahead[(direction + 2) % 4] for direction in range(4)]
+
+    start_cell = grid.start_pos[0] * cols + grid.start_pos[1]
+    start = ((grid.collected * cells) + start_cell) * 4 + grid.start_direction % 4
+
+    def tile_at(cell, mask):
+        return 0 if mask & unlock.get(cell, 0) else template[cell]
+
+    if tile_at(start_cell, grid.collected) == END_TILE:
+        # Any move call (even a blocked one) checks for the win
+        return Solution(True, 1, [ACTIONS[MOVE_FORWARD]], 1)
+
+    # state -> previous state * 4 + action
+    parents = {start: -1}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        direction = state & 3
+        rest = state >> 2
+        mask, cell = divmod(rest, cells)
+
+        for action in ACTIONS_ORDER:
+            if action == TURN_LEFT:
+                nxt = (rest << 2) | ((direction + 1) & 3)
+            elif action == TURN_RIGHT:
+                nxt = (rest << 2) | ((direction - 1) & 3)
+            else:
+                target = (ahead if action == MOVE_FORWARD else behind)[direction][cell]
+                if target < 0:
+                    continue
+                tile = tile_at(target, mask)
+                kind = TILE_KINDS[tile]
+                if kind == TILE_BLOCKED or kind == TILE_ZAPPY:
+                    continue
+                if tile == END_TILE:
+                    route = [ACTIONS[action]]
+                    link = parents[state]
+                    while link >= 0:
+                        route.append(ACTIONS[link & 3])
+                        link = parents[link >> 2]
+                    route.reverse()
+                    return Solution(True, len(route), route, len(parents))
+                new_mask = mask | key_bits[target] if kind == TILE_KEY else mask
+                nxt = ((new_mask * cells + target) << 2) | direction
+            if nxt not in parents:
+                parents[nxt] = (state << 2) | action
+                queue.append(nxt)
+        if max_states is not None and len(parents) > max_states:
+            break
+    return Solution(False, None, None, len(parents))
+
+
+# Distance of states from which the end tile cannot be reached
+UNREACHABLE = -1
+
+
+class LevelHints:
+    """
+    Actions-to-goal for every state of a grid, one distance field per key state
+
+    The field for a collected-keys mask holds, for each (cell, direction), the
+    fewest actions needed to win. Picking up a key moves the bot to a
+    larger mask, so building a field first builds the fields of the masks
+    one key further on. Fields are built on first use and kept. After that,
+    hint() is a handful of list lookups.
+    """
+
+    def __init__(self, grid):
+        self.cols = grid.cols
+        self.cells = grid.rows * grid.cols
+        self.template = grid.template
+        self.unlock = grid.keys.unlock
+        self.key_bits = grid.keys.key_bits
+        self.ahead = _neighbours(grid.rows, grid.cols)
+        self.behind = [self.ahead[(direction + 2) % 4] for direction in range(4)]
+        self._fields = {}  # mask -> distances indexed by cell * 4 + direction
+
+    def tile_at(self, cell, mask):
+        return 0 if mask & self.unlock.get(cell, 0) else self.template[cell]
+
+    def can_stand(self, cell, mask):
+        """False for walls, closed gates and zappy walls"""
+        kind = TILE_KINDS[self.tile_at(cell, mask)]
+        return kind != TILE_BLOCKED and kind != TILE_ZAPPY
+
+    def _next(self, cell, direction, mask, action):
+        """(cell, direction, mask) after an action, or None if it is blocked or deadly"""
+        if action == TURN_LEFT:
+            return cell, (direction + 1) & 3, mask
+        if action == TURN_RIGHT:
+            return cell, (direction - 1) & 3, mask
+        target = (self.ahead if action == MOVE_FORWARD else self.behind)[direction][cell]
+        if target < 0:
+            return None
+        kind = TILE_KINDS[self.tile_at(target, mask)]
+        if kind == TILE_BLOCKED or kind == TILE_ZAPPY:
+            return None
+        if kind == TILE_KEY:
+            mask |= self.key_bits[target]
+        return target, direction, mask
+
+    def field(self, mask):
+        """Distance field for a collected-keys mask, built on first use"""
+        distances = self._fields.get(mask)
+        if distances is None:
+            distances = self._fields[mask] = self._build(mask)
+        return distances
+
+    def _build(self, mask):
+        cells, infinity = self.cells, self.cells * 4 * (len(self.key_bits) + 1) + 1
+        standable = [TILE_KINDS[self.tile_at(cell, mask)] == TILE_OPEN for cell in range(cells)]
+        distances = [infinity] * (cells * 4)
+        heap = []
+        for cell in range(cells):
+            if not standable[cell]:
+                continue
+            if self.tile_at(cell, mask) == END_TILE:
+                for direction in range(4):
+                    distances[cell * 4 + direction] = 0
+                    heap.append((0, cell * 4 + direction))
+                continue
+            # Stepping onto a key leaves this key state: seed with the cost through the next field
+            for direction in range(4):
+                for action in (MOVE_FORWARD, MOVE_BACKWARD):
+                    step = self._next(cell, direction, mask, action)
+                    if step is None or step[2] == mask:
+                        continue
+                    after = self.field(step[2])[step[0] * 4 + step[1]]
+                    if after < infinity and after + 1 < distances[cell * 4 + direction]:
+                        distances[cell * 4 + direction] = after + 1
+                        heap.append((after + 1, cell * 4 + direction))
+        heapq.heapify(heap)
+
+        # Dijkstra backwards over the actions that stay within this key state
+        while heap:
+            distance, state = heapq.heappop(heap)
+            if distance > distances[state]:
+                continue
+            cell, direction = divmod(state, 4)
+            predecessors = (
+                (cell, (direction - 1) & 3),                     # turn_left onto this direction
+                (cell, (direction + 1) & 3),                     # turn_right onto this direction
+                (self.behind[direction][cell], direction),       # move_forward onto this cell
+                (self.ahead[direction][cell], direction),        # move_backward onto this cell
+            )
+            for previous_cell, previous_direction in predecessors:
+                if previous_cell < 0 or not standable[previous_cell] or self.tile_at(previous_cell, mask) == END_TILE:
+                    continue
+                previous = previous_cell * 4 + previous_direction
+                if distance + 1 < distances[previous]:
+                    distances[previous] = distance + 1
+                    heapq.heappush(heap, (distance + 1, previous))
+        return [UNREACHABLE if distance == infinity else distance for distance in distances]
+
+    def hint(self, cell, direction, mask):
+        """
+        (best next action, actions to win) for a bot state
+
+        The action is None when the bot already stands on the end tile
+        (distance 0) or the end cannot be reached (distance UNREACHABLE).
+        """
+        if TILE_KINDS[self.tile_at(cell, mask)] == TILE_KEY:
+            # Standing on a key means it has been collected
+            mask |= self.key_bits[cell]
+        distance = self.field(mask)[cell * 4 + direction]
+        if distance <= 0:
+            return None, distance
+        for action in ACTIONS_ORDER:
+            step = self._next(cell, direction, mask, action)
+            if step is not None and self.field(step[2])[step[0] * 4 + step[1]] == distance - 1:
+                return ACTIONS[action], distance
+        return None, UNREACHABLE
+
+
+# Process-wide cache of level hint tables
+_level_hints = {}
+
+
+def level_hints(level_number):
+    """LevelHints for a level in grids.ALL_LEVELS (1-indexed), kept for the life of the process"""
+    import grids
+    hints = _level_hints.get(level_number)
+    if hints is None:
+        hints = _level_hints[level_number] = LevelHints(grids.create_grid(level_number))
+    return hints
+
+
+# Process-wide cache of level solutions (levels never change at runtime)
+_level_solutions = {}
+
+
+def solve_level(level_number):
+    """Shortest route for a level in grids.ALL_LEVELS (1-indexed), cached"""
+    import grids
+    solution = _level_solutions.get(level_number)
+    if solution is None:
+        solution = _level_solutions[level_number] = solve(grids.create_grid(level_number))
+    return solution
+
+
+def verify_levels():
+    """Solve every level; returns a report dict per level"""
+    import grids
+    reports = []
+    for number in range(1, len(grids.ALL_LEVELS) + 1):
+        info = grids.get_level_info(number)
+        solution = solve_level(number)
+        reports.append({
+            'number': number,
+            'name': info['name'],
+            'par': info['par'],
+            'solvable': solution.solvable,
+            'actions': solution.actions,
+            'route': solution.route,
+            # Par counts commands in the program; a straight-line program of the
+            # shortest route already needs no more than `actions` commands
+            'par_above_route': solution.solvable and info['par'] > solution.actions
+        })
+    return reports
+
+
+if __name__ == "__main__":
+    show_routes = '--routes' in sys.argv
+    unsolvable = 0
+    for report in verify_levels():
+        if not report['solvable']:
+            unsolvable += 1
+            print(f"Level {report['number']:2d}: {report['name']:24s} UNSOLVABLE")
+            continue
+        note = '  (par is above the straight-line route length)' if report['par_above_route'] else ''
+        print(f"Level {report['number']:2d}: {report['name']:24s} shortest route {report['actions']:3d} actions, par {report['par']}{note}")
+        if show_routes:
+            print(f"          {', '.join(report['route'])}")
+    sys.exit(1 if unsolvable else 0)
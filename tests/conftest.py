@@ -0,0 +1,29 @@
+"""
+Shared test setup
+
+The app is configured through environment variables read at import time,
+so they are set here, before any test module imports it: runs happen in a
+thread (no executor processes), progress and metrics stay out of the
+working tree, and rate limits are lifted so tests can run code freely.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('SANDBOX_MODE', 'thread')
+os.environ.setdefault('PROGRESS_BACKEND', 'memory')
+os.environ.setdefault('METRICS_DIR', tempfile.mkdtemp(prefix='bot-game-test-metrics-'))
+for name in ('SESSION_RATE', 'SESSION_BURST', 'IP_RATE', 'IP_BURST'):
+    os.environ.setdefault(name, '1000000')
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    import app
+    app.result_cache.clear()
+    return app.app.test_client()
@@ -0,0 +1,74 @@
+"""Admission control only applies to runs that reach the sandbox"""
+
+import pytest
+
+import app
+import scheduler
+
+
+@pytest.fixture
+def strict_client(client, monkeypatch):
+    # Two runs back to back, then one every 100 seconds
+    monkeypatch.setattr(app, 'execution_scheduler', scheduler.Scheduler(session_rate=0.01, session_burst=2))
+    return client
+
+
+def execute(client, code, level=1):
+    return client.post('/execute', json={'code': code, 'level': level})
+
+
+def test_memoized_reruns_do_not_spend_the_rate_limit(strict_client):
+    code = "bot.move_forward()"
+    assert execute(strict_client, code).status_code == 200
+    for _ in range(10):
+        response = execute(strict_client, code + "  # same program, reformatted")
+        assert response.status_code == 200
+        assert 'cache' in response.headers['Server-Timing']
+
+
+def test_new_programs_are_still_limited(strict_client):
+    assert execute(strict_client, "bot.turn_left()").status_code == 200
+    assert execute(strict_client, "bot.turn_right()").status_code == 200
+    response = execute(strict_client, "bot.move_forward()")
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+
+def test_rejected_code_is_not_admitted(strict_client):
+    for _ in range(5):
+        assert 'unsafe' in execute(strict_client, "import os").get_json()['error']
+        assert 'Invalid level' in execute(strict_client, "bot.turn_left()", level=10_000).get_json()['error']
+    assert execute(strict_client, "bot.turn_left()").status_code == 200
+
+
+def batch(client, codes):
+    return client.post('/execute/batch', json={'jobs': [{'id': index, 'code': code} for index, code in enumerate(codes)]})
+
+
+def test_batches_are_charged_per_run(strict_client):
+    response = batch(strict_client, ["bot.turn_left()", "bot.turn_right()", "bot.move_forward()"])
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    response = batch(strict_client, ["bot.turn_left()", "bot.turn_right()"])
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+    assert execute(strict_client, "bot.move_forward()").status_code == 429
+
+
+def test_batches_only_charge_runs_that_reach_the_sandbox(strict_client):
+    assert batch(strict_client, ["bot.turn_left()"]).status_code == 200
+    response = batch(strict_client, ["bot.turn_left()  # memoized", "import os", "bot.turn_right()"])
+    assert response.status_code == 200
+    assert execute(strict_client, "bot.move_forward()").status_code == 429
+
+
+def test_queued_jobs_check_before_admission(strict_client):
+    assert execute(strict_client, "bot.turn_left()").status_code == 200
+    for _ in range(5):
+        response = strict_client.post('/jobs', json={'code': "bot.turn_left()  # memoized"})
+        assert response.status_code == 202
+        job = strict_client.get(response.headers['Location'] + '?wait=5').get_json()
+        assert job['result']['success'] is False and 'command_count' in job['result']
+        assert strict_client.post('/jobs', json={'code': "import os"}).status_code == 202
+    assert strict_client.post('/jobs', json={'code': "bot.turn_right()"}).status_code == 202
+    assert strict_client.post('/jobs', json={'code': "bot.move_forward()"}).status_code == 429
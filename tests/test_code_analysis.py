@@ -0,0 +1,61 @@
+"""Import and sandbox policy of code_analysis.analyze"""
+
+import pytest
+
+from code_analysis import analyze
+
+UNSAFE_PROGRAMS = [
+    "import os",
+    "from subprocess import run",
+    "open('/etc/hostname')",
+    "f = open\nf('/etc/hostname')",
+    "import builtins\nbuiltins.open('/etc/hostname')",
+    "bot.__import__('os')",
+    "x = bot.eval",
+    "__builtins__.open('/etc/hostname')",
+    "getattr(bot, 'move_forward')()",
+]
+
+
+@pytest.mark.parametrize('code', UNSAFE_PROGRAMS)
+def test_dangerous_code_is_rejected(code):
+    analysis = analyze(code)
+    assert not analysis.safe
+    assert analysis.code_object is None
+
+
+def test_math_import_is_kept():
+    analysis = analyze("import math\nx = math.sqrt(16)\nfrom math import floor")
+    assert analysis.safe
+    namespace = {}
+    exec(analysis.code_object, namespace)
+    assert namespace['x'] == 4.0
+    assert 'floor' in namespace
+
+
+@pytest.mark.parametrize('code', ["import builtins", "import random", "import math, random",
+                                  "if True:\n    import json"])
+def test_other_imports_are_removed(code):
+    analysis = analyze(code)
+    assert analysis.safe
+    assert not {'builtins', 'random', 'json'} & set(analysis.code_object.co_names)
+
+
+def test_math_program_runs_through_execute(client):
+    code = "import math\nfor _ in range(int(math.sqrt(4))):\n    bot.move_forward()"
+    result = client.post('/execute', json={'code': code, 'level': 1, 'frames': 'none'}).get_json()
+    assert 'error' not in result
+    assert result['command_count'] == 1
+
+
+def test_builtins_escape_is_blocked_through_execute(client):
+    code = "import builtins\nraise ValueError(builtins.open('/etc/hostname').read())"
+    result = client.post('/execute', json={'code': code, 'level': 1}).get_json()
+    assert result['success'] is False
+    assert 'unsafe' in result['error']
+
+
+def test_stripped_import_is_not_available_through_execute(client):
+    result = client.post('/execute', json={'code': "import random\nrandom.random()", 'level': 1}).get_json()
+    assert result['success'] is False
+    assert "name 'random' is not defined" in result['error']
@@ -0,0 +1,52 @@
+"""Delta frames replay to the same boards as the legacy 'full' frames"""
+
+# Level 11: pick up the green key at the top, then die on the zappy wall next
+# to it inside a try block, so the key and its gate come back mid-run
+KEY_LEVEL = 11
+CAUGHT_DEATH = """bot.turn_left()
+for _ in range(7):
+    bot.move_forward()
+bot.turn_left()
+bot.move_backward()
+bot.move_backward()
+bot.turn_left()
+bot.move_backward()
+bot.move_backward()
+try:
+    bot.turn_left()
+    bot.move_backward()
+except Exception:
+    pass
+bot.move_forward()
+"""
+
+
+def execute(client, frames):
+    response = client.post('/execute', json={'code': CAUGHT_DEATH, 'level': KEY_LEVEL, 'frames': frames})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def replay(animation):
+    """The emoji board after every delta frame, rebuilt from the initial tiles and the changes"""
+    tiles = list(animation['tiles'])
+    cols = animation['cols']
+    changes = animation['changes']
+    tile_emojis, bot_emojis = animation['palette']['tiles'], animation['palette']['bot']
+    boards = []
+    for step in range(len(animation['action'])):
+        for changed_step, cell, tile in zip(changes['step'], changes['cell'], changes['tile']):
+            if changed_step == step:
+                tiles[cell] = tile
+        cells = [tile_emojis[tile] for tile in tiles]
+        cells[animation['row'][step] * cols + animation['col'][step]] = bot_emojis[animation['direction'][step]]
+        boards.append(''.join(''.join(cells[row:row + cols]) + '\n' for row in range(0, len(cells), cols)))
+    return boards
+
+
+def test_caught_death_restores_keys_and_gates_in_delta_frames(client):
+    delta = execute(client, 'delta')
+    full = execute(client, 'full')
+    assert full['alive'] and 'Move forward (right)' in full['action_log']
+    assert replay(delta['animation']) == [frame['grid_state'] for frame in full['frames']]
+    assert replay(delta['animation'])[-1] == delta['grid_state']
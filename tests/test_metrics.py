@@ -0,0 +1,69 @@
+"""Merging of worker metrics snapshots"""
+
+import json
+import os
+import subprocess
+import sys
+
+from metrics import MetricsRegistry
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_exited_workers_keep_counters_but_not_gauges(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    registry.inc('botgame_execute_outcomes_total', {'outcome': 'win', 'level': '1'})
+    registry.set('botgame_jobs_queued', {}, 2)
+    # A snapshot left behind by a worker gunicorn has since replaced
+    gone = {
+        'counters': [['botgame_execute_outcomes_total', [['level', '1'], ['outcome', 'win']], 5]],
+        'gauges': [['botgame_jobs_queued', [], 7]],
+        'histograms': []
+    }
+    (tmp_path / f"metrics-{exited_pid()}-1.json").write_text(json.dumps(gone))
+
+    counters, _ = registry.collect()
+    assert counters[('botgame_execute_outcomes_total', (('level', '1'), ('outcome', 'win')))] == 6
+    assert counters[('botgame_jobs_queued', ())] == 2
+
+
+def test_earlier_process_with_the_same_pid_is_treated_as_exited(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    stale = {'counters': [], 'gauges': [['botgame_jobs_queued', [], 7]], 'histograms': []}
+    (tmp_path / f"metrics-{os.getpid()}-1.json").write_text(json.dumps(stale))
+    counters, _ = registry.collect()
+    assert counters.get(('botgame_jobs_queued', ()), 0) == 0
+
+
+def test_without_a_directory_nothing_is_written(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = MetricsRegistry(None)
+    registry.inc('botgame_execute_outcomes_total', {'outcome': 'win', 'level': '1'})
+    registry.flush(force=True)
+    counters, _ = registry.collect()
+    assert sum(counters.values()) == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def outcomes(level):
+    import metrics
+    counters, _ = metrics.registry.collect()
+    return {labels[1][1]: value for (name, labels), value in counters.items()
+            if name == 'botgame_execute_outcomes_total' and labels[0] == ('level', level)}
+
+
+def test_streamed_and_batched_runs_are_recorded(client):
+    before = outcomes('2')
+    response = client.post('/execute/stream', json={'code': "bot.move_forward()", 'level': 2})
+    assert 'event: summary' in response.get_data(as_text=True)
+    response.close()
+    response = client.post('/execute/batch', json={'jobs': [{'code': "bot.turn_left()", 'level': 2},
+                                                            {'code': "import os", 'level': 2}]})
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+    after = outcomes('2')
+    assert after.get('incomplete', 0) - before.get('incomplete', 0) == 2
+    assert after.get('unsafe', 0) - before.get('unsafe', 0) == 1
@@ -0,0 +1,12 @@
+"""Per-level progress lookups"""
+
+import pytest
+
+
+@pytest.mark.parametrize('level_number', [0, 1, 10_000])
+def test_levels_without_progress(client, level_number):
+    response = client.get(f'/progress/{level_number}')
+    assert response.status_code == 200
+    assert response.get_json()['progress'] == {
+        'completed': False, 'best_commands': None, 'attempts': 0, 'has_star': False
+    }
@@ -0,0 +1,116 @@
+"""solver.solve: solvability, shortest routes and replaying them on a Bot"""
+
+from collections import deque
+
+import pytest
+
+import grids
+import solver
+from python_decoder import Bot, Grid, WinInterruption, DeathInterruption
+
+LEVEL_NUMBERS = range(1, len(grids.ALL_LEVELS) + 1)
+
+
+def grid_for(level):
+    return Grid(level['data'], level['start_pos'], level['start_dir'], level['par'])
+
+
+def shortest_by_simulation(grid):
+    """Length of a shortest winning route found by running every action on a real Bot (None if there is none)"""
+    bot = Bot(grid)
+    bot.moves_limit = float('inf')
+    start = bot.state
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        for action in solver.ACTIONS:
+            bot.i, bot.j, bot.direction, grid.collected = state
+            bot.win_state = False
+            try:
+                getattr(bot, action)()
+            except WinInterruption:
+                return distances[state] + 1
+            except DeathInterruption:
+                continue
+            if bot.state not in distances:
+                distances[bot.state] = distances[state] + 1
+                queue.append(bot.state)
+    return None
+
+
+@pytest.mark.parametrize('level_number', LEVEL_NUMBERS)
+def test_every_level_is_solvable_and_the_route_wins(level_number):
+    level = grids.ALL_LEVELS[level_number - 1]
+    solution = solver.solve(grid_for(level))
+    assert solution.solvable
+    assert len(solution.route) == solution.actions
+
+    bot = Bot(grid_for(level))
+    with pytest.raises(WinInterruption):
+        for action in solution.route:
+            getattr(bot, action)()
+    assert bot.moves == solution.actions
+
+
+@pytest.mark.parametrize('level_number', LEVEL_NUMBERS)
+def test_routes_are_as_short_as_a_search_over_the_real_bot(level_number):
+    level = grids.ALL_LEVELS[level_number - 1]
+    assert solver.solve(grid_for(level)).actions == shortest_by_simulation(grid_for(level))
+
+
+def test_verify_levels_reports_every_level():
+    reports = solver.verify_levels()
+    assert [report['number'] for report in reports] == list(LEVEL_NUMBERS)
+    assert all(report['solvable'] for report in reports)
+
+
+@pytest.mark.parametrize('data', [
+    # End walled off
+    [[1, 1, 1, 1, 1],
+     [1, 0, 1, 3, 1],
+     [1, 1, 1, 1, 1]],
+    # Only way to the end is through a zappy wall
+    [[1, 1, 1, 1, 1],
+     [1, 0, 2, 3, 1],
+     [1, 1, 1, 1, 1]],
+    # Gate with no key for it
+    [[1, 1, 1, 1, 1],
+     [1, 0, 7, 3, 1],
+     [1, 1, 1, 1, 1]],
+    # Key behind its own gate
+    [[1, 1, 1, 1, 1, 1],
+     [1, 0, 5, 4, 3, 1],
+     [1, 1, 1, 1, 1, 1]],
+], ids=['walled', 'zappy', 'no-key', 'key-behind-gate'])
+def test_unsolvable_grids(data):
+    grid = Grid(data, (1, 1), 3, 5)
+    solution = solver.solve(grid)
+    assert not solution.solvable
+    assert solution.actions is None and solution.route is None
+    assert shortest_by_simulation(Grid(data, (1, 1), 3, 5)) is None
+
+
+def test_key_detour_is_taken():
+    data = [[1, 1, 1, 1, 1],
+            [1, 0, 5, 3, 1],
+            [1, 0, 1, 1, 1],
+            [1, 4, 1, 1, 1],
+            [1, 1, 1, 1, 1]]
+    solution = solver.solve(Grid(data, (1, 1), 3, 5))
+    # Turn, two steps down to the key and two back, turn, two steps through the opened gate
+    assert solution.actions == 8
+    assert solution.actions == shortest_by_simulation(Grid(data, (1, 1), 3, 5))
+
+
+def test_max_states_bounds_the_search():
+    level = grids.ALL_LEVELS[-1]
+    full = solver.solve(grid_for(level))
+    bounded = solver.solve(grid_for(level), max_states=10)
+    assert full.states > 10
+    assert not bounded.solvable
+
+
+def test_start_on_the_end_tile():
+    solution = solver.solve(Grid([[1, 1, 1], [1, 3, 1], [1, 1, 1]], (1, 1), 0, 1))
+    assert solution.solvable and solution.actions == 1
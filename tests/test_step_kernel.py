@@ -0,0 +1,167 @@
+"""Bot movement and sensing (the table-driven step kernel) against the original rules"""
+
+import random
+
+import pytest
+
+import grids
+from python_decoder import Bot, Grid, WinInterruption, DeathInterruption, MovesExceeded
+
+BLOCKED = (1, 5, 7, 9, 11, 13)
+KEYS = (4, 6, 8, 10, 12)
+# (row, col) offset of the cell in front, by direction: up, left, down, right
+FRONT = ((-1, 0), (0, -1), (1, 0), (0, 1))
+
+
+class ReferenceBot:
+    """The movement rules as originally written, on a plain list-of-lists grid"""
+
+    def __init__(self, level):
+        self.original = [list(row) for row in level['data']]
+        self.data = [list(row) for row in self.original]
+        self.start = tuple(level['start_pos'])
+        self.start_direction = level['start_dir']
+        self.i, self.j = self.start
+        self.direction = self.start_direction
+        self.moves = 0
+        self.moves_limit = 10000
+
+    def _target(self, backward):
+        di, dj = FRONT[self.direction]
+        if backward:
+            di, dj = -di, -dj
+        i, j = self.i + di, self.j + dj
+        if not (0 <= i < len(self.data) and 0 <= j < len(self.data[0])) or self.data[i][j] in BLOCKED:
+            return None
+        return i, j
+
+    def sense(self, backward):
+        target = self._target(backward)
+        return target is not None and self.data[target[0]][target[1]] != 2
+
+    def step(self, backward):
+        self.moves += 1
+        target = self._target(backward)
+        if target is not None:
+            i, j = target
+            tile = self.data[i][j]
+            if tile == 2:
+                self.i, self.j = self.start
+                self.direction = self.start_direction
+                self.moves = 0
+                self.data = [list(row) for row in self.original]
+                raise DeathInterruption("The bot has died")
+            if tile in KEYS:
+                self.data = [[0 if cell == tile + 1 else cell for cell in row] for row in self.data]
+                self.data[i][j] = 0
+            self.i, self.j = i, j
+        if self.moves > self.moves_limit:
+            raise MovesExceeded("Too many moves taken")
+        if self.data[self.i][self.j] == 3:
+            raise WinInterruption
+
+    def turn(self, by):
+        self.moves += 1
+        self.direction = (self.direction + by) % 4
+
+
+def grid_rows(grid):
+    return [[grid.get(i, j) for j in range(grid.cols)] for i in range(grid.rows)]
+
+
+REFERENCE_COMMANDS = {
+    'move_forward': lambda reference: reference.step(False),
+    'move_backward': lambda reference: reference.step(True),
+    'can_move': lambda reference: reference.sense(False),
+    'can_move_back': lambda reference: reference.sense(True),
+    'turn_left': lambda reference: reference.turn(1),
+    'turn_right': lambda reference: reference.turn(-1),
+}
+
+
+def outcome(call):
+    """A command's return value, or the type of the interruption it raised"""
+    try:
+        return call()
+    except (WinInterruption, DeathInterruption, MovesExceeded) as e:
+        return type(e)
+
+
+COMMANDS = ('move_forward', 'move_forward', 'move_backward', 'can_move', 'can_move_back', 'turn_left', 'turn_right')
+
+
+@pytest.mark.parametrize('level_number', range(1, len(grids.ALL_LEVELS) + 1))
+def test_random_walks_match_original_rules(level_number):
+    level = grids.ALL_LEVELS[level_number - 1]
+    rng = random.Random(level_number)
+    for _ in range(20):
+        bot = Bot(Grid(level['data'], level['start_pos'], level['start_dir'], level['par']))
+        reference = ReferenceBot(level)
+        for _ in range(300):
+            command = rng.choice(COMMANDS)
+            got = outcome(getattr(bot, command))
+            want = outcome(lambda: REFERENCE_COMMANDS[command](reference))
+            assert got == want, command
+            assert (bot.i, bot.j, bot.direction, bot.moves) == (reference.i, reference.j, reference.direction,
+                                                              reference.moves)
+            if got is WinInterruption:
+                break
+        assert grid_rows(bot.grid) == reference.data
+
+
+# Start at (1, 1) facing right: key 4 at (1, 2), its gate 5 at (1, 3), end at (1, 4), zappy below the start
+KEY_ROOM = [[1, 1, 1, 1, 1, 1],
+            [1, 0, 4, 5, 3, 1],
+            [1, 2, 0, 0, 0, 1],
+            [1, 1, 1, 1, 1, 1]]
+
+
+def key_room_bot():
+    return Bot(Grid(KEY_ROOM, (1, 1), 3, 5))
+
+
+def test_key_opens_its_gate():
+    bot = key_room_bot()
+    assert bot.can_move()
+    bot.move_forward()
+    assert (bot.i, bot.j) == (1, 2)
+    assert bot.grid.get(1, 2) == 0 and bot.grid.get(1, 3) == 0
+    with pytest.raises(WinInterruption):
+        bot.move_forward()
+        bot.move_forward()
+    assert bot.win_state
+
+
+def test_closed_gate_and_walls_block():
+    bot = key_room_bot()
+    bot.turn_left()  # Facing up, into the outer wall
+    assert not bot.can_move()
+    bot.move_forward()
+    assert (bot.i, bot.j) == (1, 1)
+    bot.i, bot.j = 2, 3  # Below the closed gate
+    assert not bot.can_move()
+
+
+def test_zappy_wall_is_sensed_as_blocked_and_resets_the_level():
+    bot = key_room_bot()
+    bot.move_forward()  # Collect the key
+    bot.move_backward()
+    bot.turn_right()  # Facing down, at the zappy wall
+    assert not bot.can_move()
+    bot.turn_right()
+    bot.turn_right()  # Facing up: the zappy wall is behind
+    assert not bot.can_move_back()
+    with pytest.raises(DeathInterruption):
+        bot.move_backward()
+    assert (bot.i, bot.j, bot.direction, bot.moves) == (1, 1, 3, 0)
+    assert bot.grid.get(1, 2) == 4 and bot.grid.get(1, 3) == 5
+
+
+def test_moves_limit():
+    bot = key_room_bot()
+    bot.moves_limit = 3
+    bot.turn_left()
+    bot.turn_right()
+    bot.turn_left()  # Facing up, into the outer wall
+    with pytest.raises(MovesExceeded):
+        bot.move_forward()
@@ -0,0 +1,88 @@
+"""Viewport tile ids: any process can serve them, whatever it has cached"""
+
+import pytest
+
+import app as app_module
+import grids
+import renderer
+import sandbox
+from benchmarks.solutions import SOLUTIONS
+
+KEY_LEVEL = next(number for number in range(1, len(grids.ALL_LEVELS) + 1)
+                 if grids.get_compiled_level(number).new_grid().keys.key_bits)
+
+
+@pytest.fixture
+def small_tiles(monkeypatch):
+    # Several tiles per level, so keys only show in some of them
+    if sandbox.SANDBOX_MODE == 'process':
+        pytest.skip("sandbox worker processes don't see a patched TILE_SIZE")
+    monkeypatch.setattr(renderer, 'TILE_SIZE', 2)
+
+
+def fresh_store(monkeypatch):
+    """Serve /tiles from an empty store, like a worker that never saw the run"""
+    monkeypatch.setattr(app_module, 'tile_store', renderer.TileStore())
+
+
+def run_viewport(client):
+    response = client.post('/execute', json={'code': SOLUTIONS[KEY_LEVEL], 'level': KEY_LEVEL,
+                                             'grid_format': 'viewport'})
+    animation = response.get_json()['animation']
+    ids = [name for row in animation['viewport']['tiles'] for name in row] + animation['changes']['tile']
+    return response, ids
+
+
+def test_tiles_are_rebuilt_in_a_process_that_did_not_make_them(client, small_tiles, monkeypatch):
+    _, ids = run_viewport(client)
+    assert any(name.split('-')[3] != '0' for name in ids), "the run should change a tile by picking up a key"
+    served = {name: client.get(f'/tiles/{name}').get_json() for name in ids}
+
+    fresh_store(monkeypatch)
+    for name in ids:
+        response = client.get(f'/tiles/{name}')
+        assert response.status_code == 200, name
+        assert response.get_json() == served[name]
+
+
+def test_memoized_results_name_servable_tiles(client, small_tiles, monkeypatch):
+    run_viewport(client)
+    fresh_store(monkeypatch)
+    response, ids = run_viewport(client)
+    assert 'cache' in response.headers['Server-Timing']
+    assert all(client.get(f'/tiles/{name}').status_code == 200 for name in ids)
+
+
+def test_tile_ids_only_name_keys_shown_in_the_tile(small_tiles):
+    compiled = grids.get_compiled_level(KEY_LEVEL)
+    grid = compiled.new_grid()
+    tiles = renderer.GridRenderer(grid, KEY_LEVEL)
+    tiles.changed_tiles()
+    before = list(tiles._tile_hashes)
+    grid.collect(next(iter(grid.keys.key_bits)))
+    changed = dict(tiles.changed_tiles())
+    assert changed
+    for index, name in enumerate(tiles._tile_hashes):
+        assert (name == before[index]) == (index not in changed)
+
+
+@pytest.mark.parametrize('name', [
+    'nothex',
+    '0123456789abcdef-1-0-0',  # Content hash that doesn't match the tile
+    'x-1-0-0-0',
+    'x-999-0-0',  # No such level
+    'x-1-999-0',  # No such tile
+    'x-1-0-zz',
+])
+def test_unknown_tile_ids(client, monkeypatch, name):
+    fresh_store(monkeypatch)
+    assert client.get(f'/tiles/{name}').status_code == 404
+
+
+def test_extra_key_bits_do_not_name_a_tile(client, small_tiles, monkeypatch):
+    _, ids = run_viewport(client)
+    content_hash, level, index, keys = ids[0].split('-')
+    fresh_store(monkeypatch)
+    # The same tile, but claiming keys that don't show in it
+    bogus = f"{content_hash}-{level}-{index}-{int(keys, 16) | 1 << 40:x}"
+    assert client.get(f'/tiles/{bogus}').status_code == 404